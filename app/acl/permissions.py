@@ -1,15 +1,17 @@
-from .roles import UserRoles
+from .roles import ALL_ROLES_MASK, UserRoles, get_roles_mask
 
 
 class PublicAccess:
-    pass
+    mask: int = ALL_ROLES_MASK
 
 
 class Group:
     members: frozenset[UserRoles]
+    mask: int
 
     def __init__(self, *members: UserRoles):
         self.members = frozenset(members)
+        self.mask = get_roles_mask(*members)
 
 
 PermissionAcl = UserRoles | Group | PublicAccess
@@ -45,10 +47,14 @@ class Permissions:
     CreateTeamScore = UserRoles.Judge
 
 
-def perform_check(acl: PermissionAcl, role: UserRoles) -> bool:
-    if isinstance(acl, PublicAccess):
-        return True
-    elif isinstance(acl, UserRoles):
-        return role is acl
+def compile_acl(acl: PermissionAcl) -> int:
+    """
+    Возвращает битовую маску ролей, которым разрешено действие.
+    """
+    if isinstance(acl, UserRoles):
+        return get_roles_mask(acl)
+    return acl.mask
 
-    return role in acl.members
+
+def perform_check(acl: PermissionAcl, *roles: UserRoles) -> bool:
+    return bool(compile_acl(acl) & get_roles_mask(*roles))
@@ -7,3 +7,17 @@ class UserRoles(StrEnum):
     Helper = "helper"
     Judge = "judge"
     Admin = "admin"
+
+
+# Каждой роли соответствует свой бит, набор ролей - битовая маска
+ROLE_BITS: dict[UserRoles, int] = {
+    role: 1 << index for index, role in enumerate(UserRoles)
+}
+ALL_ROLES_MASK = sum(ROLE_BITS.values())
+
+
+def get_roles_mask(*roles: UserRoles) -> int:
+    mask = 0
+    for role in roles:
+        mask |= ROLE_BITS[role]
+    return mask
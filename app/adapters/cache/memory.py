@@ -0,0 +1,84 @@
+from typing import Callable, Iterable, Sequence
+from app.ports.cache import ICachePort
+from app.util.cache import TTLCache
+from collections import defaultdict
+
+
+class InMemoryCacheAdapter(ICachePort):
+    """
+    Кеш в памяти процесса. Подходит для одного воркера и для локального
+    запуска: инвалидация не выходит за пределы процесса.
+    Ключ удаляется из множеств своих тегов, как только покидает кеш
+    (вытеснение, истечение TTL, удаление), поэтому размер индекса тегов
+    ограничен размером кеша.
+    """
+
+    # раз в столько записей из кеша удаляются истекшие, но ни разу не
+    # прочитанные ключи
+    PURGE_INTERVAL = 1000
+
+    def __init__(self, max_size: int = 10000):
+        self._values: TTLCache[str, bytes] = TTLCache(
+            0, max_size, on_evict=self._forget
+        )
+        self._tags: defaultdict[str, set[str]] = defaultdict(set)
+        self._key_tags: dict[str, tuple[str, ...]] = {}
+        self._callbacks: list[Callable[[tuple[str, ...]], None]] = []
+        self._writes = 0
+
+    def _forget(self, key: str) -> None:
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is None:
+                continue
+
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def get(self, key: str) -> bytes | None:
+        return self._values.get(key)
+
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        return [self._values.get(key) for key in keys]
+
+    async def set(
+        self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()
+    ) -> None:
+        # старые теги ключа забываются, новые регистрируются до записи:
+        # если запись сразу же вытеснится, они будут удалены вместе с ней
+        self._values.invalidate(key)
+        tags = tuple(tags)
+        if tags:
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._tags[tag].add(key)
+
+        self._values.set(key, value, ttl)
+
+        self._writes += 1
+        if self._writes >= self.PURGE_INTERVAL:
+            self._writes = 0
+            self._values.purge_expired()
+
+    async def delete(self, key: str) -> None:
+        self._values.invalidate(key)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            for key in tuple(self._tags.get(tag, ())):
+                self._values.invalidate(key)
+
+        for callback in self._callbacks:
+            callback(tags)
+
+    def on_invalidate(
+        self, callback: Callable[[tuple[str, ...]], None]
+    ) -> None:
+        self._callbacks.append(callback)
@@ -0,0 +1,134 @@
+from typing import Callable, Iterable, Sequence
+from app.ports.cache import ICachePort
+from redis import asyncio as aioredis
+from contextlib import suppress
+from uuid import uuid4
+import asyncio
+import json
+
+
+class RedisCacheAdapter(ICachePort):
+    """
+    Общий для всех воркеров и подов кеш в Redis. Для каждого тега хранится
+    множество помеченных им ключей; при инвалидации ключи удаляются, а
+    теги рассылаются через pub/sub, чтобы остальные процессы сбросили свои
+    локальные данные.
+    """
+
+    RECONNECT_MIN_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 30.0
+
+    def __init__(self, url: str, prefix: str = "hackathonservice:"):
+        self.url = url
+        self.prefix = prefix
+        self.channel = f"{prefix}invalidate"
+        self._origin = uuid4().hex
+        self._redis: aioredis.Redis | None = None
+        self._listener: asyncio.Task | None = None
+        self._callbacks: list[Callable[[tuple[str, ...]], None]] = []
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}key:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    async def connect(self) -> None:
+        self._redis = aioredis.from_url(self.url)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _listen(self):
+        # при обрыве соединения подписка восстанавливается с растущей
+        # паузой, иначе воркер молча перестал бы получать инвалидации
+        delay = self.RECONNECT_MIN_DELAY
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                delay = self.RECONNECT_MIN_DELAY
+                async for message in pubsub.listen():
+                    self._handle_message(message)
+            except Exception as e:
+                print("Error during cache invalidation subscription: ", e)
+            finally:
+                with suppress(Exception):
+                    await pubsub.aclose()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+
+    def _handle_message(self, message: dict) -> None:
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+
+        # свои сообщения уже обработаны в invalidate_tags
+        if data.get("origin") == self._origin:
+            return
+
+        self._notify(tuple(data.get("tags", ())))
+
+    def _notify(self, tags: tuple[str, ...]) -> None:
+        for callback in self._callbacks:
+            callback(tags)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._redis.get(self._key(key))
+
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+
+        return await self._redis.mget([self._key(key) for key in keys])
+
+    async def set(
+        self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()
+    ) -> None:
+        ttl_ms = max(1, int(ttl * 1000))
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(key), value, px=ttl_ms)
+            for tag in tags:
+                # множество живет не меньше самого долгого из своих ключей
+                pipe.sadd(self._tag(tag), key)
+                pipe.pexpire(self._tag(tag), ttl_ms, gt=True)
+                pipe.pexpire(self._tag(tag), ttl_ms, nx=True)
+            await pipe.execute()
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self._key(key))
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        if not tags:
+            return
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.smembers(self._tag(tag))
+            members = await pipe.execute()
+
+        keys = {
+            self._key(key.decode()) for tag_keys in members for key in tag_keys
+        }
+        await self._redis.delete(*keys, *(self._tag(tag) for tag in tags))
+
+        self._notify(tags)
+        await self._redis.publish(
+            self.channel, json.dumps({"origin": self._origin, "tags": tags})
+        )
+
+    def on_invalidate(
+        self, callback: Callable[[tuple[str, ...]], None]
+    ) -> None:
+        self._callbacks.append(callback)
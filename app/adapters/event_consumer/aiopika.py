@@ -1,54 +1,289 @@
 from app.ports.event_consumer import IEventConsumerPort
-from typing import Callable, Awaitable
+from typing import Callable, Awaitable, Collection, Hashable
+from contextlib import suppress
+from app.config import Settings
 import aio_pika
 import asyncio
 import json
+import time
+
+
+def _get_ordering_key(payload: dict) -> Hashable:
+    data = payload.get("data", None)
+    if isinstance(data, dict) and data.get("id") is not None:
+        return data["id"]
+
+    return payload.get("event_name")
 
 
 class AioPikaEventConsumerAdapter(IEventConsumerPort):
+    """
+    Сообщения обрабатываются пулом из `workers` обработчиков. Сообщения с
+    одинаковым ключом упорядочивания (по умолчанию - id из данных события)
+    всегда попадают к одному обработчику и выполняются по порядку.
+    Сообщения, обработка которых завершилась ошибкой, публикуются в
+    `dead_letter_exchange` и подтверждаются.
+
+    События из `batch_routing_keys` не распределяются по обработчикам, а
+    копятся до `batch_max_size` сообщений или `batch_window` секунд и
+    передаются в `batch_handler` одним списком. Сообщения пакета
+    подтверждаются вместе после его обработки. Если пакет не удалось
+    обработать, его сообщения повторяются по одному (обработчики пакетов
+    должны быть идемпотентны), и в `dead_letter_exchange` попадают только
+    те, на которых обработчик снова завершился ошибкой.
+
+    Общая очередь `queue_name` делит события между экземплярами сервиса.
+    Для событий, которые должен получить каждый экземпляр (сброс
+    локальных кешей), используется create_broadcast_loop с собственной
+    временной очередью экземпляра.
+    """
+
     def __init__(
         self,
         connection_url: str,
         exchange_name: str = "events",
         queue_name: str = "",
+        prefetch_count: int = Settings.EVENT_PREFETCH_COUNT,
+        workers: int = Settings.EVENT_WORKERS,
+        dead_letter_exchange: str = Settings.EVENT_DEAD_LETTER_EXCHANGE,
+        batch_window: float = Settings.EVENT_BATCH_WINDOW,
+        batch_max_size: int = Settings.EVENT_BATCH_MAX_SIZE,
     ):
         self.connection_url = connection_url
         self.exchange_name = exchange_name
         self.queue_name = queue_name
+        self.prefetch_count = prefetch_count
+        self.workers = max(1, workers)
+        self.dead_letter_exchange = dead_letter_exchange
+        self.batch_window = batch_window
+        # неподтвержденных сообщений не бывает больше prefetch_count,
+        # поэтому пакет больше него не наберется
+        self.batch_max_size = max(1, min(batch_max_size, prefetch_count))
+        self.batches = 0
+        self.batched_messages = 0
+        self.max_batch = 0
+        # время от получения первого сообщения пакета до начала его
+        # обработки
+        self.max_batch_lag = 0.0
+        self.total_batch_lag = 0.0
 
         self._connection = None
         self._channel = None
         self._exchange = None
+        self._dead_letter_exchange = None
         self._queue = None
 
     async def connect(self):
         self._connection = await aio_pika.connect_robust(self.connection_url)
         self._channel = await self._connection.channel()
+        await self._channel.set_qos(prefetch_count=self.prefetch_count)
+
         self._exchange = await self._channel.declare_exchange(
             self.exchange_name, aio_pika.ExchangeType.TOPIC
         )
+        self._dead_letter_exchange = await self._channel.declare_exchange(
+            self.dead_letter_exchange,
+            aio_pika.ExchangeType.FANOUT,
+            durable=True,
+        )
 
         self._queue = await self._channel.declare_queue(
             self.queue_name or "",
             durable=True,
         )
 
+        if self.queue_name:
+            dead_letter_queue = await self._channel.declare_queue(
+                f"{self.queue_name}.dead", durable=True
+            )
+            await dead_letter_queue.bind(self._dead_letter_exchange)
+
+    async def _dead_letter(
+        self, message: aio_pika.abc.AbstractIncomingMessage, error: Exception
+    ):
+        try:
+            await self._dead_letter_exchange.publish(
+                aio_pika.Message(
+                    body=message.body,
+                    content_type=message.content_type,
+                    headers={
+                        **(message.headers or {}),
+                        "x-original-routing-key": message.routing_key,
+                        "x-error": repr(error),
+                    },
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                routing_key=message.routing_key or "",
+            )
+        except Exception as e:
+            print("Error during dead-lettering message: ", e)
+            await message.nack(requeue=True)
+            return
+
+        await message.ack()
+
+    async def _process(
+        self,
+        message: aio_pika.abc.AbstractIncomingMessage,
+        payload: dict,
+        handler: Callable[[dict], Awaitable[None]],
+    ):
+        try:
+            await handler(payload)
+        except Exception as e:
+            print("Error during processing message: ", e)
+            await self._dead_letter(message, e)
+        else:
+            await message.ack()
+
+    async def _process_batch(
+        self,
+        batch: list[tuple[aio_pika.abc.AbstractIncomingMessage, dict]],
+        handler: Callable[[list[dict]], Awaitable[None]],
+        lag: float = 0.0,
+    ):
+        self.batches += 1
+        self.batched_messages += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self.max_batch_lag = max(self.max_batch_lag, lag)
+        self.total_batch_lag += lag
+
+        try:
+            await handler([payload for _, payload in batch])
+        except Exception as e:
+            print("Error during processing message batch: ", e)
+            if len(batch) == 1:
+                await self._dead_letter(batch[0][0], e)
+                return
+
+            for message, payload in batch:
+                await self._process_batch_message(message, payload, handler)
+        else:
+            for message, _ in batch:
+                await message.ack()
+
+    async def _process_batch_message(
+        self,
+        message: aio_pika.abc.AbstractIncomingMessage,
+        payload: dict,
+        handler: Callable[[list[dict]], Awaitable[None]],
+    ):
+        try:
+            await handler([payload])
+        except Exception as e:
+            print("Error during processing message: ", e)
+            await self._dead_letter(message, e)
+        else:
+            await message.ack()
+
+    def get_batch_stats(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "batched_messages": self.batched_messages,
+            "max_batch": self.max_batch,
+            "max_lag": self.max_batch_lag,
+            "avg_lag": (
+                self.total_batch_lag / self.batches if self.batches else 0.0
+            ),
+        }
+
     async def create_consuming_loop(
         self,
         routing_keys: list[str],
         handler: Callable[[dict], Awaitable[None]],
+        ordering_key: Callable[[dict], Hashable] = _get_ordering_key,
+        batch_routing_keys: Collection[str] = (),
+        batch_handler: Callable[[list[dict]], Awaitable[None]] | None = None,
     ) -> asyncio.Task:
         for key in routing_keys:
             await self._queue.bind(self._exchange, routing_key=key)
 
+        # в очередях суммарно не больше prefetch_count сообщений: брокер не
+        # отдаст больше неподтвержденных сообщений
+        shards: list[asyncio.Queue] = [
+            asyncio.Queue() for _ in range(self.workers)
+        ]
+
+        async def work(shard: asyncio.Queue):
+            while True:
+                message, payload = await shard.get()
+                await self._process(message, payload, handler)
+
+        batch: list[tuple[aio_pika.abc.AbstractIncomingMessage, dict]] = []
+        # время получения первого сообщения текущего пакета
+        batch_opened_at = 0.0
+        batch_started = asyncio.Event()
+        batch_full = asyncio.Event()
+
+        async def flush_batches():
+            while True:
+                await batch_started.wait()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(batch_full.wait(), self.batch_window)
+                batch_started.clear()
+                batch_full.clear()
+
+                pending = batch.copy()
+                batch.clear()
+                lag = time.monotonic() - batch_opened_at
+                await self._process_batch(pending, batch_handler, lag)
+
         async def consume():
-            async with self._queue.iterator() as queue_iter:
-                async for message in queue_iter:
-                    async with message.process():
+            nonlocal batch_opened_at
+            workers = [asyncio.create_task(work(shard)) for shard in shards]
+            if batch_handler is not None:
+                workers.append(asyncio.create_task(flush_batches()))
+            try:
+                async with self._queue.iterator() as queue_iter:
+                    async for message in queue_iter:
                         try:
                             payload = json.loads(message.body)
-                            await handler(payload)
+                            key = ordering_key(payload)
                         except Exception as e:
-                            print("Error during processing message: ", e)
+                            print("Error during decoding message: ", e)
+                            await self._dead_letter(message, e)
+                            continue
+
+                        if (
+                            batch_handler is not None
+                            and payload.get("event_name") in batch_routing_keys
+                        ):
+                            if not batch:
+                                batch_opened_at = time.monotonic()
+                            batch.append((message, payload))
+                            batch_started.set()
+                            if len(batch) >= self.batch_max_size:
+                                batch_full.set()
+                            continue
+
+                        shard = shards[hash(key) % len(shards)]
+                        await shard.put((message, payload))
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        return asyncio.create_task(consume())
+
+    async def create_broadcast_loop(
+        self,
+        routing_keys: list[str],
+        handler: Callable[[dict], Awaitable[None]],
+    ) -> asyncio.Task:
+        # очередь с именем от брокера удаляется вместе с соединением,
+        # поэтому каждый экземпляр получает свою копию каждого события
+        queue = await self._channel.declare_queue(
+            exclusive=True, auto_delete=True
+        )
+        for key in routing_keys:
+            await queue.bind(self._exchange, routing_key=key)
+
+        async def consume():
+            async with queue.iterator(no_ack=True) as queue_iter:
+                async for message in queue_iter:
+                    try:
+                        await handler(json.loads(message.body))
+                    except Exception as e:
+                        print("Error during processing broadcast message: ", e)
 
         return asyncio.create_task(consume())
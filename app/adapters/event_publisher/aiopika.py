@@ -1,39 +1,177 @@
 from app.ports.event_publisher import IEventPublisherPort
+from aio_pika.abc import AbstractChannel
+from aio_pika.pool import Pool
 from pydantic import BaseModel
+from contextlib import suppress
+from app.config import Settings
 from uuid import uuid4
 import aio_pika
+import asyncio
 
 from app.ports.event_publisher.dto import EventPayload
 from app.ports.event_publisher.exceptions import (
     EventPublisherNotConnectedException,
+    EventPublisherBufferFullException,
 )
 
 
 class AioPikaEventPublisherAdapter(IEventPublisherPort):
-    def __init__(self, connection_url: str, exchange_name: str = "events"):
+    """
+    `publish` не ждет брокер: событие попадает в буфер в памяти процесса,
+    откуда фоновая задача отправляет его пакетами через пул каналов. Если
+    брокер недоступен, пакет остается в буфере и отправляется повторно,
+    пока не будет принят. Доставка через буфер - best-effort: при падении
+    или перезапуске процесса события из буфера теряются, а если буфер
+    заполнен дольше `publish_timeout`, `publish` выбрасывает исключение.
+    События, которые нельзя потерять, записываются в outbox
+    (app.events.outbox) в транзакции с изменением данных.
+
+    `publish_batch` отправляет события сразу и ждет подтверждения брокера.
+    """
+
+    def __init__(
+        self,
+        connection_url: str,
+        exchange_name: str = "events",
+        channel_pool_size: int = Settings.EVENT_PUBLISHER_CHANNELS,
+        confirms: bool = Settings.EVENT_PUBLISHER_CONFIRMS,
+        batch_size: int = Settings.EVENT_PUBLISHER_BATCH_SIZE,
+        buffer_size: int = Settings.EVENT_PUBLISHER_BUFFER_SIZE,
+        retry_interval: float = Settings.EVENT_PUBLISHER_RETRY_INTERVAL,
+        publish_timeout: float = Settings.EVENT_PUBLISHER_PUBLISH_TIMEOUT,
+    ):
         self.connection_url = connection_url
         self.exchange_name = exchange_name
-        self._exchange = None
-        self._channel = None
+        self.channel_pool_size = channel_pool_size
+        self.confirms = confirms
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.publish_timeout = publish_timeout
+
+        self._connection = None
+        self._channels: Pool[AbstractChannel] | None = None
+        self._buffer: asyncio.Queue[tuple[str, aio_pika.Message]] = (
+            asyncio.Queue(buffer_size)
+        )
+        self._flush_task: asyncio.Task | None = None
 
     async def connect(self):
-        connection = await aio_pika.connect_robust(self.connection_url)
-        self._channel = await connection.channel()
-        self._exchange = await self._channel.declare_exchange(
+        self._connection = await aio_pika.connect_robust(self.connection_url)
+        self._channels = Pool(
+            self._create_channel, max_size=self.channel_pool_size
+        )
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _create_channel(self) -> AbstractChannel:
+        channel = await self._connection.channel(
+            publisher_confirms=self.confirms
+        )
+        await channel.declare_exchange(
             self.exchange_name, aio_pika.ExchangeType.TOPIC
         )
+        return channel
+
+    def _create_message(self, payload: EventPayload) -> aio_pika.Message:
+        return aio_pika.Message(
+            body=payload.model_dump_json().encode(),
+            content_type="application/json",
+            message_id=str(payload.event_id),
+        )
+
+    async def _send(
+        self, messages: list[tuple[str, aio_pika.Message]]
+    ) -> tuple[list[tuple[str, aio_pika.Message]], Exception | None]:
+        """
+        Возвращает сообщения, которые брокер не принял, и последнюю ошибку.
+        """
+        try:
+            async with self._channels.acquire() as channel:
+                exchange = await channel.get_exchange(
+                    self.exchange_name, ensure=False
+                )
+                # при включенных подтверждениях публикации ожидаются
+                # одновременно, а не по одной
+                results = await asyncio.gather(
+                    *(
+                        exchange.publish(message, routing_key=event_name)
+                        for event_name, message in messages
+                    ),
+                    return_exceptions=True,
+                )
+        except Exception as e:
+            return messages, e
+
+        failed: list[tuple[str, aio_pika.Message]] = []
+        error: Exception | None = None
+        for item, result in zip(messages, results):
+            if isinstance(result, Exception):
+                failed.append(item)
+                error = result
+
+        return failed, error
+
+    async def _flush_loop(self):
+        while True:
+            batch = [await self._buffer.get()]
+            while len(batch) < self.batch_size and not self._buffer.empty():
+                batch.append(self._buffer.get_nowait())
+
+            pending = batch
+            while True:
+                pending, error = await self._send(pending)
+                if not pending:
+                    break
+
+                print("Error during publishing events: ", error)
+                await asyncio.sleep(self.retry_interval)
+
+            for _ in batch:
+                self._buffer.task_done()
 
     async def publish(self, event_name: str, data: BaseModel) -> None:
-        if not self._exchange:
+        if self._flush_task is None:
             raise EventPublisherNotConnectedException()
 
         payload = EventPayload(
             event_id=uuid4(), event_name=event_name, data=data.model_dump()
         )
+        try:
+            await asyncio.wait_for(
+                self._buffer.put((event_name, self._create_message(payload))),
+                self.publish_timeout,
+            )
+        except asyncio.TimeoutError:
+            raise EventPublisherBufferFullException()
 
-        message = aio_pika.Message(
-            body=payload.model_dump_json().encode(),
-            content_type="application/json",
+    async def publish_batch(self, payloads: list[EventPayload]) -> None:
+        if self._channels is None:
+            raise EventPublisherNotConnectedException()
+
+        _, error = await self._send(
+            [
+                (payload.event_name, self._create_message(payload))
+                for payload in payloads
+            ]
         )
+        if error is not None:
+            raise error
+
+    async def close(self, timeout: float = 5.0) -> None:
+        if self._flush_task is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._buffer.join(), timeout)
+        except asyncio.TimeoutError:
+            print(
+                "Unpublished events dropped on shutdown: ",
+                self._buffer.qsize(),
+            )
+
+        self._flush_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._flush_task
+        self._flush_task = None
 
-        await self._exchange.publish(message, routing_key=event_name)
+        await self._channels.close()
+        await self._connection.close()
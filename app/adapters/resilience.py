@@ -0,0 +1,254 @@
+from typing import Any, Awaitable, Callable
+import asyncio
+import random
+import time
+import httpx
+
+
+class CircuitBreaker:
+    """
+    После `failure_threshold` неудач подряд размыкается и в течение
+    `reset_timeout` секунд отклоняет запросы сразу. Затем пропускает один
+    пробный запрос: успех замыкает цепь, неудача снова размыкает ее.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return False
+
+        if self._probe_in_flight:
+            return False
+
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        # пробный запрос отменен, не дав результата: следующий запрос
+        # после reset_timeout снова сможет стать пробным
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or (
+            self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """
+    Ограничивает долю повторных запросов: каждый исходный запрос добавляет
+    `ratio` токенов, каждый повтор тратит один. `min_tokens` - запас на
+    случай малого трафика, он же верхняя граница накопления.
+    """
+
+    def __init__(self, ratio: float, min_tokens: int):
+        self.ratio = ratio
+        self.capacity = float(min_tokens)
+        self.tokens = float(min_tokens)
+
+    def deposit(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    # full jitter: случайная задержка рассинхронизирует повторы клиентов
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def max_request_duration(
+    timeout: float,
+    retries: int,
+    backoff_base: float,
+    backoff_cap: float,
+    hedge_delay: float = 0,
+) -> float:
+    """
+    Наибольшее время, которое ResilientHttpClient может потратить на один
+    вызов: все попытки по `timeout` (дублирующий запрос стартует через
+    `hedge_delay` после исходного) и максимальные паузы между ними.
+    """
+    attempt = timeout + hedge_delay
+    backoff = sum(
+        min(backoff_cap, backoff_base * 2**retry) for retry in range(retries)
+    )
+    return attempt * (retries + 1) + backoff
+
+
+class ResilientHttpClient:
+    """
+    Обертка над общим httpx-клиентом для обращения к одному сервису.
+    Идемпотентные запросы (GET и POST с `idempotent=True`, например
+    чтение по списку id) повторяются при сетевых ошибках и ответах 5xx в
+    пределах бюджета повторов и, если задан `hedge_delay`, дублируются
+    при долгом ответе. При разомкнутом автомате и исчерпанных повторах
+    выбрасывается исключение из `error_factory`.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        headers: dict[str, str],
+        error_factory: Callable[[], Exception],
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        retries: int,
+        backoff_base: float,
+        backoff_cap: float,
+        hedge_delay: float = 0,
+    ):
+        self.client = client
+        self.headers = headers
+        self.error_factory = error_factory
+        self.breaker = breaker
+        self.budget = budget
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge_delay = hedge_delay
+
+    def max_duration(self, timeout: float) -> float:
+        return max_request_duration(
+            timeout,
+            self.retries,
+            self.backoff_base,
+            self.backoff_cap,
+            self.hedge_delay,
+        )
+
+    async def get(self, url: str, timeout: httpx.Timeout) -> httpx.Response:
+        return await self._request("GET", url, timeout, idempotent=True)
+
+    async def post(
+        self,
+        url: str,
+        json: Any,
+        timeout: httpx.Timeout,
+        idempotent: bool = False,
+    ) -> httpx.Response:
+        return await self._request(
+            "POST", url, timeout, json=json, idempotent=idempotent
+        )
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        timeout: httpx.Timeout,
+        json: Any = None,
+        idempotent: bool = False,
+    ) -> httpx.Response:
+        probing = self.breaker.is_open
+        if not self.breaker.allow():
+            raise self.error_factory()
+
+        self.budget.deposit()
+        try:
+            return await self._attempt(method, url, timeout, json, idempotent)
+        except BaseException:
+            # в том числе отмена: без этого пробный запрос, отмененный
+            # вызывающей стороной, навсегда оставил бы автомат разомкнутым
+            if probing:
+                self.breaker.release_probe()
+            raise
+
+    async def _attempt(
+        self,
+        method: str,
+        url: str,
+        timeout: httpx.Timeout,
+        json: Any,
+        idempotent: bool,
+    ) -> httpx.Response:
+
+        def send() -> Awaitable[httpx.Response]:
+            return self.client.request(
+                method, url, headers=self.headers, json=json, timeout=timeout
+            )
+
+        attempt = 0
+        while True:
+            try:
+                if idempotent and self.hedge_delay > 0:
+                    response = await self._hedged(send)
+                else:
+                    response = await send()
+                failed = response.status_code >= 500
+            except httpx.HTTPError:
+                failed = True
+
+            if not failed:
+                self.breaker.record_success()
+                return response
+
+            self.breaker.record_failure()
+            if (
+                not idempotent
+                or attempt >= self.retries
+                or not self.breaker.allow()
+                or not self.budget.try_withdraw()
+            ):
+                raise self.error_factory()
+
+            await asyncio.sleep(
+                backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+            )
+            attempt += 1
+
+    async def _hedged(
+        self, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        tasks = {asyncio.ensure_future(send())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if not done and self.budget.try_withdraw():
+                tasks.add(asyncio.ensure_future(send()))
+
+            # побеждает первый ответ без ошибки сервера, иначе возвращается
+            # результат последнего завершившегося запроса
+            outcome: httpx.Response | BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    outcome = task.exception() or task.result()
+                    if (
+                        isinstance(outcome, httpx.Response)
+                        and outcome.status_code < 500
+                    ):
+                        return outcome
+
+            if isinstance(outcome, httpx.Response):
+                return outcome
+            raise outcome or self.error_factory()
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,54 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, BinaryIO, Callable, TypeVar
+from boto3.s3.transfer import TransferConfig
 from app.ports.storage import IStoragePort
 from botocore.client import Config
 from app.config import Settings
+from urllib.parse import quote
+import functools
+import asyncio
 import boto3
-import io
+
+T = TypeVar("T")
+
+
+def _create_client(endpoint_url: str, max_workers: int):
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        aws_access_key_id=Settings.S3_ACCESS_KEY,
+        aws_secret_access_key=Settings.S3_SECRET_KEY,
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=max_workers,
+        ),
+        region_name="us-east-1",
+    )
 
 
 class S3StorageAdapter(IStoragePort):
-    def __init__(self):
-        self.__client = boto3.client(
-            "s3",
-            endpoint_url=Settings.S3_ENDPOINT,
-            aws_access_key_id=Settings.S3_ACCESS_KEY,
-            aws_secret_access_key=Settings.S3_SECRET_KEY,
-            config=Config(signature_version="s3v4"),
-            region_name="us-east-1",
+    def __init__(self, max_workers: int = Settings.S3_MAX_WORKERS):
+        self.__client = _create_client(Settings.S3_ENDPOINT, max_workers)
+        # подпись включает адрес S3, поэтому ссылки для клиентов снаружи
+        # кластера подписываются клиентом с публичным адресом
+        self.__public_client = self.__client
+        if Settings.S3_PUBLIC_ENDPOINT not in ("", Settings.S3_ENDPOINT):
+            self.__public_client = _create_client(
+                Settings.S3_PUBLIC_ENDPOINT, max_workers
+            )
+        # boto3 синхронный, поэтому все обращения к S3 выполняются в
+        # ограниченном пуле потоков, чтобы не блокировать event loop
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="s3"
+        )
+        # Большие файлы загружаются multipart-ом частями фиксированного
+        # размера, так что расход памяти на загрузку ограничен
+        # chunksize * max_concurrency независимо от размера файла
+        self.__transfer_config = TransferConfig(
+            multipart_threshold=Settings.S3_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=Settings.S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=Settings.S3_MULTIPART_CONCURRENCY,
         )
 
-    def upload_jpeg(self, buf: io.BytesIO, bucket: str, key: str) -> None:
-        self.__client.upload_fileobj(
-            buf,
-            bucket,
-            key,
-            ExtraArgs={"ContentType": "image/jpeg"},
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.__executor, functools.partial(func, *args, **kwargs)
         )
 
-    def upload_file(
-        self, buf: io.BytesIO, bucket: str, key: str, content_type: str
+    async def upload_file(
+        self, buf: BinaryIO, bucket: str, key: str, content_type: str
     ) -> None:
-        self.__client.upload_fileobj(
+        await self._run(
+            self.__client.upload_fileobj,
             buf,
             bucket,
             key,
             ExtraArgs={"ContentType": content_type},
+            Config=self.__transfer_config,
         )
 
-    def delete_object(self, bucket: str, key: str) -> None:
-        self.__client.delete_object(Bucket=bucket, Key=key)
+    async def delete_object(self, bucket: str, key: str) -> None:
+        await self._run(self.__client.delete_object, Bucket=bucket, Key=key)
 
-    def object_exists(self, bucket: str, key: str) -> bool:
-        try:
-            self.__client.head_object(Bucket=bucket, Key=key)
-            return True
-        except self.__client.exceptions.ClientError:
-            return False
+    async def get_object(self, bucket: str, key: str) -> dict:
+        return await self._run(self.__client.get_object, Bucket=bucket, Key=key)
 
-    def get_object(self, bucket: str, key: str) -> dict:
-        return self.__client.get_object(Bucket=bucket, Key=key)
+    async def iter_object_body(
+        self, body, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await self._run(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
 
-    def ensure_bucket(self, bucket: str) -> None:
-        if self.__client.bucket_exists(bucket):
-            return
+    def generate_presigned_url(
+        self,
+        bucket: str,
+        key: str,
+        expires_in: int,
+        filename: str | None = None,
+    ) -> str:
+        params = {"Bucket": bucket, "Key": key}
+        if filename is not None:
+            # S3 отдаст файл на скачивание под исходным именем
+            quoted = quote(filename)
+            params["ResponseContentDisposition"] = (
+                f'attachment; filename="{quoted}"; '
+                f"filename*=UTF-8''{quoted}"
+            )
 
-        raise RuntimeError(f"Необходимо определить бакет {bucket}!")
+        # подпись вычисляется локально, обращения к S3 не происходит
+        return self.__public_client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires_in
+        )
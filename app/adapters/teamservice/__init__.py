@@ -6,6 +6,12 @@ from typing import Any
 import urllib.parse
 import httpx
 
+from app.adapters.resilience import (
+    ResilientHttpClient,
+    CircuitBreaker,
+    RetryBudget,
+)
+
 from app.ports.teamservice.dto import (
     HackathonTeamWithMatesDto,
     HackathonTeamDto,
@@ -16,46 +22,65 @@ class TeamServiceAdapter(ITeamServicePort):
     def __init__(
         self,
         client: httpx.AsyncClient,
+        timeout: float = Settings.TEAM_SERVICE_TIMEOUT,
+        bulk_timeout: float = Settings.TEAM_SERVICE_BULK_TIMEOUT,
     ):
-        self.client = client
+        self.timeout = httpx.Timeout(timeout)
+        self.bulk_timeout = httpx.Timeout(bulk_timeout)
         self.base_url = Settings.TEAM_SERVICE_URL
         self.headers = {
             "Authorization": f"Bearer {Settings.TEAM_SERVICE_API_KEY}"
         }
+        self.client = ResilientHttpClient(
+            client,
+            self.headers,
+            error_factory=TeamServiceError,
+            breaker=CircuitBreaker(
+                Settings.UPSTREAM_BREAKER_FAILURE_THRESHOLD,
+                Settings.UPSTREAM_BREAKER_RESET_TIMEOUT,
+            ),
+            budget=RetryBudget(
+                Settings.UPSTREAM_RETRY_BUDGET_RATIO,
+                Settings.UPSTREAM_RETRY_BUDGET_MIN,
+            ),
+            retries=Settings.UPSTREAM_RETRY_ATTEMPTS,
+            backoff_base=Settings.UPSTREAM_RETRY_BACKOFF_BASE,
+            backoff_cap=Settings.UPSTREAM_RETRY_BACKOFF_CAP,
+            hedge_delay=Settings.UPSTREAM_HEDGE_DELAY,
+        )
 
-    async def _do_get(self, url: str) -> dict:
+    def _parse(self, response: httpx.Response) -> Any:
         try:
-            response = await self.client.get(url, headers=self.headers)
             data = response.json()
-            if response.status_code == 200:
-                return data
-            else:
-                raise HTTPException(
-                    status_code=response.status_code, detail=data["detail"]
-                )
-        except httpx.HTTPError as e:
+        except ValueError:
             raise TeamServiceError()
 
-    async def _do_post(self, url: str, json: Any) -> Any:
-        try:
-            response = await self.client.post(
-                url,
-                headers=self.headers,
-                json=json,
+        if response.status_code == 200:
+            return data
+        else:
+            raise HTTPException(
+                status_code=response.status_code, detail=data["detail"]
             )
-            data = response.json()
-            if response.status_code == 200:
-                return data
-            else:
-                raise HTTPException(
-                    status_code=response.status_code, detail=data["detail"]
-                )
-        except httpx.HTTPError as e:
-            raise TeamServiceError()
+
+    async def _do_get(self, url: str, timeout: httpx.Timeout) -> Any:
+        response = await self.client.get(url, timeout=timeout)
+        return self._parse(response)
+
+    async def _do_post(
+        self,
+        url: str,
+        json: Any,
+        timeout: httpx.Timeout,
+        idempotent: bool = False,
+    ) -> Any:
+        response = await self.client.post(
+            url, json=json, timeout=timeout, idempotent=idempotent
+        )
+        return self._parse(response)
 
     async def get_team_info(self, team_id: int) -> HackathonTeamDto:
         data = await self._do_get(
-            urllib.parse.urljoin(self.base_url, str(team_id))
+            urllib.parse.urljoin(self.base_url, str(team_id)), self.timeout
         )
         return HackathonTeamDto(**data)
 
@@ -65,7 +90,8 @@ class TeamServiceAdapter(ITeamServicePort):
         data = await self._do_get(
             urllib.parse.urljoin(
                 self.base_url, f"hackathon/{hackathon_id}/teams"
-            )
+            ),
+            self.bulk_timeout,
         )
         return [HackathonTeamDto(**team) for team in data]
 
@@ -75,7 +101,8 @@ class TeamServiceAdapter(ITeamServicePort):
         data = await self._do_get(
             urllib.parse.urljoin(
                 self.base_url, f"hackathon/{hackathon_id}/teams/{team_id}"
-            )
+            ),
+            self.timeout,
         )
         return HackathonTeamWithMatesDto(**data)
 
@@ -87,5 +114,8 @@ class TeamServiceAdapter(ITeamServicePort):
                 self.base_url, f"hackathon/{hackathon_id}/teams-info-many"
             ),
             tuple(team_ids),
+            self.bulk_timeout,
+            # запрос только читает данные, поэтому его можно повторять
+            idempotent=True,
         )
         return [HackathonTeamDto(**team) for team in data]
@@ -0,0 +1,173 @@
+from app.util.cache import SharedCache, SingleFlight
+from app.ports.teamservice import ITeamServicePort
+from app.ports.cache import ICachePort
+from app.events.emitter import BroadcastEmitter, Events
+from app.config import Settings
+from typing import Any, Hashable
+
+from app.ports.teamservice.dto import (
+    HackathonTeamWithMatesDto,
+    HackathonTeamDto,
+)
+
+
+class CachedTeamServiceAdapter(ITeamServicePort):
+    """
+    Кеширующая обертка над сервисом команд. Одновременные одинаковые
+    запросы объединяются в один, записи хранятся в общем кеше, живут не
+    дольше TEAM_CACHE_TTL и сбрасываются при удалении команды или
+    хакатона: записи помечаются тегами команды и хакатона.
+    """
+
+    ALL_ROSTERS_TAG = "teams:hackathon_teams"
+
+    def __init__(
+        self,
+        upstream: ITeamServicePort,
+        cache: ICachePort,
+        ttl: float = Settings.TEAM_CACHE_TTL,
+    ):
+        self.upstream = upstream
+        self._teams: SharedCache[int, HackathonTeamDto] = SharedCache(
+            cache, "teams", HackathonTeamDto, ttl
+        )
+        self._hackathon_teams: SharedCache[int, list[HackathonTeamDto]] = (
+            SharedCache(cache, "hackathon_teams", list[HackathonTeamDto], ttl)
+        )
+        self._teams_with_mates: SharedCache[
+            tuple[int, int], HackathonTeamWithMatesDto
+        ] = SharedCache(
+            cache, "teams_with_mates", HackathonTeamWithMatesDto, ttl
+        )
+        self._single_flight: SingleFlight[Hashable, Any] = SingleFlight()
+
+        self._init_events()
+
+    def _init_events(self):
+        async def on_team_deleted(payload: dict):
+            data: dict | None = payload.get("data", None)
+            if data is None or data.get("id") is None:
+                return
+
+            await self.invalidate_team(data["id"], data.get("hackathon_id"))
+
+        async def on_hackathon_deleted(payload: dict):
+            data: dict | None = payload.get("data", None)
+            if data is None or data.get("id") is None:
+                return
+
+            await self.invalidate_hackathon(data["id"])
+
+        BroadcastEmitter.on(Events.TeamHackathonTeamDeleted, on_team_deleted)
+        BroadcastEmitter.on(Events.HackathonDeleted, on_hackathon_deleted)
+
+    @staticmethod
+    def _team_tag(team_id: int) -> str:
+        return f"teams:team:{team_id}"
+
+    @staticmethod
+    def _hackathon_tag(hackathon_id: int) -> str:
+        return f"teams:hackathon:{hackathon_id}"
+
+    async def invalidate_team(
+        self, team_id: int, hackathon_id: int | None = None
+    ) -> None:
+        await self._teams.delete(team_id)
+        await self._teams_with_mates.invalidate_tags(self._team_tag(team_id))
+
+        if hackathon_id is None:
+            await self._hackathon_teams.invalidate_tags(self.ALL_ROSTERS_TAG)
+        else:
+            await self._hackathon_teams.delete(hackathon_id)
+
+    async def invalidate_hackathon(self, hackathon_id: int) -> None:
+        await self._hackathon_teams.delete(hackathon_id)
+        await self._teams_with_mates.invalidate_tags(
+            self._hackathon_tag(hackathon_id)
+        )
+
+    async def _load_team_info(self, team_id: int) -> HackathonTeamDto:
+        team = await self.upstream.get_team_info(team_id)
+        await self._teams.set(team_id, team)
+        return team
+
+    async def get_team_info(self, team_id: int) -> HackathonTeamDto:
+        team = await self._teams.get(team_id)
+        if team is not None:
+            return team
+
+        return await self._single_flight.do(
+            ("team", team_id), lambda: self._load_team_info(team_id)
+        )
+
+    async def _load_hackathon_teams(
+        self, hackathon_id: int
+    ) -> list[HackathonTeamDto]:
+        teams = await self.upstream.get_hackathon_teams(hackathon_id)
+        await self._hackathon_teams.set(
+            hackathon_id, teams, (self.ALL_ROSTERS_TAG,)
+        )
+        for team in teams:
+            await self._teams.set(team.id, team)
+
+        return teams
+
+    async def get_hackathon_teams(
+        self, hackathon_id: int
+    ) -> list[HackathonTeamDto]:
+        teams = await self._hackathon_teams.get(hackathon_id)
+        if teams is not None:
+            return teams
+
+        return await self._single_flight.do(
+            ("hackathon_teams", hackathon_id),
+            lambda: self._load_hackathon_teams(hackathon_id),
+        )
+
+    async def _load_hackathon_team(
+        self, hackathon_id: int, team_id: int
+    ) -> HackathonTeamWithMatesDto:
+        team = await self.upstream.get_hackathon_team(hackathon_id, team_id)
+        await self._teams_with_mates.set(
+            (hackathon_id, team_id),
+            team,
+            (self._team_tag(team_id), self._hackathon_tag(hackathon_id)),
+        )
+        return team
+
+    async def get_hackathon_team(
+        self, hackathon_id: int, team_id: int
+    ) -> HackathonTeamWithMatesDto:
+        team = await self._teams_with_mates.get((hackathon_id, team_id))
+        if team is not None:
+            return team
+
+        return await self._single_flight.do(
+            ("hackathon_team", hackathon_id, team_id),
+            lambda: self._load_hackathon_team(hackathon_id, team_id),
+        )
+
+    async def get_hackathon_team_info_many(
+        self, hackathon_id: int, team_ids: frozenset[int]
+    ) -> list[HackathonTeamDto]:
+        cached = await self._teams.get_many(team_ids)
+        teams = list(cached.values())
+        missing = team_ids - cached.keys()
+
+        if missing:
+            fetched = await self.upstream.get_hackathon_team_info_many(
+                hackathon_id, frozenset(missing)
+            )
+            for team in fetched:
+                await self._teams.set(team.id, team)
+            teams.extend(fetched)
+
+        return teams
+
+    def get_cache_stats(self) -> dict[str, int] | None:
+        caches = (self._teams, self._hackathon_teams, self._teams_with_mates)
+        return {
+            "hits": sum(cache.hits for cache in caches),
+            "misses": sum(cache.misses for cache in caches),
+            "coalesced": self._single_flight.coalesced,
+        }
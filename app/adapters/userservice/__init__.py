@@ -7,51 +7,76 @@ from typing import Any
 import urllib.parse
 import httpx
 
+from app.adapters.resilience import (
+    ResilientHttpClient,
+    CircuitBreaker,
+    RetryBudget,
+)
+
 
 class UserServiceAdapter(IUserServicePort):
     def __init__(
         self,
         client: httpx.AsyncClient,
+        timeout: float = Settings.USER_SERVICE_TIMEOUT,
+        bulk_timeout: float = Settings.USER_SERVICE_BULK_TIMEOUT,
     ):
-        self.client = client
+        self.timeout = httpx.Timeout(timeout)
+        self.bulk_timeout = httpx.Timeout(bulk_timeout)
         self.base_url = Settings.USER_SERVICE_URL
         self.headers = {
             "Authorization": f"Bearer {Settings.USER_SERVICE_API_KEY}"
         }
+        self.client = ResilientHttpClient(
+            client,
+            self.headers,
+            error_factory=UserServiceError,
+            breaker=CircuitBreaker(
+                Settings.UPSTREAM_BREAKER_FAILURE_THRESHOLD,
+                Settings.UPSTREAM_BREAKER_RESET_TIMEOUT,
+            ),
+            budget=RetryBudget(
+                Settings.UPSTREAM_RETRY_BUDGET_RATIO,
+                Settings.UPSTREAM_RETRY_BUDGET_MIN,
+            ),
+            retries=Settings.UPSTREAM_RETRY_ATTEMPTS,
+            backoff_base=Settings.UPSTREAM_RETRY_BACKOFF_BASE,
+            backoff_cap=Settings.UPSTREAM_RETRY_BACKOFF_CAP,
+            hedge_delay=Settings.UPSTREAM_HEDGE_DELAY,
+        )
 
-    async def _do_get(self, url: str) -> dict:
+    def _parse(self, response: httpx.Response) -> Any:
         try:
-            response = await self.client.get(url, headers=self.headers)
             data = response.json()
-            if response.status_code == 200:
-                return data
-            else:
-                raise HTTPException(
-                    status_code=response.status_code, detail=data["detail"]
-                )
-        except httpx.HTTPError as e:
+        except ValueError:
             raise UserServiceError()
 
-    async def _do_post(self, url: str, json: Any) -> Any:
-        try:
-            response = await self.client.post(
-                url,
-                headers=self.headers,
-                json=json,
+        if response.status_code == 200:
+            return data
+        else:
+            raise HTTPException(
+                status_code=response.status_code, detail=data["detail"]
             )
-            data = response.json()
-            if response.status_code == 200:
-                return data
-            else:
-                raise HTTPException(
-                    status_code=response.status_code, detail=data["detail"]
-                )
-        except httpx.HTTPError as e:
-            raise UserServiceError()
+
+    async def _do_get(self, url: str, timeout: httpx.Timeout) -> Any:
+        response = await self.client.get(url, timeout=timeout)
+        return self._parse(response)
+
+    async def _do_post(
+        self,
+        url: str,
+        json: Any,
+        timeout: httpx.Timeout,
+        idempotent: bool = False,
+    ) -> Any:
+        response = await self.client.post(
+            url, json=json, timeout=timeout, idempotent=idempotent
+        )
+        return self._parse(response)
 
     async def get_user_info(self, user_id: int) -> ExternalUserDto:
         data = await self._do_get(
-            urllib.parse.urljoin(self.base_url, str(user_id))
+            urllib.parse.urljoin(self.base_url, str(user_id)), self.timeout
         )
         return ExternalUserDto(**data)
 
@@ -61,5 +86,8 @@ class UserServiceAdapter(IUserServicePort):
         data: list[dict[str, Any]] = await self._do_post(
             urllib.parse.urljoin(self.base_url, "info-many"),
             tuple(user_ids),
+            self.bulk_timeout,
+            # запрос только читает данные, поэтому его можно повторять
+            idempotent=True,
         )
         return [ExternalUserDto(**user) for user in data]
@@ -0,0 +1,97 @@
+from app.ports.userservice.exceptions import UserDoesNotExistException
+from app.ports.userservice.dto import ExternalUserDto
+from app.ports.userservice import IUserServicePort
+from app.util.cache import SharedCache, SingleFlight
+from app.ports.cache import ICachePort
+from app.events.emitter import BroadcastEmitter, Events
+from app.util.batching import MicroBatcher
+from app.config import Settings
+
+
+class CachedUserServiceAdapter(IUserServicePort):
+    """
+    Кеширующая обертка над сервисом пользователей. Записи хранятся в общем
+    кеше, живут не дольше USER_CACHE_TTL и сбрасываются при удалении или
+    блокировке пользователя.
+    Промахи по одиночным пользователям, пришедшие в течение
+    USER_BATCH_WINDOW, запрашиваются одним вызовом info-many.
+    """
+
+    def __init__(
+        self,
+        upstream: IUserServicePort,
+        cache: ICachePort,
+        ttl: float = Settings.USER_CACHE_TTL,
+        batch_window: float = Settings.USER_BATCH_WINDOW,
+        batch_max_size: int = Settings.USER_BATCH_MAX_SIZE,
+    ):
+        self.upstream = upstream
+        self.base_url = upstream.base_url
+        self._users: SharedCache[int, ExternalUserDto] = SharedCache(
+            cache, "users", ExternalUserDto, ttl
+        )
+        self._single_flight: SingleFlight[int, ExternalUserDto] = SingleFlight()
+        self._batcher: MicroBatcher[int, ExternalUserDto] = MicroBatcher(
+            self._fetch_many, batch_window, batch_max_size
+        )
+
+        self._init_events()
+
+    def _init_events(self):
+        async def on_user_changed(payload: dict):
+            data: dict | None = payload.get("data", None)
+            if data is None or data.get("id") is None:
+                return
+
+            await self.invalidate(data["id"])
+
+        BroadcastEmitter.on(Events.UserDeleted, on_user_changed)
+        BroadcastEmitter.on(Events.UserBanned, on_user_changed)
+
+    async def _fetch_many(
+        self, user_ids: frozenset[int]
+    ) -> dict[int, ExternalUserDto]:
+        users = await self.upstream.get_user_info_many(user_ids)
+        return {user.id: user for user in users}
+
+    async def _load_user_info(self, user_id: int) -> ExternalUserDto:
+        user = await self._batcher.load(user_id)
+        if user is None:
+            raise UserDoesNotExistException()
+
+        await self._users.set(user_id, user)
+        return user
+
+    async def get_user_info(self, user_id: int) -> ExternalUserDto:
+        user = await self._users.get(user_id)
+        if user is not None:
+            return user
+
+        return await self._single_flight.do(
+            user_id, lambda: self._load_user_info(user_id)
+        )
+
+    async def get_user_info_many(
+        self, user_ids: frozenset[int]
+    ) -> list[ExternalUserDto]:
+        cached = await self._users.get_many(user_ids)
+        users = list(cached.values())
+        missing = user_ids - cached.keys()
+
+        if missing:
+            fetched = await self.upstream.get_user_info_many(frozenset(missing))
+            for user in fetched:
+                await self._users.set(user.id, user)
+            users.extend(fetched)
+
+        return users
+
+    async def invalidate(self, user_id: int) -> None:
+        await self._users.delete(user_id)
+
+    def get_cache_stats(self) -> dict[str, int] | None:
+        return {
+            **self._users.stats(),
+            **self._batcher.stats(),
+            "coalesced": self._single_flight.coalesced,
+        }
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal
 
 
 class HackathonServiceSettings(BaseSettings):
@@ -16,13 +17,69 @@ class HackathonServiceSettings(BaseSettings):
     TEAM_SERVICE_API_KEY: str
 
     S3_ENDPOINT: str
+    # адрес S3, доступный клиентам снаружи кластера: для него
+    # подписываются прямые ссылки. Пустой - используется S3_ENDPOINT
+    S3_PUBLIC_ENDPOINT: str = ""
     S3_ACCESS_KEY: str
     S3_SECRET_KEY: str
+    S3_MAX_WORKERS: int = 16
+    S3_MULTIPART_CHUNK_SIZE: int = 8 * 1024 * 1024
+    S3_MULTIPART_CONCURRENCY: int = 4
+    MAX_UPLOAD_SIZE: int = 100 * 1024 * 1024
+    S3_PRESIGNED_LINKS: bool = False
+    S3_PRESIGNED_LINK_TTL: int = 3600
 
     JWT_SECRET: str = "dstu"
+    JWT_BACKEND: Literal["jose", "pyjwt"] = "jose"
+    JWT_ALGORITHMS: list[str] = ["HS256"]
+    JWT_CACHE_TTL: float = 60.0
+    JWT_CACHE_MAX_SIZE: int = 10000
     ROOT_PATH: str = ""
     INTERNAL_API_KEY: str = "apikey"
     PUBLIC_API_URL: str = "http://localhost/hackathon/"
 
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
+    USER_SERVICE_TIMEOUT: float = 5.0
+    TEAM_SERVICE_TIMEOUT: float = 5.0
+    USER_SERVICE_BULK_TIMEOUT: float = 10.0
+    TEAM_SERVICE_BULK_TIMEOUT: float = 10.0
+    UPSTREAM_RETRY_ATTEMPTS: int = 2
+    UPSTREAM_RETRY_BACKOFF_BASE: float = 0.05
+    UPSTREAM_RETRY_BACKOFF_CAP: float = 1.0
+    UPSTREAM_RETRY_BUDGET_RATIO: float = 0.2
+    UPSTREAM_RETRY_BUDGET_MIN: int = 10
+    UPSTREAM_BREAKER_FAILURE_THRESHOLD: int = 5
+    UPSTREAM_BREAKER_RESET_TIMEOUT: float = 30.0
+    UPSTREAM_HEDGE_DELAY: float = 0.0
+    DETAILED_HACKATHON_BRANCH_TIMEOUT: float = 5.0
+    HACKATHON_TIMELINE_CACHE_TTL: float = 60.0
+    USER_CACHE_TTL: float = 300.0
+    USER_BATCH_WINDOW: float = 0.005
+    USER_BATCH_MAX_SIZE: int = 100
+    TEAM_CACHE_TTL: float = 30.0
+    JUDGE_INDEX_TTL: float = 300.0
+    JUDGE_INDEX_MAX_SIZE: int = 1000
+    EVENT_PREFETCH_COUNT: int = 64
+    EVENT_WORKERS: int = 8
+    EVENT_DEAD_LETTER_EXCHANGE: str = "events.dead"
+    EVENT_BATCH_WINDOW: float = 0.05
+    EVENT_BATCH_MAX_SIZE: int = 500
+    EVENT_PUBLISHER_CHANNELS: int = 4
+    EVENT_PUBLISHER_CONFIRMS: bool = True
+    EVENT_PUBLISHER_BATCH_SIZE: int = 100
+    EVENT_PUBLISHER_BUFFER_SIZE: int = 10000
+    EVENT_PUBLISHER_RETRY_INTERVAL: float = 1.0
+    EVENT_PUBLISHER_PUBLISH_TIMEOUT: float = 1.0
+    EVENT_OUTBOX_BATCH_SIZE: int = 100
+    EVENT_OUTBOX_POLL_INTERVAL: float = 0.5
+    EVENT_OUTBOX_LEASE: float = 30.0
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    CACHE_MAX_SIZE: int = 10000
+    REDIS_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_TTL: float = 10.0
+
 
 Settings = HackathonServiceSettings()
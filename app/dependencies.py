@@ -7,14 +7,22 @@ from app.services.hackathon_teams.service import HackathonTeamsService
 from app.services.hackathon.interface import IHackathonService
 from app.services.hackathon.service import HackathonService
 from app.ports.event_publisher import IEventPublisherPort
+from app.adapters.userservice.cached import CachedUserServiceAdapter
+from app.adapters.teamservice.cached import CachedTeamServiceAdapter
 from app.adapters.userservice import UserServiceAdapter
 from app.adapters.teamservice import TeamServiceAdapter
 from app.ports.event_consumer import IEventConsumerPort
 from app.services.judge.interface import IJudgeService
 from app.services.judge.service import JudgeService
 from app.ports.teamservice import ITeamServicePort
+from app.events.outbox import OutboxRelay
 from app.ports.userservice import IUserServicePort
+from app.adapters.cache.memory import InMemoryCacheAdapter
+from app.adapters.cache.redis import RedisCacheAdapter
+from app.adapters.resilience import max_request_duration
 from app.adapters.storage import S3StorageAdapter
+from app.ports.cache import ICachePort
+from app.util.http_cache import ResponseCache
 from app.ports.storage import IStoragePort
 from functools import lru_cache
 from app.config import Settings
@@ -22,8 +30,16 @@ from fastapi import Depends
 import httpx
 
 
-async def get_http_client():
-    return httpx.AsyncClient()
+@lru_cache
+def get_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=Settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=Settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=Settings.HTTP2_ENABLED,
+    )
 
 
 @lru_cache
@@ -31,6 +47,11 @@ def get_event_publisher() -> IEventPublisherPort:
     return AioPikaEventPublisherAdapter(Settings.RABBITMQ_URL, "events")
 
 
+@lru_cache
+def get_outbox_relay() -> OutboxRelay:
+    return OutboxRelay(get_event_publisher())
+
+
 @lru_cache
 def get_event_consumer() -> IEventConsumerPort:
     return AioPikaEventConsumerAdapter(
@@ -39,17 +60,55 @@ def get_event_consumer() -> IEventConsumerPort:
 
 
 @lru_cache
-def get_team_service(
-    client: httpx.AsyncClient = Depends(get_http_client),
-) -> ITeamServicePort:
-    return TeamServiceAdapter(client)
+def get_cache() -> ICachePort:
+    if Settings.CACHE_BACKEND == "redis":
+        return RedisCacheAdapter(Settings.REDIS_URL)
+
+    return InMemoryCacheAdapter(Settings.CACHE_MAX_SIZE)
+
+
+@lru_cache
+def get_team_service() -> ITeamServicePort:
+    return CachedTeamServiceAdapter(
+        TeamServiceAdapter(
+            get_http_client(), timeout=Settings.TEAM_SERVICE_TIMEOUT
+        ),
+        get_cache(),
+        ttl=Settings.TEAM_CACHE_TTL,
+    )
+
+
+@lru_cache
+def get_user_service() -> IUserServicePort:
+    return CachedUserServiceAdapter(
+        UserServiceAdapter(
+            get_http_client(), timeout=Settings.USER_SERVICE_TIMEOUT
+        ),
+        get_cache(),
+        ttl=Settings.USER_CACHE_TTL,
+        batch_window=Settings.USER_BATCH_WINDOW,
+        batch_max_size=Settings.USER_BATCH_MAX_SIZE,
+    )
 
 
 @lru_cache
-def get_user_service(
-    client: httpx.AsyncClient = Depends(get_http_client),
-) -> IUserServicePort:
-    return UserServiceAdapter(client)
+def get_upstream_deadline() -> float:
+    """
+    Время, за которое запрос к сервису пользователей или команд гарантированно
+    завершится: самый долгий таймаут со всеми повторами и паузами.
+    """
+    return max_request_duration(
+        max(
+            Settings.USER_SERVICE_TIMEOUT,
+            Settings.TEAM_SERVICE_TIMEOUT,
+            Settings.USER_SERVICE_BULK_TIMEOUT,
+            Settings.TEAM_SERVICE_BULK_TIMEOUT,
+        ),
+        Settings.UPSTREAM_RETRY_ATTEMPTS,
+        Settings.UPSTREAM_RETRY_BACKOFF_BASE,
+        Settings.UPSTREAM_RETRY_BACKOFF_CAP,
+        Settings.UPSTREAM_HEDGE_DELAY,
+    )
 
 
 @lru_cache
@@ -57,11 +116,18 @@ def get_storage() -> IStoragePort:
     return S3StorageAdapter()
 
 
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(get_cache(), Settings.RESPONSE_CACHE_TTL)
+
+
 @lru_cache
 def get_hackathon_service(
     event_publisher: IEventPublisherPort = Depends(get_event_publisher),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    cache: ICachePort = Depends(get_cache),
 ) -> IHackathonService:
-    return HackathonService(event_publisher)
+    return HackathonService(event_publisher, response_cache, cache)
 
 
 @lru_cache
@@ -91,5 +157,6 @@ def get_hackathon_teams_service(
 @lru_cache
 def get_hackathon_files_service(
     storage: IStoragePort = Depends(get_storage),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ) -> IHackathonFilesService:
-    return HackathonFilesService("hackathons", storage)
+    return HackathonFilesService("hackathons", storage, response_cache)
@@ -1,13 +1,50 @@
 from app.ports.event_consumer import IEventConsumerPort
-from app.events.emitter import Emitter, Events
+from app.events.emitter import (
+    BATCHED_EVENTS,
+    BatchEmitter,
+    BroadcastEmitter,
+    Emitter,
+    Events,
+)
 from asyncio import Task
+import asyncio
 
 
 async def __event_callback(payload: dict):
-    Emitter.emit(payload["event_name"], payload)
+    # обработчики ожидаются напрямую, а не через Emitter.emit: сообщение
+    # подтверждается только после их завершения, а ошибка отправляет его
+    # в очередь недоставленных
+    listeners = Emitter.listeners(payload["event_name"])
+    await asyncio.gather(*(listener(payload) for listener in listeners))
 
 
-async def register_events(consumer: IEventConsumerPort) -> Task:
-    return await consumer.create_consuming_loop(
-        [e.value for e in Events], __event_callback
-    )
+async def __batch_callback(payloads: list[dict]):
+    by_event: dict[str, list[dict]] = {}
+    for payload in payloads:
+        by_event.setdefault(payload["event_name"], []).append(payload)
+
+    for event_name, event_payloads in by_event.items():
+        listeners = BatchEmitter.listeners(event_name)
+        await asyncio.gather(
+            *(listener(event_payloads) for listener in listeners)
+        )
+
+
+async def __broadcast_callback(payload: dict):
+    listeners = BroadcastEmitter.listeners(payload["event_name"])
+    await asyncio.gather(*(listener(payload) for listener in listeners))
+
+
+async def register_events(consumer: IEventConsumerPort) -> list[Task]:
+    routing_keys = [e.value for e in Events]
+    return [
+        await consumer.create_consuming_loop(
+            routing_keys,
+            __event_callback,
+            batch_routing_keys=BATCHED_EVENTS,
+            batch_handler=__batch_callback,
+        ),
+        await consumer.create_broadcast_loop(
+            routing_keys, __broadcast_callback
+        ),
+    ]
@@ -7,6 +7,17 @@ class Events(StrEnum):
     UserDeleted = "user.deleted"
     TeamHackathonTeamDeleted = "team.hackathon_team_deleted"
     HackathonDeleted = "hackathon.deleted"
+    HackathonUpdated = "hackathon.updated"
+    HackathonJudgesChanged = "hackathon.judges_changed"
 
 
+# обработчики, которые меняют общие данные: каждое событие получает
+# только один экземпляр сервиса
 Emitter = AsyncIOEventEmitter()
+# обработчики пакетов событий: получают список payload одного события.
+# Используются для событий, которые приходят пачками
+BatchEmitter = AsyncIOEventEmitter()
+BATCHED_EVENTS = frozenset((Events.UserDeleted, Events.UserBanned))
+# обработчики локального состояния (кешей): каждое событие получают все
+# экземпляры сервиса
+BroadcastEmitter = AsyncIOEventEmitter()
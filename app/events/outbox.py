@@ -0,0 +1,105 @@
+from app.ports.event_publisher import IEventPublisherPort
+from app.ports.event_publisher.dto import EventPayload
+from tortoise.transactions import in_transaction
+from app.models.outbox import OutboxEventModel
+from datetime import datetime, timedelta, timezone
+from tortoise.expressions import Q
+from pydantic import BaseModel
+from app.config import Settings
+from uuid import uuid4
+import asyncio
+
+
+async def add_outbox_event(event_name: str, data: BaseModel) -> None:
+    """
+    Записывает событие в outbox. Должна вызываться внутри транзакции,
+    которая меняет состояние, чтобы событие и изменение сохранялись
+    вместе.
+    """
+    await OutboxEventModel.create(
+        event_id=uuid4(),
+        event_name=event_name,
+        data=data.model_dump(mode="json"),
+    )
+
+
+class OutboxRelay:
+    """
+    Фоновая задача, которая пакетами переносит события из outbox в
+    брокер. Пакет захватывается короткой транзакцией: строки помечаются
+    арендованными на `lease` секунд, после чего публикация идет уже без
+    открытой транзакции и блокировок. Строки удаляются только после
+    подтверждения публикации, поэтому доставка - "хотя бы один раз":
+    если экземпляр упал или не успел за время аренды, события заберет
+    другой. SKIP LOCKED позволяет нескольким экземплярам сервиса
+    разбирать outbox одновременно.
+    """
+
+    def __init__(
+        self,
+        event_publisher: IEventPublisherPort,
+        batch_size: int = Settings.EVENT_OUTBOX_BATCH_SIZE,
+        poll_interval: float = Settings.EVENT_OUTBOX_POLL_INTERVAL,
+        lease: float = Settings.EVENT_OUTBOX_LEASE,
+    ):
+        self.event_publisher = event_publisher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+
+    async def _claim_batch(self) -> list[OutboxEventModel]:
+        now = datetime.now(timezone.utc)
+        async with in_transaction():
+            events = (
+                await OutboxEventModel.select_for_update(skip_locked=True)
+                .filter(Q(claimed_until=None) | Q(claimed_until__lt=now))
+                .order_by("id")
+                .limit(self.batch_size)
+            )
+            if events:
+                await OutboxEventModel.filter(
+                    id__in=[event.id for event in events]
+                ).update(claimed_until=now + timedelta(seconds=self.lease))
+
+        return events
+
+    async def relay_batch(self) -> int:
+        events = await self._claim_batch()
+        if not events:
+            return 0
+
+        # не дольше аренды: после нее события может забрать другой
+        # экземпляр, и удалять их здесь уже нельзя
+        await asyncio.wait_for(
+            self.event_publisher.publish_batch(
+                [
+                    EventPayload(
+                        event_id=event.event_id,
+                        event_name=event.event_name,
+                        data=event.data,
+                    )
+                    for event in events
+                ]
+            ),
+            self.lease,
+        )
+        await OutboxEventModel.filter(
+            id__in=[event.id for event in events]
+        ).delete()
+
+        return len(events)
+
+    async def run(self):
+        while True:
+            try:
+                relayed = await self.relay_batch()
+            except Exception as e:
+                print("Error during relaying outbox events: ", e)
+                relayed = 0
+
+            # полный пакет - в outbox, вероятно, есть еще события
+            if relayed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> asyncio.Task:
+        return asyncio.create_task(self.run())
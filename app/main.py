@@ -1,27 +1,50 @@
-from app.dependencies import get_event_consumer, get_event_publisher
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from app.events import register_events
 from app.routers import main_router
 from app.config import Settings
 from fastapi import FastAPI
 from app.db import init_db
+import asyncio
+
+from app.util.body_limit import (
+    BodySizeLimitMiddleware,
+    MULTIPART_OVERHEAD,
+)
+
+from app.dependencies import (
+    get_event_consumer,
+    get_event_publisher,
+    get_outbox_relay,
+    get_http_client,
+    get_cache,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     consumer = get_event_consumer()
     publisher = get_event_publisher()
+    http_client = get_http_client()
+    cache = get_cache()
 
+    await cache.connect()
     await consumer.connect()
     await publisher.connect()
 
-    task = await register_events(consumer)
+    tasks = await register_events(consumer)
+    relay_task = get_outbox_relay().start()
 
     yield
 
-    task.cancel()
-    await task
+    for background_task in (relay_task, *tasks):
+        background_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await background_task
+
+    await publisher.close()
+    await cache.close()
+    await http_client.aclose()
 
 
 app = FastAPI(
@@ -37,6 +60,11 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=Settings.MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
 )
 
 app.include_router(main_router)
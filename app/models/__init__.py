@@ -1 +1,2 @@
 from .hackathon import *
+from .outbox import *
@@ -1,5 +1,6 @@
 from tortoise.exceptions import ValidationError
 from tortoise.signals import pre_save
+from tortoise.indexes import Index
 from tortoise.models import Model
 from tortoise import fields
 
@@ -27,6 +28,10 @@ class HackathonModel(Model):
 
     class Meta:
         table: str = "hackathons"
+        indexes = (
+            Index(fields=("start_date", "id"), name="idx_hackathons_start"),
+            Index(fields=("end_date",), name="idx_hackathons_end"),
+        )
 
 
 class HackathonDocumentModel(Model):
@@ -100,11 +105,28 @@ class HackathonTeamScore(Model):
 
 class HackathonTeamFinalScore(Model):
     id = fields.IntField(pk=True)
+    hackathon: fields.ForeignKeyRelation[HackathonModel] = (
+        fields.ForeignKeyField(
+            "models.HackathonModel", related_name="final_scores"
+        )
+    )
     team_id = fields.IntField(unique=True)
     score = fields.FloatField()
+    # накопительные значения для инкрементального пересчета:
+    # score = weighted_sum / judge_count
+    weighted_sum = fields.FloatField(default=0)
+    judge_count = fields.IntField(default=0)
 
     class Meta:
         table = "team_final_scores"
+        # таблица лидеров: WHERE hackathon_id = ? ORDER BY score DESC.
+        # Порядок DESC обеспечивается обратным проходом по индексу
+        indexes = (
+            Index(
+                fields=("hackathon_id", "score"),
+                name="idx_team_final_scores_leaderboard",
+            ),
+        )
 
 
 @pre_save(HackathonModel)
@@ -0,0 +1,20 @@
+from tortoise.models import Model
+from tortoise import fields
+
+
+class OutboxEventModel(Model):
+    """
+    Событие, записанное в той же транзакции, что и изменение состояния.
+    Удаляется после того, как брокер подтвердил публикацию.
+    """
+
+    id = fields.BigIntField(pk=True)
+    event_id = fields.UUIDField()
+    event_name = fields.CharField(max_length=100)
+    data = fields.JSONField()
+    created_at = fields.DatetimeField(auto_now_add=True)
+    # до этого момента событие публикует захвативший его экземпляр
+    claimed_until = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = "event_outbox"
@@ -0,0 +1,16 @@
+from typing import Callable, Iterable, Protocol, Sequence
+
+
+class ICachePort(Protocol):
+    async def connect(self) -> None: ...
+    async def close(self) -> None: ...
+    async def get(self, key: str) -> bytes | None: ...
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]: ...
+    async def set(
+        self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()
+    ) -> None: ...
+    async def delete(self, key: str) -> None: ...
+    async def invalidate_tags(self, *tags: str) -> None: ...
+    def on_invalidate(
+        self, callback: Callable[[tuple[str, ...]], None]
+    ) -> None: ...
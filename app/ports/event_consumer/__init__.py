@@ -1,4 +1,4 @@
-from typing import Awaitable, Callable, Protocol
+from typing import Awaitable, Callable, Collection, Hashable, Protocol
 import asyncio
 
 
@@ -8,4 +8,13 @@ class IEventConsumerPort(Protocol):
         self,
         routing_keys: list[str],
         handler: Callable[[dict], Awaitable[None]],
+        ordering_key: Callable[[dict], Hashable] = ...,
+        batch_routing_keys: Collection[str] = (),
+        batch_handler: Callable[[list[dict]], Awaitable[None]] | None = None,
+    ) -> asyncio.Task: ...
+    def get_batch_stats(self) -> dict[str, float]: ...
+    async def create_broadcast_loop(
+        self,
+        routing_keys: list[str],
+        handler: Callable[[dict], Awaitable[None]],
     ) -> asyncio.Task: ...
@@ -6,3 +6,11 @@ class EventPublisherNotConnectedException(HTTPException):
         super().__init__(
             status_code=501, detail="Подключение к сервису очередей недоступно!"
         )
+
+
+class EventPublisherBufferFullException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Сервис очередей перегружен, событие не было отправлено!",
+        )
@@ -1,13 +1,19 @@
-from typing import Protocol
-import io
+from typing import AsyncIterator, BinaryIO, Protocol
 
 
 class IStoragePort(Protocol):
-    def upload_jpeg(self, buf: io.BytesIO, bucket: str, key: str) -> None: ...
-    def upload_file(
-        self, buf: io.BytesIO, bucket: str, key: str, content_type: str
+    async def upload_file(
+        self, buf: BinaryIO, bucket: str, key: str, content_type: str
     ) -> None: ...
-    def get_object(self, bucket: str, key: str) -> dict: ...
-    def delete_object(self, bucket: str, key: str) -> None: ...
-    def object_exists(self, bucket: str, key: str) -> bool: ...
-    def ensure_bucket(self, bucket: str) -> None: ...
+    async def get_object(self, bucket: str, key: str) -> dict: ...
+    def iter_object_body(
+        self, body, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]: ...
+    def generate_presigned_url(
+        self,
+        bucket: str,
+        key: str,
+        expires_in: int,
+        filename: str | None = None,
+    ) -> str: ...
+    async def delete_object(self, bucket: str, key: str) -> None: ...
@@ -48,3 +48,6 @@ class ITeamServicePort(Protocol):
 
     async def get_team_exists(self, team_id: int) -> bool:
         return await self.try_get_team_info(team_id) is not None
+
+    def get_cache_stats(self) -> dict[str, int] | None:
+        return None
@@ -41,3 +41,6 @@ class IUserServicePort(Protocol):
             return await self.get_user_info_many(user_ids)
         except UserServiceError:
             return []
+
+    def get_cache_stats(self) -> dict[str, int] | None:
+        return None
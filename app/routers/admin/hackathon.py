@@ -9,7 +9,6 @@ from app.acl.permissions import Permissions
 from app.config import Settings
 from os import environ
 from uuid import uuid4
-import io
 
 from app.services.hackathon.dto import (
     OptionalHackathonDto,
@@ -162,11 +161,12 @@ async def add_hackathon_file(
     ),
 ):
     """
-    Добавляет файл во вложения хакатона. Разрешенные форматы: doc, docx, ppt, pptx, txt
+    Добавляет файл во вложения хакатона. Разрешенные форматы: doc, docx, ppt, pptx, txt.
+    Размер файла ограничен настройкой MAX_UPLOAD_SIZE.
     """
     return await hackathon_files_service.upload_allowed_file(
         hackathon_id,
-        io.BytesIO(await file.read()),
+        file.file,
         file.filename or str(uuid4()),
     )
 
@@ -1,11 +1,11 @@
-from typing import cast
+from typing import Annotated, cast
 from app.services.hackathon_teams.dto import HackathonTeamScoreDto
 from app.ports.teamservice.dto import HackathonTeamWithMatesDto
 from app.dependencies import get_hackathon_teams_service
-from app.services.auth.dto import AccessJWTPayloadDto
-from app.services.auth import PermittedAction
+from app.services.auth.dto import AccessJWTPayloadDto, HackathonJudgePayloadDto
+from app.services.auth import HackathonJudgeAction, PermittedAction
 from app.acl.permissions import Permissions
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends
 
 from app.routers.admin.dto import CriterionScoreDto
 from app.services.hackathon_teams.interface import IHackathonTeamsService
@@ -88,9 +88,9 @@ async def get_hackathon_team_score_by_user(
 async def set_hackathon_team_score(
     hackathon_id: int,
     team_id: int,
-    dtos: list[CriterionScoreDto],
-    judge_user_dto: AccessJWTPayloadDto = Depends(
-        PermittedAction(Permissions.CreateTeamScore)
+    dtos: Annotated[list[CriterionScoreDto], Body(min_length=1)],
+    judge_user_dto: HackathonJudgePayloadDto = Depends(
+        HackathonJudgeAction(Permissions.CreateTeamScore)
     ),
     hackathon_teams_service: IHackathonTeamsService = Depends(
         get_hackathon_teams_service
@@ -98,18 +98,12 @@ async def set_hackathon_team_score(
 ):
     """
     Устанавливает оценку от лица жюри (текущего пользователя) по заданным критериям.
+    Все оценки сохраняются одной транзакцией: либо все, либо ни одной.
     """
-    scores: list[HackathonTeamScoreDto] = []
-
-    for dto in dtos:
-        scores.append(
-            await hackathon_teams_service.set_score(
-                hackathon_id,
-                team_id,
-                judge_user_dto.user_id,
-                dto.criterion_id,
-                dto.score,
-            )
-        )
-
-    return scores
+    return await hackathon_teams_service.set_scores_bulk(
+        hackathon_id,
+        team_id,
+        judge_user_dto.judge_id,
+        judge_user_dto.user_id,
+        [(dto.criterion_id, dto.score) for dto in dtos],
+    )
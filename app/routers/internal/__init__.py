@@ -1,13 +1,50 @@
 from app.services.hackathon.interface import IHackathonService
-from app.dependencies import get_hackathon_service
+from app.services.judge.interface import IJudgeService
+from app.services.hackathon.dto import HackathonTimelineDto
+from fastapi import APIRouter, Depends, Response
+from app.ports.teamservice import ITeamServicePort
+from app.util.http_cache import ResponseCache
+from app.ports.userservice import IUserServicePort
+from app.ports.event_consumer import IEventConsumerPort
+from app.services.auth import get_token_cache_stats
+
+from app.dependencies import (
+    get_hackathon_service,
+    get_response_cache,
+    get_event_consumer,
+    get_judge_service,
+    get_team_service,
+    get_user_service,
+)
 from .auth import get_token_from_header
-from fastapi import APIRouter, Depends
+
+# максимальное время, на которое вызывающему сервису разрешается
+# закешировать ответ, даже если до смены этапа еще далеко
+MAX_DECISION_CACHE_SECONDS = 300
 
 router = APIRouter(
     tags=["Internal"], prefix="/internal", include_in_schema=False
 )
 
 
+def set_decision_validity(
+    response: Response, timeline: HackathonTimelineDto
+) -> None:
+    """
+    Подсказывает вызывающей стороне, до какого момента можно кешировать
+    результат проверки: он меняется только на границе этапов хакатона.
+    """
+    now = timeline.now()
+    boundary = timeline.next_boundary(now)
+
+    max_age = MAX_DECISION_CACHE_SECONDS
+    if boundary is not None:
+        max_age = min(max_age, int((boundary - now).total_seconds()))
+        response.headers["X-Valid-Until"] = boundary.isoformat()
+
+    response.headers["Cache-Control"] = f"private, max-age={max_age}"
+
+
 @router.get("/{id}")
 async def get_by_hackathon_id(
     id: int,
@@ -29,16 +66,47 @@ async def get_info_many(
 @router.get("/{id}/can-edit-team-registry")
 async def get_can_edit_team_registry(
     id: int,
+    response: Response,
     _: str = Depends(get_token_from_header),
     service: IHackathonService = Depends(get_hackathon_service),
 ):
-    return await service.can_edit_team_registry(id)
+    result = await service.can_edit_team_registry(id)
+    set_decision_validity(response, await service.get_timeline(id))
+    return result
 
 
 @router.get("/{id}/can-upload-submissions")
 async def get_can_upload_submissions(
     id: int,
+    response: Response,
     _: str = Depends(get_token_from_header),
     service: IHackathonService = Depends(get_hackathon_service),
 ):
-    return await service.can_upload_submissions(id)
+    result = await service.can_upload_submissions(id)
+    set_decision_validity(response, await service.get_timeline(id))
+    return result
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    _: str = Depends(get_token_from_header),
+    user_service: IUserServicePort = Depends(get_user_service),
+    team_service: ITeamServicePort = Depends(get_team_service),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    judge_service: IJudgeService = Depends(get_judge_service),
+):
+    return {
+        "users": user_service.get_cache_stats(),
+        "teams": team_service.get_cache_stats(),
+        "responses": response_cache.stats(),
+        "tokens": get_token_cache_stats(),
+        "judges": judge_service.get_judge_index_stats(),
+    }
+
+
+@router.get("/events/stats")
+async def get_event_stats(
+    _: str = Depends(get_token_from_header),
+    event_consumer: IEventConsumerPort = Depends(get_event_consumer),
+):
+    return {"batches": event_consumer.get_batch_stats()}
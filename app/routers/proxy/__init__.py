@@ -21,10 +21,10 @@ async def download_hack_document(
 ):
     s3_key = await hackathon_files_service.get_doc_s3_key(document_id)
     try:
-        s3_obj = s3_service.get_object("hackathons", s3_key)
+        s3_obj = await s3_service.get_object("hackathons", s3_key)
 
         return StreamingResponse(
-            s3_obj["Body"],
+            s3_service.iter_object_body(s3_obj["Body"]),
             media_type=s3_obj["ContentType"],
             headers={
                 "Content-Disposition": f'attachment; filename="{quote(filename)}"'
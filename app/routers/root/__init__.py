@@ -1,4 +1,6 @@
-from app.services.hackathon.dto import CriterionDto, HackathonDto, TeamScoreDto
+from app.services.hackathon.dto import HackathonDto, HackathonPhase
+from app.services.hackathon.dto import HackathonSummaryDto
+from app.services.hackathon.dto import CriterionDto, TeamScoreDto
 from app.services.hackathon_teams.interface import IHackathonTeamsService
 from app.services.hackathon_files.interface import IHackathonFilesService
 from app.services.hackathon_files.dto import HackathonDocumentWithLinkDto
@@ -6,32 +8,69 @@ from app.services.hackathon.interface import IHackathonService
 from app.ports.teamservice.dto import HackathonTeamDto
 from app.services.judge.interface import IJudgeService
 from app.routers.root.dto import DetailedHackathonDto
-from fastapi import APIRouter, Depends, Request
+from app.util.http_cache import ResponseCache, hackathon_tag, HACKATHONS_TAG
+from fastapi import APIRouter, Depends, Query, Request
+from app.util.fanout import optional_branch
 from app.services.judge.dto import JudgeDto
 from app.config import Settings
+import asyncio
 
 from app.dependencies import (
     get_hackathon_files_service,
     get_hackathon_teams_service,
     get_hackathon_service,
+    get_upstream_deadline,
+    get_response_cache,
     get_judge_service,
 )
 
+DEFAULT_PAGE_SIZE = 50
+
 router = APIRouter(tags=["Основное"], prefix="")
 
 
 @router.get(
     "/",
-    response_model=list[HackathonDto],
+    response_model=list[HackathonDto] | list[HackathonSummaryDto],
     summary="Список всех хакатонов",
 )
 async def get_all(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=200),
+    cursor: str | None = Query(None),
+    phase: HackathonPhase | None = Query(None),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    view: str = Query("full", pattern="^(full|summary)$"),
     hackathon_service: IHackathonService = Depends(get_hackathon_service),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
     """
-    Возвращает список всех зарегистрированных хакатонов. О каждом хакатоне предоставляется только общая информация.
+    Возвращает список зарегистрированных хакатонов, отсортированный по дате начала. О каждом хакатоне предоставляется только общая информация.
+    Без `limit` и `cursor` возвращается весь список. С ними выдача постраничная (по умолчанию 50 хакатонов на странице): если есть следующая страница, курсор для нее возвращается в заголовке `X-Next-Cursor` и передается в параметре `cursor`.
+    Параметр `phase` оставляет только хакатоны в указанном этапе: `upcoming`, `active`, `judging` или `finished`.
+    С `view=summary` возвращается краткая информация без описания.
     """
-    return await hackathon_service.get_all()
+
+    if cursor is not None and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+
+    async def compute():
+        page = await hackathon_service.get_all(
+            limit,
+            cursor,
+            phase,
+            descending=order == "desc",
+            summary=view == "summary",
+        )
+        headers = {}
+        if page.next_cursor is not None:
+            headers["X-Next-Cursor"] = page.next_cursor
+
+        return page.items, headers
+
+    return await response_cache.respond_with_headers(
+        request, (HACKATHONS_TAG,), compute
+    )
 
 
 @router.get(
@@ -50,21 +89,74 @@ async def get_by_id(
     files_service: IHackathonFilesService = Depends(
         get_hackathon_files_service
     ),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Возвращает полную информацию о хакатоне. Помимо общей информации (как в `GET /`), здесь перечислены все команды-участники.
     По сути является комбинацией `GET /` и `GET /{hackathon_id}/teams`.
+    Разделы запрашиваются параллельно; если какой-то из них не удалось получить вовремя, он возвращается пустым и перечисляется в `unavailable`.
     """
-    hack_data = await hackathon_service.get_full_info(hackathon_id)
-    teams = await hackathon_teams_service.get_by_hackathon(hackathon_id)
-    judges = await judges_service.get_judges(hackathon_id)
-    uploads = await files_service.get_files(
-        hackathon_id,
-        Settings.PUBLIC_API_URL or str(request.base_url).rstrip("/"),
+    # ветка не должна отменяться раньше, чем клиент внешнего сервиса
+    # исчерпает попытки: иначе отмена прерывает запрос на полпути
+    timeout = max(
+        Settings.DETAILED_HACKATHON_BRANCH_TIMEOUT, get_upstream_deadline()
     )
+    base_url = Settings.PUBLIC_API_URL or str(request.base_url).rstrip("/")
+
+    async def compute():
+        try:
+            async with asyncio.TaskGroup() as group:
+                hack_task = group.create_task(
+                    hackathon_service.get_full_info(hackathon_id)
+                )
+                teams_task = group.create_task(
+                    optional_branch(
+                        hackathon_teams_service.get_by_hackathon(hackathon_id),
+                        [],
+                        timeout,
+                    )
+                )
+                judges_task = group.create_task(
+                    optional_branch(
+                        judges_service.get_judges(hackathon_id), [], timeout
+                    )
+                )
+                uploads_task = group.create_task(
+                    optional_branch(
+                        files_service.get_files(hackathon_id, base_url),
+                        [],
+                        timeout,
+                    )
+                )
+        except* Exception as errors:
+            # необязательные ветки не бросают исключений, поэтому здесь
+            # может оказаться только ошибка получения самого хакатона
+            raise errors.exceptions[0]
 
-    return DetailedHackathonDto(
-        teams=teams, judges=judges, uploads=uploads, **hack_data.model_dump()
+        hack_data = hack_task.result()
+        branches = {
+            "teams": teams_task.result(),
+            "judges": judges_task.result(),
+            "uploads": uploads_task.result(),
+        }
+
+        return DetailedHackathonDto(
+            **hack_data.model_dump(),
+            **{name: branch.value for name, branch in branches.items()},
+            unavailable=[
+                name
+                for name, branch in branches.items()
+                if not branch.available
+            ],
+        )
+
+    # частичный ответ не кешируется, чтобы не закрепить недоступность
+    # внешнего сервиса на весь TTL
+    return await response_cache.respond(
+        request,
+        (hackathon_tag(hackathon_id),),
+        compute,
+        cacheable=lambda dto: not dto.unavailable,
     )
 
 
@@ -92,15 +184,26 @@ async def get_teams(
 )
 async def get_result_scores(
     hackathon_id: int,
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     hackathon_teams_service: IHackathonTeamsService = Depends(
         get_hackathon_teams_service
     ),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Возвращает таблицу лидеров хакатона (отсортированный список команд по оценкам).
     Если дата окончания хакатона еще не наступила, то вернет 400.
+    Параметры `limit` и `offset` позволяют получить топ-N или страницу таблицы.
     """
-    return await hackathon_teams_service.get_result_scores(hackathon_id)
+    return await response_cache.respond(
+        request,
+        (hackathon_tag(hackathon_id),),
+        lambda: hackathon_teams_service.get_result_scores(
+            hackathon_id, limit, offset
+        ),
+    )
 
 
 @router.get(
@@ -110,12 +213,18 @@ async def get_result_scores(
 )
 async def get_criteria(
     hackathon_id: int,
+    request: Request,
     hackathon_service: IHackathonService = Depends(get_hackathon_service),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Возвращает список критериев оценивания хакатона.
     """
-    return await hackathon_service.get_criteria(hackathon_id)
+    return await response_cache.respond(
+        request,
+        (hackathon_tag(hackathon_id),),
+        lambda: hackathon_service.get_criteria(hackathon_id),
+    )
 
 
 @router.get(
@@ -125,12 +234,18 @@ async def get_criteria(
 )
 async def get_judges(
     hackathon_id: int,
+    request: Request,
     judges_service: IJudgeService = Depends(get_judge_service),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Возвращает список судей хакатона.
     """
-    return await judges_service.get_judges(hackathon_id)
+    return await response_cache.respond(
+        request,
+        (hackathon_tag(hackathon_id),),
+        lambda: judges_service.get_judges(hackathon_id),
+    )
 
 
 @router.get(
@@ -144,11 +259,16 @@ async def get_uploads(
     files_service: IHackathonFilesService = Depends(
         get_hackathon_files_service
     ),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Возвращает список вложений хакатона
     """
-    return await files_service.get_files(
-        hackathon_id,
-        Settings.PUBLIC_API_URL or str(request.base_url).rstrip("/"),
+    return await response_cache.respond(
+        request,
+        (hackathon_tag(hackathon_id),),
+        lambda: files_service.get_files(
+            hackathon_id,
+            Settings.PUBLIC_API_URL or str(request.base_url).rstrip("/"),
+        ),
     )
@@ -8,3 +8,5 @@ class DetailedHackathonDto(FullHackathonDto):
     teams: list[HackathonTeamDto]
     judges: list[JudgeDto]
     uploads: list[HackathonDocumentWithLinkDto]
+    # разделы, которые не удалось получить вовремя (teams, judges, uploads)
+    unavailable: list[str] = []
@@ -1,21 +1,26 @@
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.acl.permissions import PermissionAcl, perform_check
-from app.services.auth.dto import AccessJWTPayloadDto
+from app.acl.permissions import PermissionAcl, compile_acl
+from app.services.auth.dto import AccessJWTPayloadDto, HackathonJudgePayloadDto
+from app.services.judge.interface import IJudgeService
+from app.dependencies import get_judge_service
 from jose import ExpiredSignatureError, JWTError, jwt
+from typing import Annotated, Any, Callable
+from app.util.cache import TTLCache
+from app.config import Settings
 from pydantic import BaseModel
-from typing import Annotated
 from fastapi import Depends
 from os import environ
-
+import jwt as pyjwt
+import time
 
 from .exceptions import (
     InvalidTokenException,
     RestrictedPermissionException,
+    NotHackathonJudgeException,
     JWTParseErrorException,
     TokenExpiredException,
 )
 
-
 JWT_SECRET = environ.get("JWT_SECRET", "dstu")
 SECURITY_SCHEME = HTTPBearer(auto_error=False)
 
@@ -25,6 +30,46 @@ class UserJWTDto(BaseModel):
     refresh_token: str
 
 
+def _decode_jose(token: str) -> dict[str, Any]:
+    try:
+        return jwt.decode(token, JWT_SECRET, algorithms=Settings.JWT_ALGORITHMS)
+    except ExpiredSignatureError:
+        raise TokenExpiredException()
+    except JWTError:
+        raise JWTParseErrorException()
+
+
+def _decode_pyjwt(token: str) -> dict[str, Any]:
+    try:
+        return pyjwt.decode(
+            token, JWT_SECRET, algorithms=Settings.JWT_ALGORITHMS
+        )
+    except pyjwt.ExpiredSignatureError:
+        raise TokenExpiredException()
+    except pyjwt.InvalidTokenError:
+        raise JWTParseErrorException()
+
+
+def _get_decoder() -> Callable[[str], dict[str, Any]]:
+    if Settings.JWT_BACKEND == "pyjwt":
+        return _decode_pyjwt
+
+    return _decode_jose
+
+
+_decode_token = _get_decoder()
+
+# Проверенные токены -> payload. Запись живет не дольше самого токена,
+# поэтому просроченный токен из кеша не будет принят
+_token_cache: TTLCache[str, AccessJWTPayloadDto] = TTLCache(
+    Settings.JWT_CACHE_TTL, Settings.JWT_CACHE_MAX_SIZE
+)
+
+
+def get_token_cache_stats() -> dict[str, int]:
+    return _token_cache.stats()
+
+
 def get_token_from_header(
     credentials: HTTPAuthorizationCredentials = Depends(SECURITY_SCHEME),
 ) -> str:
@@ -36,25 +81,59 @@ def get_token_from_header(
 async def get_user_dto(
     token: str = Depends(get_token_from_header),
 ) -> AccessJWTPayloadDto:
+    user_dto = _token_cache.get(token)
+    if user_dto is not None:
+        return user_dto
+
     try:
-        raw_payload = jwt.decode(token, JWT_SECRET)
-        return AccessJWTPayloadDto(**raw_payload)
-    except ExpiredSignatureError:
-        raise TokenExpiredException()
-    except JWTError:
+        user_dto = AccessJWTPayloadDto(**_decode_token(token))
+    except ValueError:
         raise JWTParseErrorException()
 
+    ttl = min(Settings.JWT_CACHE_TTL, user_dto.exp.timestamp() - time.time())
+    if ttl > 0:
+        _token_cache.set(token, user_dto, ttl)
+    return user_dto
+
 
 class PermittedAction:
     acl: PermissionAcl
+    mask: int
 
     def __init__(self, acl: PermissionAcl):
         self.acl = acl
+        self.mask = compile_acl(acl)
 
     def __call__(
         self, user_dto: Annotated[AccessJWTPayloadDto, Depends(get_user_dto)]
     ):
-        if perform_check(self.acl, user_dto.role):
+        if user_dto.roles_mask & self.mask:
             return user_dto
 
         raise RestrictedPermissionException()
+
+
+class HackathonJudgeAction(PermittedAction):
+    """
+    Помимо роли проверяет, что пользователь входит в жюри хакатона из
+    пути запроса. Проверка идет по индексу жюри в памяти, поэтому
+    посторонний судья отклоняется без обращений к БД и другим сервисам.
+    Найденный id судьи возвращается вместе с payload токена.
+    """
+
+    async def __call__(
+        self,
+        hackathon_id: int,
+        user_dto: Annotated[AccessJWTPayloadDto, Depends(get_user_dto)],
+        judge_service: IJudgeService = Depends(get_judge_service),
+    ) -> HackathonJudgePayloadDto:
+        user_dto = super().__call__(user_dto)
+        judge_id = await judge_service.get_judge_id(
+            hackathon_id, user_dto.user_id
+        )
+        if judge_id is None:
+            raise NotHackathonJudgeException()
+
+        return HackathonJudgePayloadDto(
+            **user_dto.model_dump(), judge_id=judge_id
+        )
@@ -1,4 +1,5 @@
-from app.acl.roles import UserRoles
+from app.acl.roles import UserRoles, get_roles_mask
+from functools import cached_property
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -6,4 +7,13 @@ from datetime import datetime
 class AccessJWTPayloadDto(BaseModel):
     user_id: int
     role: UserRoles
+    roles: list[UserRoles] = []
     exp: datetime
+
+    @cached_property
+    def roles_mask(self) -> int:
+        return get_roles_mask(self.role, *self.roles)
+
+
+class HackathonJudgePayloadDto(AccessJWTPayloadDto):
+    judge_id: int
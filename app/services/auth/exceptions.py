@@ -28,3 +28,11 @@ class RestrictedPermissionException(HTTPException):
             status_code=403,
             detail=f"У Вас недостаточно прав для выполнения этого действия!",
         )
+
+
+class NotHackathonJudgeException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=403,
+            detail="Вы не входите в состав жюри этого хакатона!",
+        )
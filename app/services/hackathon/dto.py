@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from enum import StrEnum
 
 from app.models.hackathon import (
     HackathonCriterionModel,
@@ -32,6 +33,41 @@ class HackathonDto(BaseModel):
         )
 
 
+class HackathonPhase(StrEnum):
+    Upcoming = "upcoming"
+    Active = "active"
+    Judging = "judging"
+    Finished = "finished"
+
+
+class HackathonSummaryDto(BaseModel):
+    id: int
+    name: str
+    max_participant_count: int
+    max_team_mates_count: int
+
+    start_date: datetime
+    score_start_date: datetime
+    end_date: datetime
+
+    @staticmethod
+    def from_tortoise(hackathon: HackathonModel):
+        return HackathonSummaryDto(
+            id=hackathon.id,
+            name=hackathon.name,
+            max_participant_count=hackathon.max_participant_count,
+            max_team_mates_count=hackathon.max_team_mates_count,
+            start_date=hackathon.start_date,
+            score_start_date=hackathon.score_start_date,
+            end_date=hackathon.end_date,
+        )
+
+
+class HackathonPageDto(BaseModel):
+    items: list[HackathonDto] | list[HackathonSummaryDto]
+    next_cursor: str | None = None
+
+
 class OptionalHackathonDto(BaseModel):
     name: str | None = None
     max_participant_count: int | None = None
@@ -43,6 +79,34 @@ class OptionalHackathonDto(BaseModel):
     end_date: datetime | None = None
 
 
+class HackathonTimelineDto(BaseModel):
+    start_date: datetime
+    score_start_date: datetime
+    end_date: datetime
+
+    @staticmethod
+    def from_tortoise(hackathon: HackathonModel):
+        return HackathonTimelineDto(
+            start_date=hackathon.start_date,
+            score_start_date=hackathon.score_start_date,
+            end_date=hackathon.end_date,
+        )
+
+    def now(self) -> datetime:
+        return datetime.now(tz=self.start_date.tzinfo)
+
+    def next_boundary(self, now: datetime) -> datetime | None:
+        """
+        Ближайшая дата смены этапа хакатона. До нее результаты проверок
+        can_* не меняются (если не изменятся сами даты).
+        """
+        for date in (self.start_date, self.score_start_date, self.end_date):
+            if now < date:
+                return date
+
+        return None
+
+
 class CanEditTeamRegistryDto(BaseModel):
     can_edit: bool
 
@@ -8,6 +8,13 @@ class NoSuchHackathonException(HTTPException):
         )
 
 
+class HackathonInvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=400, detail="Некорректный курсор постраничной выдачи!"
+        )
+
+
 class HackathonNameIsNotUniqueException(HTTPException):
     def __init__(self):
         super().__init__(status_code=400, detail="Данное имя занято!")
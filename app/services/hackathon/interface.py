@@ -1,4 +1,5 @@
 from app.ports.event_publisher import IEventPublisherPort
+from app.util.http_cache import ResponseCache
 from datetime import datetime
 from typing import Protocol
 
@@ -11,6 +12,9 @@ from app.services.hackathon.dto import (
     CriterionDto,
     FullHackathonDto,
     HackathonDto,
+    HackathonPageDto,
+    HackathonPhase,
+    HackathonTimelineDto,
     OptionalHackathonDto,
     TeamScoreDto,
 )
@@ -18,6 +22,7 @@ from app.services.hackathon.dto import (
 
 class IHackathonService(Protocol):
     event_publsher: IEventPublisherPort
+    response_cache: ResponseCache
 
     async def create(
         self,
@@ -33,12 +38,20 @@ class IHackathonService(Protocol):
     async def update(
         self, hackathon_id: int, update_dto: OptionalHackathonDto
     ) -> HackathonDto: ...
-    async def get_all(self) -> list[HackathonDto]: ...
+    async def get_all(
+        self,
+        limit: int | None = None,
+        cursor: str | None = None,
+        phase: HackathonPhase | None = None,
+        descending: bool = False,
+        summary: bool = False,
+    ) -> HackathonPageDto: ...
     async def get_many(
         self, hackathon_ids: list[int]
     ) -> list[HackathonDto]: ...
     async def get(self, hackathon_id: int) -> HackathonDto: ...
     async def delete(self, hackathon_id: int) -> None: ...
+    async def get_timeline(self, hackathon_id: int) -> HackathonTimelineDto: ...
     async def can_edit_team_registry(
         self, hackathon_id: int
     ) -> CanEditTeamRegistryDto: ...
@@ -62,6 +75,10 @@ class IHackathonService(Protocol):
         self, hackathon_id: int, criterion_id: int
     ) -> CriterionDto: ...
     async def get_full_info(self, hackathon_id: int) -> FullHackathonDto: ...
+    async def lock_final_scores(self, hackathon_id: int) -> None: ...
+    async def recalculate_final_scores(
+        self, hackathon_id: int
+    ) -> list[dict]: ...
     async def calculate_team_scores_for_hackathon(
         self, hackathon_id: int, save_to_db: bool = False
     ) -> list[TeamScoreDto]: ...
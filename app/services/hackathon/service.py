@@ -1,10 +1,19 @@
 from tortoise.exceptions import ValidationError, IntegrityError
 from app.services.hackathon.interface import IHackathonService
 from app.ports.event_publisher import IEventPublisherPort
-from app.events.emitter import Events
-from collections import defaultdict
+from tortoise.transactions import in_transaction
+from app.events.emitter import BroadcastEmitter, Events
+from app.events.outbox import add_outbox_event
+from pypika_tortoise import functions as sql_fn
+from app.util.http_cache import ResponseCache, hackathon_tag, HACKATHONS_TAG
+from app.util.cache import SharedCache
+from app.ports.cache import ICachePort
 from tortoise.functions import Sum
-from datetime import datetime
+from pypika_tortoise import Table
+from datetime import datetime, timezone
+from app.config import Settings
+from tortoise.expressions import Q
+import base64
 
 from app.services.hackathon.exceptions import (
     HackathonCriteriaCantManageDateExpiredException,
@@ -13,6 +22,7 @@ from app.services.hackathon.exceptions import (
     HackathonCriteriaNotFoundException,
     HackathonValidationErrorException,
     HackathonNameIsNotUniqueException,
+    HackathonInvalidCursorException,
     NoSuchHackathonException,
 )
 
@@ -23,7 +33,11 @@ from app.services.hackathon.dto import (
     CanMakeScoresDto,
     CanUploadTeamSubmissionsDto,
     OptionalHackathonDto,
+    HackathonSummaryDto,
     FullHackathonDto,
+    HackathonPageDto,
+    HackathonPhase,
+    HackathonTimelineDto,
     HackathonDto,
     CriterionDto,
     TeamScoreDto,
@@ -31,6 +45,7 @@ from app.services.hackathon.dto import (
 
 from app.models.hackathon import (
     HackathonCriterionModel,
+    HackathonJudgeModel,
     HackathonModel,
     HackathonTeamFinalScore,
     HackathonTeamScore,
@@ -38,8 +53,37 @@ from app.models.hackathon import (
 
 
 class HackathonService(IHackathonService):
-    def __init__(self, event_publsher: IEventPublisherPort):
+    def __init__(
+        self,
+        event_publsher: IEventPublisherPort,
+        response_cache: ResponseCache,
+        cache: ICachePort,
+    ):
         self.event_publsher = event_publsher
+        self.response_cache = response_cache
+        # записи помечены тегом хакатона и сбрасываются вместе с его
+        # ответами в ResponseCache
+        self._timelines: SharedCache[int, HackathonTimelineDto] = SharedCache(
+            cache,
+            "timelines",
+            HackathonTimelineDto,
+            Settings.HACKATHON_TIMELINE_CACHE_TTL,
+        )
+
+        self._init_events()
+
+    def _init_events(self):
+        # события приходят и от других экземпляров сервиса, поэтому кеш
+        # сбрасывается во всех воркерах, а не только в том, где была запись
+        async def on_hackathon_changed(payload: dict):
+            data: dict | None = payload.get("data", None)
+            if data is None or data.get("id") is None:
+                return
+
+            await self._timelines.delete(data["id"])
+
+        BroadcastEmitter.on(Events.HackathonDeleted, on_hackathon_changed)
+        BroadcastEmitter.on(Events.HackathonUpdated, on_hackathon_changed)
 
     async def create(
         self,
@@ -66,6 +110,7 @@ class HackathonService(IHackathonService):
         except ValidationError as e:
             raise HackathonValidationErrorException("\n".join(e.args))
 
+        await self.response_cache.invalidate(HACKATHONS_TAG)
         return HackathonDto.from_tortoise(hackathon)
 
     async def exists(self, hackathon_id: int) -> bool:
@@ -77,18 +122,103 @@ class HackathonService(IHackathonService):
         hackathon = await self._get_by_id(hackathon_id)
         hackathon.update_from_dict(update_dto.model_dump(exclude_none=True))
 
+        dto = HackathonDto.from_tortoise(hackathon)
         try:
-            await hackathon.save()
+            async with in_transaction():
+                await hackathon.save()
+                await add_outbox_event(Events.HackathonUpdated, dto)
         except ValidationError as e:
             raise HackathonValidationErrorException("\n".join(e.args))
 
-        return HackathonDto.from_tortoise(hackathon)
+        await self.response_cache.invalidate(
+            HACKATHONS_TAG, hackathon_tag(hackathon_id)
+        )
 
-    async def get_all(self) -> list[HackathonDto]:
-        hackathons = await HackathonModel.all()
-        return [
-            HackathonDto.from_tortoise(hackathon) for hackathon in hackathons
-        ]
+        return dto
+
+    @staticmethod
+    def _encode_cursor(hackathon: HackathonModel) -> str:
+        raw = f"{hackathon.start_date.isoformat()}|{hackathon.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            start_date, hackathon_id = raw.split("|")
+            return datetime.fromisoformat(start_date), int(hackathon_id)
+        except ValueError:
+            raise HackathonInvalidCursorException()
+
+    @staticmethod
+    def _get_phase_filter(phase: HackathonPhase) -> Q:
+        """
+        Границы этапов совпадают с проверками can_edit_team_registry,
+        can_upload_submissions и can_make_scores, поэтому в момент начала
+        оценивания хакатон попадает и в active, и в judging.
+        """
+        now = datetime.now(timezone.utc)
+        match phase:
+            case HackathonPhase.Upcoming:
+                return Q(start_date__gt=now)
+            case HackathonPhase.Active:
+                return Q(start_date__lte=now, score_start_date__gte=now)
+            case HackathonPhase.Judging:
+                return Q(score_start_date__lte=now, end_date__gte=now)
+            case HackathonPhase.Finished:
+                return Q(end_date__lt=now)
+
+    async def get_all(
+        self,
+        limit: int | None = None,
+        cursor: str | None = None,
+        phase: HackathonPhase | None = None,
+        descending: bool = False,
+        summary: bool = False,
+    ) -> HackathonPageDto:
+        query = HackathonModel.all()
+        if phase is not None:
+            query = query.filter(self._get_phase_filter(phase))
+
+        # keyset-пагинация по (start_date, id): страница начинается сразу
+        # после последней записи предыдущей, без OFFSET
+        if cursor is not None:
+            start_date, hackathon_id = self._decode_cursor(cursor)
+            if descending:
+                query = query.filter(
+                    Q(start_date__lt=start_date)
+                    | Q(start_date=start_date, id__lt=hackathon_id)
+                )
+            else:
+                query = query.filter(
+                    Q(start_date__gt=start_date)
+                    | Q(start_date=start_date, id__gt=hackathon_id)
+                )
+
+        ordering = (
+            ("-start_date", "-id") if descending else ("start_date", "id")
+        )
+        query = query.order_by(*ordering)
+        if summary:
+            # описание может быть длинным, поэтому не читается из БД
+            query = query.only(*HackathonSummaryDto.model_fields)
+        # без limit возвращается весь список, как до пагинации
+        if limit is not None:
+            query = query.limit(limit + 1)
+        hackathons = await query
+
+        next_cursor = None
+        if limit is not None and len(hackathons) > limit:
+            hackathons = hackathons[:limit]
+            next_cursor = self._encode_cursor(hackathons[-1])
+
+        dto_class = HackathonSummaryDto if summary else HackathonDto
+        return HackathonPageDto(
+            items=[
+                dto_class.from_tortoise(hackathon) for hackathon in hackathons
+            ],
+            next_cursor=next_cursor,
+        )
 
     async def get_many(self, hackathon_ids: list[int]) -> list[HackathonDto]:
         hackathons = await HackathonModel.filter(id__in=hackathon_ids)
@@ -109,48 +239,64 @@ class HackathonService(IHackathonService):
 
     async def delete(self, hackathon_id: int) -> None:
         hackathon = await self._get_by_id(hackathon_id)
-        await hackathon.delete()
-        await self.event_publsher.publish(
-            Events.HackathonDeleted, HackathonDto.from_tortoise(hackathon)
+        async with in_transaction():
+            await hackathon.delete()
+            await add_outbox_event(
+                Events.HackathonDeleted, HackathonDto.from_tortoise(hackathon)
+            )
+
+        await self.response_cache.invalidate(
+            HACKATHONS_TAG, hackathon_tag(hackathon_id)
         )
 
+    async def get_timeline(self, hackathon_id: int) -> HackathonTimelineDto:
+        timeline = await self._timelines.get(hackathon_id)
+        if timeline is None:
+            hackathon = await self._get_by_id(hackathon_id)
+            timeline = HackathonTimelineDto.from_tortoise(hackathon)
+            await self._timelines.set(
+                hackathon_id, timeline, (hackathon_tag(hackathon_id),)
+            )
+
+        return timeline
+
     async def can_edit_team_registry(
         self, hackathon_id: int
     ) -> CanEditTeamRegistryDto:
-        hackathon = await self._get_by_id(hackathon_id)
-        now = datetime.now(tz=hackathon.start_date.tzinfo)
-        return CanEditTeamRegistryDto(can_edit=now < hackathon.start_date)
+        timeline = await self.get_timeline(hackathon_id)
+        now = timeline.now()
+        return CanEditTeamRegistryDto(can_edit=now < timeline.start_date)
 
     async def can_upload_submissions(
         self, hackathon_id: int
     ) -> CanUploadTeamSubmissionsDto:
-        hackathon = await self._get_by_id(hackathon_id)
-        now = datetime.now(tz=hackathon.start_date.tzinfo)
+        timeline = await self.get_timeline(hackathon_id)
+        now = timeline.now()
         return CanUploadTeamSubmissionsDto(
-            can_upload=hackathon.start_date <= now <= hackathon.score_start_date
+            can_upload=timeline.start_date <= now <= timeline.score_start_date
         )
 
     async def can_make_scores(self, hackathon_id: int) -> CanMakeScoresDto:
-        hackathon = await self._get_by_id(hackathon_id)
-        now = datetime.now(tz=hackathon.start_date.tzinfo)
+        timeline = await self.get_timeline(hackathon_id)
+        now = timeline.now()
 
         return CanMakeScoresDto(
-            can_make=hackathon.score_start_date <= now <= hackathon.end_date
+            can_make=timeline.score_start_date <= now <= timeline.end_date
         )
 
     async def can_get_results(self, hackathon_id: int) -> CanGetResultsDto:
-        hackathon = await self._get_by_id(hackathon_id)
-        now = datetime.now(tz=hackathon.start_date.tzinfo)
+        timeline = await self.get_timeline(hackathon_id)
+        now = timeline.now()
 
-        return CanGetResultsDto(can_get=hackathon.end_date >= now)
+        return CanGetResultsDto(can_get=timeline.end_date >= now)
 
     async def can_edit_hackathon_settings(
         self, hackathon_id: int
     ) -> CaEditHackathonSettingsDto:
-        hackathon = await self._get_by_id(hackathon_id)
-        now = datetime.now(tz=hackathon.start_date.tzinfo)
+        timeline = await self.get_timeline(hackathon_id)
+        now = timeline.now()
 
-        return CaEditHackathonSettingsDto(can_edit=now <= hackathon.start_date)
+        return CaEditHackathonSettingsDto(can_edit=now <= timeline.start_date)
 
     async def _can_manage_criterion(self, hackacthon_id: int) -> bool:
         return (await self.can_edit_hackathon_settings(hackacthon_id)).can_edit
@@ -172,6 +318,7 @@ class HackathonService(IHackathonService):
         except ValidationError as e:
             raise HackathonCriteriaValidationErrorException("\n".join(e.args))
 
+        await self.response_cache.invalidate(hackathon_tag(hackathon_id))
         return CriterionDto.from_tortoise(criterion)
 
     async def _validate_criteria_sum(
@@ -225,16 +372,23 @@ class HackathonService(IHackathonService):
             hackathon_id, weight - criterion.weight
         )
 
+        weight_changed = criterion.weight != weight
         criterion.name = name
         criterion.weight = weight
 
         try:
-            await criterion.save()
+            async with in_transaction():
+                if weight_changed:
+                    await self.lock_final_scores(hackathon_id)
+                await criterion.save()
+                if weight_changed:
+                    await self.recalculate_final_scores(hackathon_id)
         except IntegrityError:
             raise HackathonCriteriaNameIsNotUniqueException()
         except ValidationError as e:
             raise HackathonCriteriaValidationErrorException("\n".join(e.args))
 
+        await self.response_cache.invalidate(hackathon_tag(hackathon_id))
         return CriterionDto.from_tortoise(criterion)
 
     async def delete_criterion(
@@ -251,7 +405,12 @@ class HackathonService(IHackathonService):
         if criterion is None:
             raise HackathonCriteriaNotFoundException()
 
-        await criterion.delete()
+        async with in_transaction():
+            await self.lock_final_scores(hackathon_id)
+            await criterion.delete()
+            await self.recalculate_final_scores(hackathon_id)
+
+        await self.response_cache.invalidate(hackathon_tag(hackathon_id))
         return CriterionDto.from_tortoise(criterion)
 
     async def get_full_info(self, hackathon_id: int) -> FullHackathonDto:
@@ -261,43 +420,88 @@ class HackathonService(IHackathonService):
         hackathon_dto = HackathonDto.from_tortoise(hackathon)
         return FullHackathonDto(**hackathon_dto.model_dump(), criteria=criteria)
 
-    async def calculate_team_scores_for_hackathon(
-        self, hackathon_id: int, save_to_db: bool = False
-    ) -> list[TeamScoreDto]:
-        scores = await HackathonTeamScore.filter(
-            criterion__hackathon_id=hackathon_id,
-            judge__hackathon_id=hackathon_id,
-        ).prefetch_related("criterion", "judge")
-
-        if not scores:
-            return []
-
-        team_judge_scores: defaultdict[
-            int, defaultdict[int, list[tuple[int, float]]]
-        ] = defaultdict(lambda: defaultdict(list))
-
-        for score in scores:
-            team_judge_scores[score.team_id][score.judge_id].append(  # type: ignore[attr-defined]
-                (score.score, score.criterion.weight)
+    async def _aggregate_team_scores(self, hackathon_id: int) -> list[dict]:
+        """
+        Итоговая оценка команды - среднее по судьям от взвешенной суммы
+        оценок судьи. Так как каждый судья учитывается ровно один раз, это
+        равно SUM(score * weight) / COUNT(DISTINCT judge_id), что
+        считается одним агрегирующим запросом на стороне БД.
+        """
+        db = HackathonTeamScore._meta.db
+        scores = Table(HackathonTeamScore._meta.db_table)
+        criteria = Table(HackathonCriterionModel._meta.db_table)
+        judges = Table(HackathonJudgeModel._meta.db_table)
+
+        weighted_sum = sql_fn.Sum(scores.score * criteria.weight)
+        judge_count = sql_fn.Count(scores.judge_id).distinct()
+
+        query = (
+            db.query_class.from_(scores)
+            .join(criteria)
+            .on(criteria.id == scores.criterion_id)
+            .join(judges)
+            .on(judges.id == scores.judge_id)
+            .where(
+                (criteria.hackathon_id == hackathon_id)
+                & (judges.hackathon_id == hackathon_id)
             )
+            .groupby(scores.team_id)
+            .select(
+                scores.team_id,
+                weighted_sum.as_("weighted_sum"),
+                judge_count.as_("judge_count"),
+                (weighted_sum / judge_count).as_("score"),
+            )
+        )
 
-        team_final_scores = {}
+        return await db.execute_query_dict(query.get_sql())
+
+    async def lock_final_scores(self, hackathon_id: int) -> None:
+        """
+        Блокирует итоговые оценки хакатона до конца текущей транзакции.
+        Вызывается перед изменением оценок, критериев или состава жюри,
+        чтобы параллельные записи оценок дождались пересчета.
+        """
+        await (
+            HackathonTeamFinalScore.select_for_update()
+            .filter(hackathon_id=hackathon_id)
+            .order_by("id")
+        )
 
-        for team_id, judges in team_judge_scores.items():
-            judge_totals = []
-            for evaluations in judges.values():
-                sj = sum(s * w for s, w in evaluations)
-                judge_totals.append(sj)
-            final_score = sum(judge_totals) / len(judge_totals)
-            team_final_scores[team_id] = final_score
+    async def recalculate_final_scores(self, hackathon_id: int) -> list[dict]:
+        """
+        Пересчитывает сохраненные итоговые оценки хакатона по всем его
+        оценкам. Вызывается в той же транзакции, что и изменение, после
+        lock_final_scores.
+        """
+        rows = await self._aggregate_team_scores(hackathon_id)
+
+        stale = HackathonTeamFinalScore.filter(hackathon_id=hackathon_id)
+        if rows:
+            stale = stale.exclude(team_id__in=[row["team_id"] for row in rows])
+            await HackathonTeamFinalScore.bulk_create(
+                [
+                    HackathonTeamFinalScore(hackathon_id=hackathon_id, **row)
+                    for row in rows
+                ],
+                on_conflict=["team_id"],
+                update_fields=["score", "weighted_sum", "judge_count"],
+            )
+        await stale.delete()
+        return rows
 
-            if save_to_db:
-                await HackathonTeamFinalScore.update_or_create(
-                    {"score": final_score},
-                    team_id=team_id,
-                )
+    async def calculate_team_scores_for_hackathon(
+        self, hackathon_id: int, save_to_db: bool = False
+    ) -> list[TeamScoreDto]:
+        if save_to_db:
+            async with in_transaction():
+                await self.lock_final_scores(hackathon_id)
+                rows = await self.recalculate_final_scores(hackathon_id)
+            await self.response_cache.invalidate(hackathon_tag(hackathon_id))
+        else:
+            rows = await self._aggregate_team_scores(hackathon_id)
 
         return [
-            TeamScoreDto(team_id=team_id, score=team_final_scores[team_id])
-            for team_id in team_final_scores
+            TeamScoreDto(team_id=row["team_id"], score=row["score"])
+            for row in rows
         ]
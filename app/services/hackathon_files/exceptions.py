@@ -15,3 +15,11 @@ class HackathonFileNotFoundException(HTTPException):
             status_code=404,
             detail="Этого файла не существует!",
         )
+
+
+class HackathonFileTooLargeException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=413,
+            detail="Размер файла превышает допустимый!",
+        )
@@ -1,6 +1,6 @@
+from app.util.http_cache import ResponseCache
 from app.ports.storage import IStoragePort
-from typing import Protocol
-import io
+from typing import BinaryIO, Protocol
 
 from app.services.hackathon_files.dto import (
     HackathonDocumentDto,
@@ -11,18 +11,18 @@ from app.services.hackathon_files.dto import (
 class IHackathonFilesService(Protocol):
     bucket: str
     storage: IStoragePort
+    response_cache: ResponseCache
 
     async def upload_allowed_file(
-        self, hackathon_id: int, file: io.BytesIO, filename: str
+        self, hackathon_id: int, file: BinaryIO, filename: str
     ) -> HackathonDocumentDto: ...
-    def is_allowed_file(
-        self, filename: str, file_bytes: io.BytesIO
-    ) -> bool: ...
+    def is_allowed_file(self, filename: str, file_bytes: BinaryIO) -> bool: ...
     async def get_files(
         self, hackathon_id: int, base_url: str
     ) -> list[HackathonDocumentWithLinkDto]: ...
     async def get_doc_s3_key(self, document_id: int) -> str: ...
-    async def generate_redirect_link(
+    def generate_redirect_link(
         self, base_url: str, filename: str, document_id: int
     ) -> str: ...
+    def generate_presigned_link(self, s3_key: str, filename: str) -> str: ...
     async def delete_file(self, document_id: int) -> HackathonDocumentDto: ...
@@ -1,12 +1,16 @@
 from app.services.hackathon_files.interface import IHackathonFilesService
 from app.models import HackathonModel, HackathonDocumentModel
+from app.util.http_cache import ResponseCache, hackathon_tag
 from app.ports.storage import IStoragePort
+from fastapi.concurrency import run_in_threadpool
+from app.util.cache import TTLCache
 from urllib.parse import quote
+from app.config import Settings
+from typing import BinaryIO
 from uuid import uuid4
 from . import utils
 import urllib.parse
 import mimetypes
-import io
 
 
 from app.services.hackathon_files.dto import (
@@ -15,26 +19,49 @@ from app.services.hackathon_files.dto import (
 )
 from app.services.hackathon_files.exceptions import (
     HackathonFileNotFoundException,
+    HackathonFileTooLargeException,
     HackathonFileTypeRestrictedException,
 )
 
 
 class HackathonFilesService(IHackathonFilesService):
-    def __init__(self, bucket: str, storage: IStoragePort):
+    def __init__(
+        self,
+        bucket: str,
+        storage: IStoragePort,
+        response_cache: ResponseCache,
+        max_file_size: int = Settings.MAX_UPLOAD_SIZE,
+        presigned_links: bool = Settings.S3_PRESIGNED_LINKS,
+        presigned_link_ttl: int = Settings.S3_PRESIGNED_LINK_TTL,
+    ):
         self.bucket = bucket
         self.storage = storage
+        self.response_cache = response_cache
+        self.max_file_size = max_file_size
+        self.presigned_links = presigned_links
+        self.presigned_link_ttl = presigned_link_ttl
+        # ссылка отдается из кеша, пока она остается действительной
+        # хотя бы половину своего срока жизни
+        self._presigned_cache: TTLCache[str, str] = TTLCache(
+            ttl=presigned_link_ttl / 2
+        )
 
     async def upload_allowed_file(
-        self, hackathon_id: int, file: io.BytesIO, filename: str
+        self, hackathon_id: int, file: BinaryIO, filename: str
     ) -> HackathonDocumentDto:
-        file.seek(0)
+        # проверки читают файл, который мог быть сброшен на диск
+        await run_in_threadpool(self._check_file, file, filename)
+
+        return await self._upload_and_save(hackathon_id, file, filename)
+
+    def _check_file(self, file: BinaryIO, filename: str):
+        if utils.get_file_size(file) > self.max_file_size:
+            raise HackathonFileTooLargeException()
 
         if not self.is_allowed_file(filename, file):
             raise HackathonFileTypeRestrictedException()
 
-        return await self._upload_and_save(hackathon_id, file, filename)
-
-    def is_allowed_file(self, filename: str, file_bytes: io.BytesIO) -> bool:
+    def is_allowed_file(self, filename: str, file_bytes: BinaryIO) -> bool:
 
         mime_type, _ = mimetypes.guess_type(filename)
 
@@ -53,28 +80,18 @@ class HackathonFilesService(IHackathonFilesService):
 
         return mime_type in allowed_mime_types
 
-    def _get_mime_type_from_content(self, file_bytes: io.BytesIO) -> str:
-        file_bytes.seek(0)
-
-        try:
-            if utils.is_valid_docx(file_bytes):
-                return "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            if utils.is_valid_pptx(file_bytes):
-                return "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-        except Exception:
-            pass
-
-        return "unknown"
+    def _get_mime_type_from_content(self, file_bytes: BinaryIO) -> str:
+        return utils.sniff_mime_type(file_bytes) or "unknown"
 
     async def _upload_and_save(
-        self, hackathon_id: int, file: io.BytesIO, filename: str
+        self, hackathon_id: int, file: BinaryIO, filename: str
     ) -> HackathonDocumentDto:
         hackathon = await HackathonModel.get(id=hackathon_id)
         content_type = utils.guess_content_type(filename)
         key = f"organizer_uploads/{hackathon_id}/{uuid4()}_{filename}"
 
         file.seek(0)
-        self.storage.upload_file(
+        await self.storage.upload_file(
             file, bucket=self.bucket, key=key, content_type=content_type
         )
 
@@ -84,6 +101,7 @@ class HackathonFilesService(IHackathonFilesService):
             s3_key=key,
             content_type=content_type,
         )
+        await self.response_cache.invalidate(hackathon_tag(hackathon_id))
 
         return HackathonDocumentDto.from_tortoise(document)
 
@@ -94,21 +112,19 @@ class HackathonFilesService(IHackathonFilesService):
             hackathon_id=hackathon_id
         ).all()
 
-        result: list[HackathonDocumentWithLinkDto] = []
-
-        for doc in docs:
-            doc_dto = HackathonDocumentDto.from_tortoise(doc)
-
-            result.append(
-                HackathonDocumentWithLinkDto(
-                    link=await self.generate_redirect_link(
-                        base_url, doc.name, doc.id
-                    ),
-                    **doc_dto.model_dump(),
-                )
+        return [
+            HackathonDocumentWithLinkDto(
+                link=self._build_link(base_url, doc),
+                **HackathonDocumentDto.from_tortoise(doc).model_dump(),
             )
+            for doc in docs
+        ]
 
-        return result
+    def _build_link(self, base_url: str, doc: HackathonDocumentModel) -> str:
+        if self.presigned_links:
+            return self.generate_presigned_link(doc.s3_key, doc.name)
+
+        return self.generate_redirect_link(base_url, doc.name, doc.id)
 
     async def _get_document(self, document_id: int) -> HackathonDocumentModel:
         doc = await HackathonDocumentModel.get_or_none(id=document_id)
@@ -121,22 +137,32 @@ class HackathonFilesService(IHackathonFilesService):
         doc = await self._get_document(document_id)
         return doc.s3_key
 
-    async def generate_redirect_link(
+    def generate_redirect_link(
         self, base_url: str, filename: str, document_id: int
     ) -> str:
-        doc = await self._get_document(document_id)
-
         safe_filename = quote(filename)
         redirect_url = urllib.parse.urljoin(
-            base_url, f"download/hack/{doc.id}/{safe_filename}"
+            base_url, f"download/hack/{document_id}/{safe_filename}"
         )
         return redirect_url
 
+    def generate_presigned_link(self, s3_key: str, filename: str) -> str:
+        link = self._presigned_cache.get(s3_key)
+        if link is None:
+            link = self.storage.generate_presigned_url(
+                self.bucket, s3_key, self.presigned_link_ttl, filename
+            )
+            self._presigned_cache.set(s3_key, link)
+
+        return link
+
     async def delete_file(self, document_id: int) -> HackathonDocumentDto:
         doc = await HackathonDocumentModel.get_or_none(id=document_id)
         if not doc:
             raise HackathonFileNotFoundException()
 
-        self.storage.delete_object(bucket=self.bucket, key=doc.s3_key)
+        await self.storage.delete_object(bucket=self.bucket, key=doc.s3_key)
+        self._presigned_cache.invalidate(doc.s3_key)
         await doc.delete()
+        await self.response_cache.invalidate(hackathon_tag(doc.hackathon_id))
         return HackathonDocumentDto.from_tortoise(doc)
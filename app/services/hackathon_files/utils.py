@@ -1,6 +1,6 @@
 from zipfile import ZipFile
+from typing import BinaryIO
 import mimetypes
-import io
 
 mimetypes.add_type(
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
@@ -14,30 +14,57 @@ mimetypes.add_type(
 mimetypes.add_type("application/vnd.ms-powerpoint", ".ppt")
 
 
-def is_valid_docx(bytes: io.BytesIO) -> bool:
-    try:
-        with ZipFile(bytes) as file:
-            if (
-                "[Content_Types].xml" not in file.namelist()
-                or "word/document.xml" not in file.namelist()
-            ):
-                return False
-        return True
-    except Exception:
-        return False
+DOCX_MIME_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+PPTX_MIME_TYPE = (
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+)
+
+ZIP_SIGNATURE = b"PK\x03\x04"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
 
+def sniff_mime_type(file: BinaryIO) -> str | None:
+    """
+    Определяет тип файла по сигнатуре в первых байтах. Для zip-архивов
+    (docx, pptx) центральный каталог читается ровно один раз.
+    """
+    file.seek(0)
+    header = file.read(8)
+    file.seek(0)
+
+    if header.startswith(PNG_SIGNATURE):
+        return "image/png"
+    if header.startswith(JPEG_SIGNATURE):
+        return "image/jpeg"
+    if not header.startswith(ZIP_SIGNATURE):
+        return None
 
-def is_valid_pptx(bytes: io.BytesIO) -> bool:
     try:
-        with ZipFile(bytes) as file:
-            if (
-                "[Content_Types].xml" not in file.namelist()
-                or "ppt/presentation.xml" not in file.namelist()
-            ):
-                return False
-        return True
+        with ZipFile(file) as archive:
+            names = set(archive.namelist())
     except Exception:
-        return False
+        return None
+    finally:
+        file.seek(0)
+
+    if "[Content_Types].xml" not in names:
+        return None
+    if "word/document.xml" in names:
+        return DOCX_MIME_TYPE
+    if "ppt/presentation.xml" in names:
+        return PPTX_MIME_TYPE
+
+    return None
+
+
+def get_file_size(file: BinaryIO) -> int:
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    return size
 
 
 def guess_content_type(filename: str) -> str:
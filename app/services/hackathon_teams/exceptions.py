@@ -9,6 +9,22 @@ class HackathonTeamAlreadyScoredException(HTTPException):
         )
 
 
+class HackathonTeamDuplicateCriterionScoreException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=400,
+            detail="Каждый критерий можно оценить только один раз за запрос!",
+        )
+
+
+class HackathonTeamNoScoresException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=400,
+            detail="Нужно передать хотя бы одну оценку!",
+        )
+
+
 class HackathonTeamCantBeScoredDateExpiredException(HTTPException):
     def __init__(self):
         super().__init__(
@@ -28,13 +28,22 @@ class IHackathonTeamsService(Protocol):
         self,
         hackathon_id: int,
         team_id: int,
+        judge_id: int,
         judge_user_id: int,
         criterion_id: int,
         score: int,
     ) -> HackathonTeamScoreDto: ...
+    async def set_scores_bulk(
+        self,
+        hackathon_id: int,
+        team_id: int,
+        judge_id: int,
+        judge_user_id: int,
+        scores: list[tuple[int, int]],
+    ) -> list[HackathonTeamScoreDto]: ...
     async def get_all_team_scores(
         self, team_id: int
     ) -> list[HackathonTeamScoreDto]: ...
     async def get_result_scores(
-        self, hackathon_id: int
+        self, hackathon_id: int, limit: int | None = None, offset: int = 0
     ) -> list[TeamScoreDto]: ...
@@ -4,8 +4,11 @@ from app.services.judge.interface import IJudgeService
 from app.services.hackathon.dto import TeamScoreDto
 from app.ports.teamservice import ITeamServicePort
 from app.ports.userservice import IUserServicePort
+from tortoise.exceptions import IntegrityError, ValidationError
+from tortoise.transactions import in_transaction
+from app.util.http_cache import hackathon_tag
+from app.events.emitter import Emitter, Events
 import app.util.dto_utils as dto_utils
-from pydantic import ValidationError
 
 from app.ports.teamservice.dto import (
     HackathonTeamWithMatesDto,
@@ -18,17 +21,25 @@ from app.services.hackathon_teams.dto import (
 
 from app.models.hackathon import (
     HackathonTeamFinalScore,
+    HackathonJudgeModel,
     HackathonTeamScore,
 )
 
 from app.services.hackathon_teams.exceptions import (
     HackathonTeamCantBeScoredDateExpiredException,
+    HackathonTeamDuplicateCriterionScoreException,
     HackathonTeamAlreadyScoredException,
     HackathonTeamCantGetResultsException,
+    HackathonTeamNoScoresException,
+)
+
+from app.services.judge.exceptions import (
+    HackathonJudgeDoesNotExistsException,
 )
 
 from app.services.hackathon.exceptions import (
     HackathonCriteriaValidationErrorException,
+    HackathonCriteriaNotFoundException,
     NoSuchHackathonException,
 )
 
@@ -46,6 +57,36 @@ class HackathonTeamsService(IHackathonTeamsService):
         self.judge_service = judge_service
         self.user_service = user_service
 
+        self._init_events()
+
+    def _init_events(self):
+        # команда удалена в сервисе команд: ее оценки больше не нужны и не
+        # должны оставаться в таблице лидеров
+        async def on_team_deleted(payload: dict):
+            data: dict | None = payload.get("data", None)
+            if data is None or data.get("id") is None:
+                return
+
+            await self._delete_team_scores(data["id"])
+
+        Emitter.on(Events.TeamHackathonTeamDeleted, on_team_deleted)
+
+    async def _delete_team_scores(self, team_id: int) -> None:
+        async with in_transaction():
+            final = (
+                await HackathonTeamFinalScore.select_for_update()
+                .filter(team_id=team_id)
+                .first()
+            )
+            await HackathonTeamScore.filter(team_id=team_id).delete()
+            if final is None:
+                return
+            await final.delete()
+
+        await self.hackathon_service.response_cache.invalidate(
+            hackathon_tag(final.hackathon_id)
+        )
+
     async def get_by_hackathon(
         self, hackathon_id: int
     ) -> list[HackathonTeamDto]:
@@ -66,24 +107,74 @@ class HackathonTeamsService(IHackathonTeamsService):
         dto = await self.hackathon_service.can_make_scores(hackathon_id)
         return dto.can_make
 
-    async def _get_score(
+    async def _lock_final_score(self, hackathon_id: int, team_id: int) -> None:
+        """
+        Создает строку итоговой оценки команды, если ее еще нет, и
+        блокирует ее до конца транзакции. Upsert не падает на гонке двух
+        первых оценок, а блокировка выстраивает параллельные оценки одной
+        команды в очередь.
+        """
+        await HackathonTeamFinalScore.bulk_create(
+            [
+                HackathonTeamFinalScore(
+                    hackathon_id=hackathon_id, team_id=team_id, score=0
+                )
+            ],
+            on_conflict=["team_id"],
+            update_fields=["hackathon_id"],
+        )
+
+    async def _track_final_score(
         self,
-        hack_team_id: int,
-        judge_user_id: int,
-        criterion_id: int,
-    ):
-        score = await HackathonTeamScore.get_or_none(
-            team_id=hack_team_id,
-            criterion_id=criterion_id,
-            judge_id=judge_user_id,
+        hackathon_id: int,
+        team_id: int,
+        judge_id: int,
+        criterion_ids: list[int],
+        delta: float,
+    ) -> None:
+        """
+        Обновляет итоговую оценку команды за O(1), не пересчитывая все
+        оценки. Вызывается в транзакции после _lock_final_score и записи
+        новых оценок судьи.
+        """
+        if not criterion_ids:
+            # без новых оценок судья не добавляется к итоговой оценке
+            return
+
+        judge_delta = int(
+            not await HackathonTeamScore.filter(
+                team_id=team_id, judge_id=judge_id
+            )
+            .exclude(criterion_id__in=criterion_ids)
+            .exists()
         )
 
-        return score
+        # строка заблокирована в _lock_final_score, так что прочитанные
+        # значения не изменятся до конца транзакции
+        final = await HackathonTeamFinalScore.get(team_id=team_id)
+        final.judge_count += judge_delta
+        final.weighted_sum += delta
+        final.score = final.weighted_sum / final.judge_count
+        await final.save(update_fields=["score", "weighted_sum", "judge_count"])
+
+    @staticmethod
+    async def _score_conflict(judge_id: int) -> Exception:
+        # id судьи берется из индекса жюри и мог устареть, если судью
+        # только что удалили: тогда нарушен внешний ключ, а не уникальность
+        if not await HackathonJudgeModel.exists(id=judge_id):
+            return HackathonJudgeDoesNotExistsException()
+
+        return HackathonTeamAlreadyScoredException()
+
+    async def _get_judge_name(self, judge_user_id: int) -> str | None:
+        user_info = await self.user_service.try_get_user_info(judge_user_id)
+        return user_info.formatted_name if user_info else None
 
     async def set_score(
         self,
         hackathon_id: int,
         team_id: int,
+        judge_id: int,
         judge_user_id: int,
         criterion_id: int,
         score: int,
@@ -91,27 +182,114 @@ class HackathonTeamsService(IHackathonTeamsService):
         if not await self._can_score(hackathon_id):
             raise HackathonTeamCantBeScoredDateExpiredException()
 
-        if await self._get_score(team_id, judge_user_id, criterion_id):
-            raise HackathonTeamAlreadyScoredException()
-
         hack_team = await self.get_team_info(hackathon_id, team_id)
         criterion = await self.hackathon_service.get_criterion(criterion_id)
-        judge = await self.judge_service.get_judge(hackathon_id, judge_user_id)
+
         try:
-            record, _ = await HackathonTeamScore.update_or_create(
-                defaults={
-                    "score": score,
-                },
+            async with in_transaction():
+                await self._lock_final_score(hackathon_id, hack_team.id)
+                # повторная оценка нарушает уникальность и откатывает
+                # транзакцию вместе с итоговой оценкой
+                record = await HackathonTeamScore.create(
+                    team_id=hack_team.id,
+                    criterion_id=criterion.id,
+                    judge_id=judge_id,
+                    score=score,
+                )
+                await self._track_final_score(
+                    hackathon_id,
+                    hack_team.id,
+                    judge_id,
+                    [criterion.id],
+                    score * criterion.weight,
+                )
+        except ValidationError as e:
+            raise HackathonCriteriaValidationErrorException("\n".join(e.args))
+        except IntegrityError:
+            raise await self._score_conflict(judge_id)
+
+        await self.hackathon_service.response_cache.invalidate(
+            hackathon_tag(hackathon_id)
+        )
+        dto = HackathonTeamScoreDto.from_tortoise(record, judge_user_id)
+        dto.judge_user_name = await self._get_judge_name(judge_user_id)
+        dto.team_name = hack_team.name
+        return dto
+
+    async def set_scores_bulk(
+        self,
+        hackathon_id: int,
+        team_id: int,
+        judge_id: int,
+        judge_user_id: int,
+        scores: list[tuple[int, int]],
+    ) -> list[HackathonTeamScoreDto]:
+        if not scores:
+            raise HackathonTeamNoScoresException()
+
+        criterion_ids = [criterion_id for criterion_id, _ in scores]
+        if len(set(criterion_ids)) != len(criterion_ids):
+            raise HackathonTeamDuplicateCriterionScoreException()
+
+        if not await self._can_score(hackathon_id):
+            raise HackathonTeamCantBeScoredDateExpiredException()
+
+        hack_team = await self.get_team_info(hackathon_id, team_id)
+        criteria = await self.hackathon_service.get_criteria(hackathon_id)
+
+        weights = {criterion.id: criterion.weight for criterion in criteria}
+        if not weights.keys() >= set(criterion_ids):
+            raise HackathonCriteriaNotFoundException()
+
+        records = [
+            HackathonTeamScore(
                 team_id=hack_team.id,
-                criterion_id=criterion.id,
-                judge_id=judge.id,
+                criterion_id=criterion_id,
+                judge_id=judge_id,
+                score=score,
             )
-            dto = HackathonTeamScoreDto.from_tortoise(record, judge.user_id)
-            dto.judge_user_name = judge.user_name
-            dto.team_name = hack_team.name
-            return dto
+            for criterion_id, score in scores
+        ]
+
+        try:
+            # bulk_create не вызывает pre_save, поэтому валидируем явно
+            for record in records:
+                await record.validate()
+
+            async with in_transaction():
+                await self._lock_final_score(hackathon_id, hack_team.id)
+                await HackathonTeamScore.bulk_create(records)
+                await self._track_final_score(
+                    hackathon_id,
+                    hack_team.id,
+                    judge_id,
+                    criterion_ids,
+                    sum(score * weights[cid] for cid, score in scores),
+                )
         except ValidationError as e:
             raise HackathonCriteriaValidationErrorException("\n".join(e.args))
+        except IntegrityError:
+            raise await self._score_conflict(judge_id)
+
+        await self.hackathon_service.response_cache.invalidate(
+            hackathon_tag(hackathon_id)
+        )
+        saved = await HackathonTeamScore.filter(
+            team_id=hack_team.id,
+            judge_id=judge_id,
+            criterion_id__in=criterion_ids,
+        ).order_by("criterion_id")
+
+        judge_user_name = await self._get_judge_name(judge_user_id)
+        dtos = [
+            HackathonTeamScoreDto.from_tortoise(record, judge_user_id)
+            for record in saved
+        ]
+        for dto in dtos:
+            dto.judge_user_name = judge_user_name
+            dto.team_name = hack_team.name
+
+        return dtos
 
     async def get_all_team_scores(
         self, team_id: int
@@ -146,23 +324,28 @@ class HackathonTeamsService(IHackathonTeamsService):
 
         return dtos
 
-    async def get_result_scores(self, hackathon_id: int) -> list[TeamScoreDto]:
+    async def get_result_scores(
+        self, hackathon_id: int, limit: int | None = None, offset: int = 0
+    ) -> list[TeamScoreDto]:
         if not await self.hackathon_service.can_get_results(hackathon_id):
             raise HackathonTeamCantGetResultsException()
 
-        teams = await self.get_by_hackathon(hackathon_id)
-        team_scores = await HackathonTeamFinalScore.filter(
-            team_id__in=map(lambda team: team.id, teams)
-        ).order_by("-score")
+        query = (
+            HackathonTeamFinalScore.filter(hackathon_id=hackathon_id)
+            .order_by("-score", "team_id")
+            .offset(offset)
+        )
+        if limit is not None:
+            query = query.limit(limit)
 
         dtos = [
             TeamScoreDto(team_id=result.team_id, score=result.score)
-            for result in team_scores
+            for result in await query
         ]
 
         team_names = self.team_service.get_hackathon_team_name_map(
             await self.team_service.try_get_hackathon_team_info_many(
-                0, dto_utils.export_int_fields(dtos, "team_id")
+                hackathon_id, dto_utils.export_int_fields(dtos, "team_id")
             )
         )
 
@@ -15,3 +15,16 @@ class JudgeDto(BaseModel):
         return JudgeDto(
             id=judge.id, hackathon_id=judge.hackathon_id, user_id=judge.user_id
         )
+
+
+class HackathonJudgesChangedDto(BaseModel):
+    id: int
+
+
+class UserDeletedEventDto(BaseModel):
+    id: int
+
+
+class UserBannedEventDto(BaseModel):
+    id: int
+    is_banned: bool
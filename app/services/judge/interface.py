@@ -16,7 +16,11 @@ class IJudgeService(Protocol):
     async def get_judge(
         self, hackathon_id: int, judge_user_id: int
     ) -> JudgeDto: ...
+    async def get_judge_id(
+        self, hackathon_id: int, judge_user_id: int
+    ) -> int | None: ...
     async def get_judges(self, hackathon_id: int) -> list[JudgeDto]: ...
     async def delete_judge(
         self, hackathon_id: int, judge_user_id: int
     ) -> JudgeDto: ...
+    def get_judge_index_stats(self) -> dict[str, int]: ...
@@ -3,12 +3,18 @@ from app.services.hackathon.interface import IHackathonService
 from app.ports.event_consumer import IEventConsumerPort
 from app.services.judge.interface import IJudgeService
 from app.models.hackathon import HackathonJudgeModel
+from tortoise.transactions import in_transaction
 from app.ports.userservice import IUserServicePort
-from app.services.judge.dto import JudgeDto
+from app.services.judge.dto import HackathonJudgesChangedDto, JudgeDto
+from app.services.judge.dto import UserBannedEventDto, UserDeletedEventDto
+from app.util.cache import SingleFlight, TTLCache
+from app.util.http_cache import hackathon_tag
 import app.util.dto_utils as dto_utils
-from app.events.emitter import Emitter
+from app.events.emitter import BatchEmitter, BroadcastEmitter
+from app.events.outbox import add_outbox_event
 from app.events.emitter import Events
 from app.acl.roles import UserRoles
+from app.config import Settings
 
 
 from app.services.judge.exceptions import (
@@ -29,28 +35,123 @@ class JudgeService(IJudgeService):
         self.user_service = user_service
         self.hackathon_service = hackathon_service
         self.event_consumer = event_consumer
+        # hackathon_id -> {user_id: judge_id}. Индекс загружается лениво
+        # и сбрасывается при изменении состава жюри: в своем воркере
+        # сразу, в остальных - по событию HackathonJudgesChanged, которое
+        # пишется в outbox вместе с изменением
+        self._judge_index: TTLCache[int, dict[int, int]] = TTLCache(
+            Settings.JUDGE_INDEX_TTL, Settings.JUDGE_INDEX_MAX_SIZE
+        )
+        self._judge_index_flight: SingleFlight[int, dict[int, int]] = (
+            SingleFlight()
+        )
+        self._judge_index_generation = 0
+        self.hackathon_service.response_cache.cache.on_invalidate(
+            self._on_cache_invalidate
+        )
 
         self._init_events()
 
+    def _invalidate_judge_index(self, *hackathon_ids: int) -> None:
+        self._judge_index_generation += 1
+        for hackathon_id in hackathon_ids:
+            self._judge_index.invalidate(hackathon_id)
+
+    def _on_cache_invalidate(self, tags: tuple[str, ...]) -> None:
+        self._judge_index_generation += 1
+        self._judge_index.invalidate_where(
+            lambda hackathon_id: hackathon_tag(hackathon_id) in tags
+        )
+
+    async def _load_judge_index(self, hackathon_id: int) -> dict[int, int]:
+        generation = self._judge_index_generation
+        judges = dict(
+            await HackathonJudgeModel.filter(
+                hackathon_id=hackathon_id
+            ).values_list("user_id", "id")
+        )
+        # состав жюри мог измениться, пока выполнялся запрос
+        if generation == self._judge_index_generation:
+            self._judge_index.set(hackathon_id, judges)
+        return judges
+
+    async def get_judge_id(
+        self, hackathon_id: int, judge_user_id: int
+    ) -> int | None:
+        judges = self._judge_index.get(hackathon_id)
+        if judges is None:
+            judges = await self._judge_index_flight.do(
+                hackathon_id, lambda: self._load_judge_index(hackathon_id)
+            )
+        return judges.get(judge_user_id)
+
+    @staticmethod
+    async def _add_judges_changed_event(*hackathon_ids: int) -> None:
+        for hackathon_id in hackathon_ids:
+            await add_outbox_event(
+                Events.HackathonJudgesChanged,
+                HackathonJudgesChangedDto(id=hackathon_id),
+            )
+
+    async def _delete_users_judges(self, user_ids: frozenset[int]) -> None:
+        if not user_ids:
+            return
+
+        judges = HackathonJudgeModel.filter(user_id__in=user_ids)
+        async with in_transaction():
+            hackathon_ids = sorted(
+                await judges.distinct().values_list("hackathon_id", flat=True)
+            )
+            # оценки удаляемых судей удаляются каскадно, поэтому итоговые
+            # оценки их хакатонов пересчитываются в той же транзакции
+            for hackathon_id in hackathon_ids:
+                await self.hackathon_service.lock_final_scores(hackathon_id)
+            await judges.delete()
+            for hackathon_id in hackathon_ids:
+                await self.hackathon_service.recalculate_final_scores(
+                    hackathon_id
+                )
+            await self._add_judges_changed_event(*hackathon_ids)
+        self._invalidate_judge_index(*hackathon_ids)
+
+        await self.hackathon_service.response_cache.invalidate(
+            *(hackathon_tag(hackathon_id) for hackathon_id in hackathon_ids)
+        )
+
     def _init_events(self):
-        async def on_user_deleted(payload: dict):
-            data: dict | None = payload.get("data", None)
-            if data is None:
-                return
+        # события удаления и блокировки пользователей приходят пачками,
+        # поэтому судьи удаляются одним запросом на пакет событий
+        async def on_users_deleted(payloads: list[dict]):
+            # пакет проверяется целиком до изменений: некорректное событие
+            # отклоняет пакет, и потребитель повторяет его сообщения по
+            # одному, так что отбрасывается только оно само
+            events = [
+                UserDeletedEventDto.model_validate(payload.get("data"))
+                for payload in payloads
+            ]
+            await self._delete_users_judges(
+                frozenset(event.id for event in events)
+            )
 
-            user_id = data.get("id")
-            if user_id is None:
-                return
+        async def on_users_banned(payloads: list[dict]):
+            events = [
+                UserBannedEventDto.model_validate(payload.get("data"))
+                for payload in payloads
+            ]
+            await self._delete_users_judges(
+                frozenset(event.id for event in events if event.is_banned)
+            )
 
-            await HackathonJudgeModel.filter(user_id=user_id).delete()
+        async def on_judges_changed(payload: dict):
+            data: dict | None = payload.get("data", None)
+            if data is None or data.get("id") is None:
+                return
 
-        async def on_user_banned(payload: dict):
-            is_banned = payload["data"]["is_banned"]
-            if is_banned:
-                return await on_user_deleted(payload)
+            self._invalidate_judge_index(data["id"])
 
-        Emitter.on(Events.UserDeleted, on_user_deleted)
-        Emitter.on(Events.UserBanned, on_user_banned)
+        BatchEmitter.on(Events.UserDeleted, on_users_deleted)
+        BatchEmitter.on(Events.UserBanned, on_users_banned)
+        BroadcastEmitter.on(Events.HackathonJudgesChanged, on_judges_changed)
 
     async def _get_judge(
         self, hackathon_id: int, judge_user_id: int
@@ -102,8 +203,14 @@ class JudgeService(IJudgeService):
         ):
             raise HackathonJudgeAlreadyExistsException()
 
-        judge = await HackathonJudgeModel.create(
-            hackathon_id=hackathon_id, user_id=judge_user_id
+        async with in_transaction():
+            judge = await HackathonJudgeModel.create(
+                hackathon_id=hackathon_id, user_id=judge_user_id
+            )
+            await self._add_judges_changed_event(hackathon_id)
+        self._invalidate_judge_index(hackathon_id)
+        await self.hackathon_service.response_cache.invalidate(
+            hackathon_tag(hackathon_id)
         )
 
         dto = JudgeDto.from_tortoise(judge)
@@ -139,5 +246,16 @@ class JudgeService(IJudgeService):
             raise HackathonJudgeCantManageDateExpiredException()
 
         judge = await self._get_judge(hackathon_id, judge_user_id)
-        await judge.delete()
+        async with in_transaction():
+            await self.hackathon_service.lock_final_scores(hackathon_id)
+            await judge.delete()
+            await self.hackathon_service.recalculate_final_scores(hackathon_id)
+            await self._add_judges_changed_event(hackathon_id)
+        self._invalidate_judge_index(hackathon_id)
+        await self.hackathon_service.response_cache.invalidate(
+            hackathon_tag(hackathon_id)
+        )
         return JudgeDto.from_tortoise(judge)
+
+    def get_judge_index_stats(self) -> dict[str, int]:
+        return self._judge_index.stats()
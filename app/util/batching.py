@@ -0,0 +1,98 @@
+from typing import Awaitable, Callable, Generic, Hashable, Mapping, TypeVar
+import asyncio
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Собирает одиночные запросы, пришедшие в течение окна `window` секунд,
+    и выполняет их одним вызовом `fn`. Одинаковые ключи в одном окне
+    объединяются. Если в ответе `fn` нет какого-либо ключа, ожидающий его
+    вызов получает None.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[frozenset[K]], Awaitable[Mapping[K, V]]],
+        window: float,
+        max_batch_size: int = 100,
+    ):
+        self.fn = fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.batched_keys = 0
+        self.max_batch = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self._window_started = 0.0
+        self._pending: dict[K, asyncio.Future[V | None]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._dispatches: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            if not self._pending:
+                self._window_started = loop.time()
+            self._pending[key] = future
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+
+        # shield: отмена одного из ожидающих не должна отменять весь пакет
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        task = asyncio.ensure_future(
+            self._dispatch(pending, self._window_started)
+        )
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(
+        self, pending: dict[K, asyncio.Future[V | None]], started: float
+    ):
+        self.batches += 1
+        self.batched_keys += len(pending)
+        self.max_batch = max(self.max_batch, len(pending))
+
+        try:
+            results = await self.fn(frozenset(pending))
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            # задержка от первого ключа в окне до завершения пакета
+            lag = asyncio.get_running_loop().time() - started
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "batches": self.batches,
+            "batched_keys": self.batched_keys,
+            "max_batch": self.max_batch,
+            "avg_lag_ms": round(self.total_lag / max(self.batches, 1) * 1000),
+            "max_lag_ms": round(self.max_lag * 1000),
+        }
@@ -0,0 +1,49 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette.responses import JSONResponse
+from fastapi import HTTPException
+
+# запас на заголовки частей multipart и текстовые поля формы
+MULTIPART_OVERHEAD = 1024 * 1024
+
+DETAIL = "Размер запроса превышает допустимый!"
+
+
+class BodySizeLimitMiddleware:
+    """
+    Ограничивает размер тела запроса до того, как Starlette начнет
+    сохранять загружаемые файлы. Запрос с заявленным Content-Length больше
+    лимита отклоняется сразу, тело без Content-Length (chunked) считается
+    по мере чтения и обрывается при превышении лимита.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                declared = 0
+            if declared > self.max_body_size:
+                response = JSONResponse({"detail": DETAIL}, status_code=413)
+                return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # FastAPI пробрасывает HTTPException из разбора тела
+                    raise HTTPException(status_code=413, detail=DETAIL)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,192 @@
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+from app.ports.cache import ICachePort
+from collections import OrderedDict
+from pydantic import TypeAdapter
+import asyncio
+import time
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Внутрипроцессный кеш с ограничением по времени жизни записей и по
+    количеству записей (вытесняются давно не использованные).
+    `on_evict` вызывается для каждого ключа, покинувшего кеш по любой
+    причине.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int = 1024,
+        on_evict: Callable[[K], None] | None = None,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._on_evict = on_evict
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: K) -> None:
+        del self._entries[key]
+        if self._on_evict is not None:
+            self._on_evict(key)
+
+    def invalidate(self, key: K) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[K], bool]) -> None:
+        for key in [key for key in self._entries if predicate(key)]:
+            self._remove(key)
+
+    def purge_expired(self) -> None:
+        now = time.monotonic()
+        self.invalidate_where(lambda key: self._entries[key][0] <= now)
+
+    def clear(self) -> None:
+        self.invalidate_where(lambda _: True)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class SharedCache(Generic[K, V]):
+    """
+    Типизированная обертка над общим кешем: значения сериализуются в JSON
+    через pydantic, ключи получают префикс `namespace`. При бэкенде Redis
+    записи видны всем воркерам. Ошибки хранилища не пробрасываются:
+    недоступный кеш считается промахом.
+    """
+
+    def __init__(
+        self,
+        cache: ICachePort,
+        namespace: str,
+        value_type: type[V],
+        ttl: float,
+    ):
+        self.cache = cache
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._adapter: TypeAdapter[V] = TypeAdapter(value_type)
+
+    def _key(self, key: K) -> str:
+        parts = key if isinstance(key, tuple) else (key,)
+        return ":".join((self.namespace, *map(str, parts)))
+
+    def _decode(self, raw: bytes | None) -> V | None:
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._adapter.validate_json(raw)
+
+    async def get(self, key: K) -> V | None:
+        try:
+            raw = await self.cache.get(self._key(key))
+        except Exception as e:
+            print("Error during shared cache read: ", e)
+            raw = None
+
+        return self._decode(raw)
+
+    async def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        keys = list(keys)
+        try:
+            raws = await self.cache.get_many([self._key(key) for key in keys])
+        except Exception as e:
+            print("Error during shared cache read: ", e)
+            raws = [None] * len(keys)
+
+        values = {}
+        for key, raw in zip(keys, raws):
+            value = self._decode(raw)
+            if value is not None:
+                values[key] = value
+
+        return values
+
+    async def set(self, key: K, value: V, tags: Iterable[str] = ()) -> None:
+        try:
+            await self.cache.set(
+                self._key(key),
+                self._adapter.dump_json(value),
+                self.ttl,
+                tags,
+            )
+        except Exception as e:
+            print("Error during shared cache write: ", e)
+
+    async def delete(self, key: K) -> None:
+        try:
+            await self.cache.delete(self._key(key))
+        except Exception as e:
+            print("Error during shared cache invalidation: ", e)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        try:
+            await self.cache.invalidate_tags(*tags)
+        except Exception as e:
+            print("Error during shared cache invalidation: ", e)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Объединяет одновременные запросы с одинаковым ключом: пока первый
+    запрос выполняется, остальные ожидают его результат, а не идут в
+    источник данных повторно.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: dict[K, asyncio.Future[V]] = {}
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # shield: отмена одного из ожидающих не должна отменять запрос
+        # для остальных
+        return await asyncio.shield(call)
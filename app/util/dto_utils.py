@@ -1,6 +1,7 @@
 from collections import defaultdict
 from pydantic import BaseModel
 from typing import Sequence, TypeVar
+from functools import lru_cache
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -10,16 +11,48 @@ def export_int_fields(
 ) -> frozenset[int]:
     acc = set()
     for dto in dtos:
-        dumped = dto.model_dump()
-
         for field in fields:
-            val: int | None = dumped.get(field, None)
+            val: int | None = getattr(dto, field, None)
             if val:
                 acc.add(val)
 
     return frozenset(acc)
 
 
+@lru_cache
+def _get_mapped_fields(
+    dto_class: type[BaseModel], lookup_pattern: str, replace_pattern: str
+) -> tuple[tuple[str, str], ...]:
+    """
+    Пары (поле-ключ, поле-результат) для нестрогого режима, вычисляются
+    один раз на класс DTO. Поля-результаты, которых нет в модели,
+    отбрасываются, как это делал бы конструктор модели.
+    """
+    fields = dto_class.model_fields
+    pairs: list[tuple[str, str]] = []
+
+    for key in fields:
+        if lookup_pattern not in key:
+            continue
+
+        mapping_key = key.replace(lookup_pattern, replace_pattern)
+        if mapping_key in fields:
+            pairs.append((key, mapping_key))
+
+    return tuple(pairs)
+
+
+@lru_cache
+def _get_strict_field(
+    dto_class: type[BaseModel], lookup_pattern: str, replace_pattern: str
+) -> tuple[tuple[str, str], ...]:
+    fields = dto_class.model_fields
+    if lookup_pattern in fields and replace_pattern in fields:
+        return ((lookup_pattern, replace_pattern),)
+
+    return ()
+
+
 def inject_mapping(
     dtos: Sequence[T],
     mapping: defaultdict[int, str | None],
@@ -28,25 +61,30 @@ def inject_mapping(
     *,
     strict: bool,
 ) -> list[T]:
+    """
+    Заполняет поля DTO значениями из `mapping`. DTO изменяются на месте:
+    вызывающий код передает только что созданные объекты, поэтому
+    копировать каждую строку не нужно.
+    """
     injected_dtos: list[T] = []
 
     for dto in dtos:
-        dumped = dto.model_dump()
-
         if strict:
-            if dumped.get(lookup_pattern, None) is not None:
-                dumped[replace_pattern] = mapping[dumped[lookup_pattern]]
+            pairs = _get_strict_field(
+                dto.__class__, lookup_pattern, replace_pattern
+            )
+        else:
+            pairs = _get_mapped_fields(
+                dto.__class__, lookup_pattern, replace_pattern
+            )
 
-            injected_dtos.append(dto.__class__(**dumped))
-            continue
-
-        dumped_immutable = dto.model_dump()
-        for key in dumped_immutable:
-            if lookup_pattern not in key:
+        for key, mapping_key in pairs:
+            value = getattr(dto, key)
+            if strict and value is None:
                 continue
 
-            mapping_key = key.replace(lookup_pattern, replace_pattern)
-            dumped[mapping_key] = mapping[dumped[key]]
-        injected_dtos.append(dto.__class__(**dumped))
+            setattr(dto, mapping_key, mapping[value])
+
+        injected_dtos.append(dto)
 
     return injected_dtos
@@ -0,0 +1,23 @@
+from typing import Awaitable, NamedTuple, Generic, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class BranchResult(NamedTuple, Generic[T]):
+    value: T
+    available: bool
+
+
+async def optional_branch(
+    coro: Awaitable[T], fallback: T, timeout: float
+) -> BranchResult[T]:
+    """
+    Выполняет необязательную ветку составного запроса. При ошибке или
+    превышении времени ожидания возвращает fallback вместо исключения,
+    чтобы остальные ветки не отменялись.
+    """
+    try:
+        return BranchResult(await asyncio.wait_for(coro, timeout), True)
+    except Exception:
+        return BranchResult(fallback, False)
@@ -0,0 +1,165 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi import Request, Response
+from typing import Any, Awaitable, Callable, NamedTuple
+from app.ports.cache import ICachePort
+from urllib.parse import urlencode
+import hashlib
+import json
+
+HACKATHONS_TAG = "hackathons"
+
+
+def hackathon_tag(hackathon_id: int) -> str:
+    return f"hackathon:{hackathon_id}"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: dict[str, str]
+
+    def encode(self) -> bytes:
+        meta = json.dumps({"etag": self.etag, "headers": self.headers})
+        return meta.encode() + b"\n" + self.body
+
+    @staticmethod
+    def decode(raw: bytes) -> "CachedResponse":
+        meta, body = raw.split(b"\n", 1)
+        data = json.loads(meta)
+        return CachedResponse(body, data["etag"], data["headers"])
+
+
+class ResponseCache:
+    """
+    Кеш готовых JSON-ответов публичных эндпоинтов поверх общего кеша.
+    Каждый ответ помечается тегами (например, `hackathon:1`); запись в
+    сервисах инвалидирует теги, и все ответы с ними удаляются во всех
+    воркерах. TTL ограничивает устаревание данных внешних сервисов, об
+    изменении которых мы не узнаем. Клиенты получают сильный ETag и при
+    совпадении If-None-Match - ответ 304 без тела.
+    """
+
+    def __init__(self, cache: ICachePort, ttl: float):
+        self.cache = cache
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        cache.on_invalidate(self._on_invalidate)
+
+    def _on_invalidate(self, tags: tuple[str, ...]) -> None:
+        self._generation += 1
+
+    async def invalidate(self, *tags: str) -> None:
+        try:
+            await self.cache.invalidate_tags(*tags)
+        except Exception as e:
+            print("Error during response cache invalidation: ", e)
+
+    @staticmethod
+    def _key(request: Request) -> str:
+        """
+        Ключ строится из пути и только тех параметров запроса, которые
+        объявлены у эндпоинта, в отсортированном виде: произвольные
+        параметры не должны плодить записи в кеше и обходить его.
+        """
+        route = request.scope.get("route")
+        dependant = getattr(route, "dependant", None)
+        known = (
+            {param.alias for param in dependant.query_params}
+            if dependant is not None
+            else set()
+        )
+        params = sorted(
+            (name, value)
+            for name, value in request.query_params.multi_items()
+            if name in known
+        )
+        url = request.url.replace(query=urlencode(params), fragment="")
+        return f"response:{url}"
+
+    async def _load(self, key: str) -> CachedResponse | None:
+        try:
+            raw = await self.cache.get(key)
+        except Exception as e:
+            print("Error during response cache read: ", e)
+            return None
+
+        return None if raw is None else CachedResponse.decode(raw)
+
+    async def _store(
+        self, key: str, cached: CachedResponse, tags: tuple[str, ...]
+    ) -> None:
+        try:
+            await self.cache.set(key, cached.encode(), self.ttl, tags)
+        except Exception as e:
+            print("Error during response cache write: ", e)
+
+    async def respond(
+        self,
+        request: Request,
+        tags: tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] | None = None,
+    ) -> Response:
+        async def compute_without_headers() -> tuple[Any, dict[str, str]]:
+            return await compute(), {}
+
+        return await self.respond_with_headers(
+            request,
+            tags,
+            compute_without_headers,
+            cacheable=cacheable,
+        )
+
+    async def respond_with_headers(
+        self,
+        request: Request,
+        tags: tuple[str, ...],
+        compute: Callable[[], Awaitable[tuple[Any, dict[str, str]]]],
+        cacheable: Callable[[Any], bool] | None = None,
+    ) -> Response:
+        """
+        `cacheable` позволяет не сохранять ответ, например собранный
+        частично из-за недоступности внешнего сервиса. ETag при этом
+        все равно отдается.
+        """
+        key = self._key(request)
+
+        cached = await self._load(key)
+        if cached is None:
+            self.misses += 1
+            # если во время вычисления пришла инвалидация, ответ мог
+            # устареть еще до сохранения - тогда он не кешируется
+            generation = self._generation
+            content, headers = await compute()
+            body = JSONResponse(jsonable_encoder(content)).body
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            cached = CachedResponse(body, etag, headers)
+
+            if generation == self._generation and (
+                cacheable is None or cacheable(content)
+            ):
+                await self._store(key, cached, tags)
+        else:
+            self.hits += 1
+
+        headers = {
+            **cached.headers,
+            "ETag": cached.etag,
+            "Cache-Control": "no-cache",
+        }
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if cached.etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+
+        return Response(
+            content=cached.body,
+            media_type="application/json",
+            headers=headers,
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
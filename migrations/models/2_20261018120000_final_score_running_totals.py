@@ -0,0 +1,26 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "team_final_scores" ADD "weighted_sum" DOUBLE PRECISION NOT NULL DEFAULT 0;
+        ALTER TABLE "team_final_scores" ADD "judge_count" INT NOT NULL DEFAULT 0;
+        INSERT INTO "team_final_scores" ("team_id", "score", "weighted_sum", "judge_count")
+        SELECT
+            s."team_id",
+            SUM(s."score" * c."weight") / COUNT(DISTINCT s."judge_id"),
+            SUM(s."score" * c."weight"),
+            COUNT(DISTINCT s."judge_id")
+        FROM "team_scores" s
+        JOIN "hackathon_criteria" c ON c."id" = s."criterion_id"
+        GROUP BY s."team_id"
+        ON CONFLICT ("team_id") DO UPDATE SET
+            "score" = EXCLUDED."score",
+            "weighted_sum" = EXCLUDED."weighted_sum",
+            "judge_count" = EXCLUDED."judge_count";"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "team_final_scores" DROP COLUMN "weighted_sum";
+        ALTER TABLE "team_final_scores" DROP COLUMN "judge_count";"""
@@ -0,0 +1,24 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "team_final_scores" ADD "hackathon_id" INT;
+        UPDATE "team_final_scores" AS f SET "hackathon_id" = t."hackathon_id"
+        FROM (
+            SELECT DISTINCT s."team_id", c."hackathon_id"
+            FROM "team_scores" s
+            JOIN "hackathon_criteria" c ON c."id" = s."criterion_id"
+        ) t
+        WHERE f."team_id" = t."team_id";
+        DELETE FROM "team_final_scores" WHERE "hackathon_id" IS NULL;
+        ALTER TABLE "team_final_scores" ALTER COLUMN "hackathon_id" SET NOT NULL;
+        ALTER TABLE "team_final_scores" ADD CONSTRAINT "fk_team_fin_hackatho_7b1c3e" FOREIGN KEY ("hackathon_id") REFERENCES "hackathons" ("id") ON DELETE CASCADE;
+        CREATE INDEX "idx_team_final_scores_leaderboard" ON "team_final_scores" ("hackathon_id", "score");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_team_final_scores_leaderboard";
+        ALTER TABLE "team_final_scores" DROP CONSTRAINT IF EXISTS "fk_team_fin_hackatho_7b1c3e";
+        ALTER TABLE "team_final_scores" DROP COLUMN "hackathon_id";"""
@@ -0,0 +1,13 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_hackathons_start" ON "hackathons" ("start_date", "id");
+        CREATE INDEX IF NOT EXISTS "idx_hackathons_end" ON "hackathons" ("end_date");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_hackathons_start";
+        DROP INDEX IF EXISTS "idx_hackathons_end";"""
@@ -0,0 +1,92 @@
+from app.services.auth.exceptions import RestrictedPermissionException
+from app.services.auth.dto import AccessJWTPayloadDto
+from app.services.auth import PermittedAction
+from app.acl.roles import UserRoles
+from itertools import combinations
+import pytest
+import time
+
+from app.acl.permissions import (
+    PermissionAcl,
+    PublicAccess,
+    Permissions,
+    perform_check,
+)
+
+PERMISSIONS: dict[str, PermissionAcl] = {
+    name: acl
+    for name, acl in vars(Permissions).items()
+    if not name.startswith("_")
+}
+# все наборы ролей из одной и двух ролей
+ROLE_SETS = [
+    roles for size in (1, 2) for roles in combinations(UserRoles, size)
+]
+ITERATIONS = 2000
+
+
+def reference_check(acl: PermissionAcl, *roles: UserRoles) -> bool:
+    # прежняя проверка через isinstance - эталон для сравнения
+    for role in roles:
+        if isinstance(acl, PublicAccess):
+            return True
+        if isinstance(acl, UserRoles):
+            if role is acl:
+                return True
+        elif role in acl.members:
+            return True
+
+    return False
+
+
+def make_principal(*roles: UserRoles) -> AccessJWTPayloadDto:
+    return AccessJWTPayloadDto(
+        user_id=1, role=roles[0], roles=list(roles[1:]), exp=time.time() + 60
+    )
+
+
+@pytest.mark.parametrize("name", PERMISSIONS)
+def test_compiled_check_matches_reference(name):
+    acl = PERMISSIONS[name]
+    action = PermittedAction(acl)
+
+    for roles in ROLE_SETS:
+        expected = reference_check(acl, *roles)
+        assert perform_check(acl, *roles) == expected, roles
+
+        principal = make_principal(*roles)
+        if expected:
+            assert action(principal) is principal
+        else:
+            with pytest.raises(RestrictedPermissionException):
+                action(principal)
+
+
+def test_permitted_action_throughput_over_all_permissions():
+    acls = list(PERMISSIONS.values())
+    actions = [PermittedAction(acl) for acl in acls]
+    # администратор и судья одновременно проходят все проверки
+    principal = make_principal(UserRoles.Admin, UserRoles.Judge)
+    roles = (principal.role, *principal.roles)
+
+    def run_reference():
+        for _ in range(ITERATIONS):
+            for acl in acls:
+                assert reference_check(acl, *roles)
+
+    def run_compiled():
+        for _ in range(ITERATIONS):
+            for action in actions:
+                action(principal)
+
+    reference = min(_measure(run_reference) for _ in range(3))
+    compiled = min(_measure(run_compiled) for _ in range(3))
+
+    # одна проверка - побитовое И, без разбора ACL на каждый запрос
+    assert compiled < reference
+
+
+def _measure(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
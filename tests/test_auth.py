@@ -0,0 +1,122 @@
+from app.acl.roles import UserRoles, get_roles_mask
+from app.acl.permissions import Permissions
+from app.services.auth import PermittedAction
+from app.config import Settings
+import app.services.auth as auth
+import pytest
+import time
+import jwt
+
+from app.services.auth.exceptions import (
+    RestrictedPermissionException,
+    JWTParseErrorException,
+    TokenExpiredException,
+)
+
+ITERATIONS = 2000
+BACKENDS = [
+    pytest.param(auth._decode_jose, id="jose"),
+    pytest.param(auth._decode_pyjwt, id="pyjwt"),
+]
+
+
+def make_token(lifetime: float = 600, algorithm: str = "HS256", **claims):
+    payload = {
+        "user_id": 1,
+        "role": "judge",
+        "exp": int(time.time() + lifetime),
+        **claims,
+    }
+    return jwt.encode(payload, auth.JWT_SECRET, algorithm=algorithm)
+
+
+@pytest.fixture(autouse=True)
+def token_cache():
+    auth._token_cache.clear()
+    yield auth._token_cache
+    auth._token_cache.clear()
+
+
+@pytest.fixture(params=BACKENDS)
+def decoder(request, monkeypatch):
+    monkeypatch.setattr(auth, "_decode_token", request.param)
+    return request.param
+
+
+async def test_backends_decode_same_payload(decoder):
+    token = make_token(roles=["organizer"])
+
+    user = await auth.get_user_dto(token)
+
+    assert user.user_id == 1
+    assert user.roles_mask == get_roles_mask(
+        UserRoles.Judge, UserRoles.Organizer
+    )
+
+
+async def test_expired_and_invalid_tokens_are_rejected(decoder):
+    with pytest.raises(TokenExpiredException):
+        await auth.get_user_dto(make_token(lifetime=-10))
+
+    with pytest.raises(JWTParseErrorException):
+        await auth.get_user_dto("not-a-token")
+
+
+async def test_only_configured_algorithms_are_accepted(decoder):
+    assert "HS512" not in Settings.JWT_ALGORITHMS
+
+    with pytest.raises(JWTParseErrorException):
+        await auth.get_user_dto(make_token(algorithm="HS512"))
+
+
+async def test_cache_entry_does_not_outlive_token(decoder, token_cache):
+    token = make_token(lifetime=5)
+
+    first = await auth.get_user_dto(token)
+    second = await auth.get_user_dto(token)
+
+    assert second is first
+    expires_at, _ = token_cache._entries[token]
+    assert expires_at - time.monotonic() <= 5
+
+
+async def test_permitted_action_checks_roles():
+    judge = await auth.get_user_dto(make_token())
+
+    assert PermittedAction(Permissions.CreateTeamScore)(judge) is judge
+    with pytest.raises(RestrictedPermissionException):
+        PermittedAction(Permissions.CreateHackathon)(judge)
+
+
+async def run_protected_requests(token: str, action: PermittedAction) -> float:
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        action(await auth.get_user_dto(token))
+
+    return time.perf_counter() - started
+
+
+async def test_permitted_action_throughput(decoder, token_cache, monkeypatch):
+    token = make_token()
+    action = PermittedAction(Permissions.ReadTeamScores)
+    decoded = 0
+
+    def counting_decoder(token: str) -> dict:
+        nonlocal decoded
+        decoded += 1
+        return decoder(token)
+
+    monkeypatch.setattr(auth, "_decode_token", counting_decoder)
+
+    # без кеша каждый запрос заново проверяет подпись токена
+    token_cache.max_size = 0
+    uncached = await run_protected_requests(token, action)
+    assert decoded == ITERATIONS
+
+    token_cache.max_size = 1000
+    decoded = 0
+    cached = await run_protected_requests(token, action)
+
+    # подпись проверяется только при первом запросе
+    assert decoded == 1
+    assert cached * 5 < uncached
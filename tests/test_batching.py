@@ -0,0 +1,111 @@
+from app.adapters.userservice.cached import CachedUserServiceAdapter
+from app.adapters.cache.memory import InMemoryCacheAdapter
+from app.events.emitter import BroadcastEmitter
+from app.ports.userservice.dto import ExternalUserDto
+from app.util.batching import MicroBatcher
+from app.acl.roles import UserRoles
+import asyncio
+
+
+class Source:
+    """
+    Пакетный источник: для ключа k возвращает k * 10, кроме ключей из
+    `missing`.
+    """
+
+    def __init__(self, latency: float = 0.0, missing=()):
+        self.latency = latency
+        self.missing = set(missing)
+        self.batches: list[frozenset[int]] = []
+
+    async def __call__(self, keys: frozenset[int]) -> dict[int, int]:
+        self.batches.append(keys)
+        await asyncio.sleep(self.latency)
+        return {key: key * 10 for key in keys if key not in self.missing}
+
+
+async def test_keys_in_one_window_share_a_call():
+    source = Source(missing={3})
+    batcher = MicroBatcher(source, window=0.02)
+
+    results = await asyncio.gather(*(batcher.load(key) for key in (1, 2, 2, 3)))
+
+    assert results == [10, 20, 20, None]
+    assert source.batches == [frozenset((1, 2, 3))]
+    assert batcher.stats()["batched_keys"] == 3
+
+    # следующее окно - новый вызов
+    assert await batcher.load(1) == 10
+    assert len(source.batches) == 2
+
+
+async def test_full_batch_is_sent_without_waiting_for_window():
+    source = Source()
+    batcher = MicroBatcher(source, window=10, max_batch_size=3)
+
+    async with asyncio.timeout(1):
+        results = await asyncio.gather(
+            *(batcher.load(key) for key in (1, 2, 3))
+        )
+
+    assert results == [10, 20, 30]
+    assert batcher.stats()["max_batch"] == 3
+
+
+async def test_errors_reach_every_waiter():
+    async def failing(keys):
+        raise ConnectionError("upstream is down")
+
+    batcher = MicroBatcher(failing, window=0.01)
+    results = await asyncio.gather(
+        batcher.load(1), batcher.load(2), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [ConnectionError] * 2
+
+
+async def test_cancelled_waiter_does_not_cancel_batch():
+    source = Source(latency=0.05)
+    batcher = MicroBatcher(source, window=0.01)
+    cancelled = asyncio.ensure_future(batcher.load(1))
+    other = asyncio.ensure_future(batcher.load(2))
+
+    await asyncio.sleep(0.03)
+    cancelled.cancel()
+
+    assert await other == 20
+    assert source.batches == [frozenset((1, 2))]
+
+
+async def test_single_user_lookups_are_batched():
+    class Upstream:
+        base_url = ""
+
+        def __init__(self):
+            self.requests: list[frozenset[int]] = []
+
+        async def get_user_info_many(self, user_ids):
+            self.requests.append(user_ids)
+            return [
+                ExternalUserDto(
+                    id=user_id,
+                    is_banned=False,
+                    formatted_name=f"user-{user_id}",
+                    role=UserRoles.Judge,
+                )
+                for user_id in user_ids
+            ]
+
+    upstream = Upstream()
+    users = CachedUserServiceAdapter(
+        upstream, InMemoryCacheAdapter(), batch_window=0.02
+    )
+    try:
+        results = await asyncio.gather(
+            *(users.get_user_info(user_id) for user_id in range(1, 11))
+        )
+    finally:
+        BroadcastEmitter.remove_all_listeners()
+
+    assert [user.id for user in results] == list(range(1, 11))
+    assert upstream.requests == [frozenset(range(1, 11))]
@@ -0,0 +1,371 @@
+from app.adapters.userservice.cached import CachedUserServiceAdapter
+from app.adapters.cache.memory import InMemoryCacheAdapter
+from app.adapters.cache.redis import RedisCacheAdapter
+from app.ports.teamservice.dto import HackathonTeamDto
+from app.ports.userservice.dto import ExternalUserDto
+from app.util.http_cache import ResponseCache
+from fastapi import FastAPI, Query, Request
+from redis import asyncio as aioredis
+from app.util.cache import SharedCache
+from redis.exceptions import ConnectionError
+from app.acl.roles import UserRoles
+import fakeredis
+import asyncio
+import pytest
+import httpx
+
+
+@pytest.fixture
+def redis_server(monkeypatch) -> fakeredis.FakeServer:
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        aioredis,
+        "from_url",
+        lambda url: fakeredis.FakeAsyncRedis(server=server),
+    )
+    return server
+
+
+@pytest.fixture
+async def make_redis_cache(redis_server):
+    caches: list[RedisCacheAdapter] = []
+
+    async def make() -> RedisCacheAdapter:
+        cache = RedisCacheAdapter("redis://test")
+        cache.RECONNECT_MIN_DELAY = 0.01
+        await cache.connect()
+        caches.append(cache)
+        return cache
+
+    yield make
+
+    for cache in caches:
+        await cache.close()
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def cache(request, make_redis_cache):
+    if request.param == "memory":
+        return InMemoryCacheAdapter()
+
+    return await make_redis_cache()
+
+
+async def wait_for(condition, timeout: float = 1.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def test_get_set_delete(cache):
+    await cache.set("a", b"1", 10)
+    await cache.set("b", b"2", 10)
+
+    assert await cache.get("a") == b"1"
+    assert await cache.get_many(["a", "missing", "b"]) == [b"1", None, b"2"]
+
+    await cache.delete("a")
+    assert await cache.get("a") is None
+
+
+async def test_ttl(cache):
+    await cache.set("a", b"1", 0.05)
+    await asyncio.sleep(0.1)
+
+    assert await cache.get("a") is None
+
+
+async def test_invalidate_tags(cache):
+    calls = []
+    cache.on_invalidate(calls.append)
+    await cache.set("a", b"1", 10, ("hackathon:1", "hackathons"))
+    await cache.set("b", b"2", 10, ("hackathon:2", "hackathons"))
+    await cache.set("c", b"3", 10, ("hackathon:2",))
+
+    await cache.invalidate_tags("hackathon:2")
+
+    assert await cache.get_many(["a", "b", "c"]) == [b"1", None, None]
+    assert calls == [("hackathon:2",)]
+
+    await cache.invalidate_tags("hackathons")
+    assert await cache.get("a") is None
+
+
+async def test_redis_invalidation_is_broadcast(make_redis_cache):
+    first = await make_redis_cache()
+    second = await make_redis_cache()
+    received = []
+    second.on_invalidate(received.append)
+    # подписка оформляется в фоновой задаче
+    await asyncio.sleep(0.05)
+
+    await first.set("a", b"1", 10, ("hackathon:1",))
+    assert await second.get("a") == b"1"
+
+    await first.invalidate_tags("hackathon:1")
+
+    await wait_for(lambda: received == [("hackathon:1",)])
+    assert await second.get("a") is None
+
+
+async def test_redis_listener_resubscribes_after_failure(make_redis_cache):
+    first = await make_redis_cache()
+    second = await make_redis_cache()
+    received = []
+    second.on_invalidate(received.append)
+
+    pubsub = second._redis.pubsub
+    failures = 2
+
+    def failing_pubsub(**kwargs):
+        nonlocal failures
+        subscription = pubsub(**kwargs)
+        if failures > 0:
+            failures -= 1
+
+            async def listen():
+                raise ConnectionError("connection lost")
+                yield
+
+            subscription.listen = listen
+        return subscription
+
+    second._redis.pubsub = failing_pubsub
+    second._listener.cancel()
+    second._listener = asyncio.create_task(second._listen())
+
+    await wait_for(lambda: failures == 0)
+    await asyncio.sleep(0.1)
+    await first.invalidate_tags("hackathon:1")
+
+    await wait_for(lambda: received == [("hackathon:1",)])
+    assert not second._listener.done()
+
+
+async def test_memory_tag_index_is_pruned_on_eviction():
+    cache = InMemoryCacheAdapter(max_size=2)
+    for i in range(100):
+        await cache.set(f"key-{i}", b"v", 10, (f"tag-{i}", "all"))
+
+    assert set(cache._tags) == {"tag-98", "tag-99", "all"}
+    assert cache._tags["all"] == {"key-98", "key-99"}
+
+
+async def test_memory_tag_index_is_pruned_on_expiry():
+    cache = InMemoryCacheAdapter()
+    cache.PURGE_INTERVAL = 10
+    for i in range(5):
+        await cache.set(f"short-{i}", b"v", 0.01, ("short",))
+    await asyncio.sleep(0.05)
+
+    # истекшие ключи удаляются при чтении и периодически при записи
+    assert await cache.get("short-0") is None
+    assert cache._tags["short"] == {f"short-{i}" for i in range(1, 5)}
+
+    for i in range(10):
+        await cache.set(f"long-{i}", b"v", 10, ("long",))
+
+    assert "short" not in cache._tags
+    assert len(cache._tags["long"]) == 10
+
+
+async def test_memory_overwrite_replaces_tags():
+    cache = InMemoryCacheAdapter()
+    await cache.set("a", b"1", 10, ("old",))
+    await cache.set("a", b"2", 10, ("new",))
+
+    assert "old" not in cache._tags
+    await cache.invalidate_tags("new")
+    assert await cache.get("a") is None
+
+
+async def test_shared_cache_round_trip(cache):
+    teams: SharedCache[int, list[HackathonTeamDto]] = SharedCache(
+        cache, "hackathon_teams", list[HackathonTeamDto], 10
+    )
+    value = [HackathonTeamDto(id=1, hackathon_id=1, name="team")]
+
+    await teams.set(1, value, ("teams:hackathon:1",))
+
+    assert await teams.get(1) == value
+    assert await teams.get_many([1, 2]) == {1: value}
+    assert teams.stats() == {"hits": 2, "misses": 1}
+
+    await teams.invalidate_tags("teams:hackathon:1")
+    assert await teams.get(1) is None
+
+
+async def test_shared_cache_treats_backend_errors_as_misses(make_redis_cache):
+    cache = await make_redis_cache()
+    teams: SharedCache[int, HackathonTeamDto] = SharedCache(
+        cache, "teams", HackathonTeamDto, 10
+    )
+    await cache.close()
+
+    await teams.set(1, HackathonTeamDto(id=1, hackathon_id=1, name="team"))
+    assert await teams.get(1) is None
+
+
+async def test_response_cache_key_ignores_unknown_and_reordered_params():
+    response_cache = ResponseCache(InMemoryCacheAdapter(), 10)
+    app = FastAPI()
+    calls = 0
+
+    @app.get("/items")
+    async def items(
+        request: Request,
+        limit: int | None = Query(None),
+        order: str = Query("asc"),
+    ):
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return {"calls": calls}
+
+        return await response_cache.respond(request, ("items",), compute)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as http:
+        first = await http.get("/items?limit=1&order=desc")
+        reordered = await http.get("/items?order=desc&limit=1")
+        with_junk = await http.get("/items?limit=1&order=desc&_=123")
+        other = await http.get("/items?limit=2")
+
+    assert first.json() == reordered.json() == with_junk.json() == {"calls": 1}
+    assert other.json() == {"calls": 2}
+    assert response_cache.stats() == {"hits": 2, "misses": 2}
+
+
+async def test_user_cache_is_shared_between_workers(make_redis_cache):
+    class Upstream:
+        base_url = ""
+        calls = 0
+
+        async def get_user_info_many(self, user_ids):
+            Upstream.calls += 1
+            return [
+                ExternalUserDto(
+                    id=user_id,
+                    is_banned=False,
+                    formatted_name=f"user-{user_id}",
+                    role=UserRoles.Judge,
+                )
+                for user_id in user_ids
+            ]
+
+    first = CachedUserServiceAdapter(Upstream(), await make_redis_cache())
+    second = CachedUserServiceAdapter(Upstream(), await make_redis_cache())
+
+    await first.get_user_info_many(frozenset((1, 2)))
+    users = await second.get_user_info_many(frozenset((1, 2)))
+
+    assert sorted(user.id for user in users) == [1, 2]
+    assert Upstream.calls == 1
+
+    await second.invalidate(1)
+    await first.get_user_info(1)
+    assert Upstream.calls == 2
+
+
+@pytest.fixture
+async def cached_app():
+    """
+    Эндпоинт /items/{item_id} отдает текущее значение из `state` через
+    ResponseCache с тегом элемента.
+    """
+    response_cache = ResponseCache(InMemoryCacheAdapter(), 10)
+    app = FastAPI()
+    state = {"value": 1, "calls": 0, "cacheable": True, "during": None}
+
+    @app.get("/items/{item_id}")
+    async def item(request: Request, item_id: int):
+        async def compute():
+            state["calls"] += 1
+            if state["during"] is not None:
+                await state["during"]()
+            return {"value": state["value"]}, {"X-Next-Cursor": "next"}
+
+        return await response_cache.respond_with_headers(
+            request,
+            (f"item:{item_id}",),
+            compute,
+            cacheable=lambda content: state["cacheable"],
+        )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as http:
+        yield http, response_cache, state
+
+
+async def test_conditional_get_returns_not_modified(cached_app):
+    http, _, state = cached_app
+
+    first = await http.get("/items/1")
+    etag = first.headers["etag"]
+    assert first.json() == {"value": 1}
+    assert first.headers["x-next-cursor"] == "next"
+
+    not_modified = await http.get(
+        "/items/1", headers={"If-None-Match": f'"other", {etag}'}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.headers["x-next-cursor"] == "next"
+
+    stale = await http.get("/items/1", headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+    assert stale.json() == {"value": 1}
+    assert state["calls"] == 1
+
+
+async def test_invalidated_response_gets_new_etag(cached_app):
+    http, response_cache, state = cached_app
+    etag = (await http.get("/items/1")).headers["etag"]
+    other_etag = (await http.get("/items/2")).headers["etag"]
+
+    state["value"] = 2
+    await response_cache.invalidate("item:1")
+
+    changed = await http.get("/items/1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json() == {"value": 2}
+    assert changed.headers["etag"] != etag
+
+    # ответы с другими тегами остаются в кеше
+    untouched = await http.get(
+        "/items/2", headers={"If-None-Match": other_etag}
+    )
+    assert untouched.status_code == 304
+    assert state["calls"] == 3
+
+
+async def test_response_computed_across_invalidation_is_not_stored(cached_app):
+    http, response_cache, state = cached_app
+
+    async def invalidate():
+        state["during"] = None
+        await response_cache.invalidate("item:1")
+
+    state["during"] = invalidate
+    await http.get("/items/1")
+    await http.get("/items/1")
+
+    assert state["calls"] == 2
+
+
+async def test_uncacheable_response_still_has_etag(cached_app):
+    http, _, state = cached_app
+    state["cacheable"] = False
+
+    first = await http.get("/items/1")
+    second = await http.get(
+        "/items/1", headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert second.status_code == 304
+    assert state["calls"] == 2
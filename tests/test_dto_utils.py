@@ -0,0 +1,140 @@
+from app.services.hackathon_teams.dto import HackathonTeamScoreDto
+from collections import defaultdict
+from pydantic import BaseModel
+import app.util.dto_utils as dto_utils
+import pytest
+import time
+
+ROWS = 10_000
+
+
+def reference_export_int_fields(dtos, *fields):
+    # прежняя реализация через model_dump - эталон для сравнения
+    acc = set()
+    for dto in dtos:
+        dumped = dto.model_dump()
+        for field in fields:
+            val = dumped.get(field, None)
+            if val:
+                acc.add(val)
+
+    return frozenset(acc)
+
+
+def reference_inject_mapping(
+    dtos, mapping, lookup_pattern, replace_pattern, *, strict
+):
+    injected_dtos = []
+    for dto in dtos:
+        dumped = dto.model_dump()
+        if strict:
+            if dumped.get(lookup_pattern, None) is not None:
+                dumped[replace_pattern] = mapping[dumped[lookup_pattern]]
+
+            injected_dtos.append(dto.__class__(**dumped))
+            continue
+
+        for key in dto.model_dump():
+            if lookup_pattern not in key:
+                continue
+
+            mapping_key = key.replace(lookup_pattern, replace_pattern)
+            dumped[mapping_key] = mapping[dumped[key]]
+        injected_dtos.append(dto.__class__(**dumped))
+
+    return injected_dtos
+
+
+class JudgeRowDto(BaseModel):
+    team_id: int
+    judge_user_id: int | None = None
+    team_name: str | None = None
+    judge_user_name: str | None = None
+
+
+def make_scores() -> list[HackathonTeamScoreDto]:
+    return [
+        HackathonTeamScoreDto(
+            id=i,
+            team_id=i % 100,
+            criterion_id=i % 5,
+            judge_user_id=i % 7 + 1,
+            score=i % 100,
+        )
+        for i in range(ROWS)
+    ]
+
+
+def make_rows() -> list[JudgeRowDto]:
+    return [
+        JudgeRowDto(team_id=i % 100, judge_user_id=i % 7 or None)
+        for i in range(ROWS)
+    ]
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    return min(timings)
+
+
+NAMES = defaultdict(lambda: None, {i: f"name-{i}" for i in range(100)})
+
+CASES = [
+    pytest.param(make_scores, "team_id", "team_name", True, id="strict"),
+    pytest.param(
+        make_scores, "judge_user_id", "judge_user_name", True, id="strict-2"
+    ),
+    pytest.param(make_rows, "team_id", "team_name", True, id="strict-none"),
+    pytest.param(make_rows, "user_id", "user_name", False, id="non-strict"),
+]
+
+
+def test_export_int_fields_matches_reference_and_is_faster():
+    dtos = make_scores()
+
+    assert dto_utils.export_int_fields(
+        dtos, "team_id", "judge_user_id"
+    ) == reference_export_int_fields(dtos, "team_id", "judge_user_id")
+
+    new = best_of(lambda: dto_utils.export_int_fields(dtos, "team_id"))
+    old = best_of(lambda: reference_export_int_fields(dtos, "team_id"))
+    assert new * 2 < old
+
+
+@pytest.mark.parametrize("make, lookup, replace, strict", CASES)
+def test_inject_mapping_matches_reference(make, lookup, replace, strict):
+    expected = reference_inject_mapping(
+        make(), NAMES, lookup, replace, strict=strict
+    )
+    actual = dto_utils.inject_mapping(
+        make(), NAMES, lookup, replace, strict=strict
+    )
+
+    assert [dto.model_dump() for dto in actual] == [
+        dto.model_dump() for dto in expected
+    ]
+
+
+@pytest.mark.parametrize("make, lookup, replace, strict", CASES)
+def test_inject_mapping_is_faster_on_10k_rows(make, lookup, replace, strict):
+    # inject_mapping меняет DTO на месте, поэтому каждый прогон получает
+    # свежий список; его создание в замер не входит
+    batches = [make() for _ in range(3)]
+    new = best_of(
+        lambda: dto_utils.inject_mapping(
+            batches.pop(), NAMES, lookup, replace, strict=strict
+        )
+    )
+
+    dtos = make()
+    old = best_of(
+        lambda: reference_inject_mapping(
+            dtos, NAMES, lookup, replace, strict=strict
+        )
+    )
+    assert new * 2 < old
@@ -0,0 +1,350 @@
+from app.adapters.event_consumer.aiopika import AioPikaEventConsumerAdapter
+from app.models.hackathon import HackathonJudgeModel
+from app.events import register_events
+import aio_pika
+import asyncio
+import pytest
+import json
+
+BATCH_WINDOW = 0.05
+
+
+class FakeMessage:
+    def __init__(self, routing_key: str, body: bytes):
+        self.routing_key = routing_key
+        self.body = body
+        self.content_type = "application/json"
+        self.headers: dict = {}
+        self.acked = False
+        self.requeued = False
+
+    async def ack(self):
+        self.acked = True
+
+    async def nack(self, requeue: bool = True):
+        self.requeued = requeue
+
+
+class FakeQueueIterator:
+    def __init__(self, queue: "FakeQueue"):
+        self.queue = queue
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> FakeMessage:
+        return await self.queue.messages.get()
+
+
+class FakeQueue:
+    def __init__(self, name: str):
+        self.name = name
+        self.routing_keys: list[str] = []
+        self.messages: asyncio.Queue[FakeMessage] = asyncio.Queue()
+
+    async def bind(self, exchange, routing_key: str = ""):
+        self.routing_keys.append(routing_key)
+
+    def iterator(self, no_ack: bool = False) -> FakeQueueIterator:
+        return FakeQueueIterator(self)
+
+
+class FakeExchange:
+    def __init__(self):
+        self.published: list[tuple[str, aio_pika.Message]] = []
+        self.fail = False
+
+    async def publish(self, message: aio_pika.Message, routing_key: str):
+        if self.fail:
+            raise ConnectionError("channel is closed")
+        self.published.append((routing_key, message))
+
+
+class FakeBroker:
+    def __init__(self):
+        self.exchanges: dict[str, FakeExchange] = {}
+        self.queues: list[FakeQueue] = []
+        self.prefetch_count = 0
+
+    async def channel(self):
+        return self
+
+    async def set_qos(self, prefetch_count: int):
+        self.prefetch_count = prefetch_count
+
+    async def declare_exchange(self, name: str, type, durable: bool = False):
+        return self.exchanges.setdefault(name, FakeExchange())
+
+    async def declare_queue(self, name: str = "", **kwargs) -> FakeQueue:
+        queue = FakeQueue(name)
+        self.queues.append(queue)
+        return queue
+
+    def deliver(self, queue_name: str, event_name: str, data) -> FakeMessage:
+        body = json.dumps({"event_name": event_name, "data": data})
+        return self.deliver_raw(queue_name, event_name, body.encode())
+
+    def deliver_raw(
+        self, queue_name: str, routing_key: str, body: bytes
+    ) -> FakeMessage:
+        message = FakeMessage(routing_key, body)
+        queue = next(q for q in self.queues if q.name == queue_name)
+        queue.messages.put_nowait(message)
+        return message
+
+    def dead_letters(self) -> list[tuple[str, aio_pika.Message]]:
+        return self.exchanges["events.dead"].published
+
+
+@pytest.fixture
+def broker(monkeypatch) -> FakeBroker:
+    broker = FakeBroker()
+
+    async def connect_robust(url):
+        return broker
+
+    monkeypatch.setattr(aio_pika, "connect_robust", connect_robust)
+    return broker
+
+
+@pytest.fixture
+async def make_consumer(broker):
+    async def make(**kwargs) -> AioPikaEventConsumerAdapter:
+        kwargs.setdefault("queue_name", "hackathonservice")
+        kwargs.setdefault("dead_letter_exchange", "events.dead")
+        kwargs.setdefault("batch_window", BATCH_WINDOW)
+        consumer = AioPikaEventConsumerAdapter("amqp://test", **kwargs)
+        await consumer.connect()
+        return consumer
+
+    yield make
+
+    # циклы потребителей работают до отмены
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def wait_for(condition, timeout: float = 1.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.005)
+
+
+async def noop(payload: dict) -> None:
+    pass
+
+
+async def test_batch_stats_record_lag(broker, make_consumer):
+    consumer = await make_consumer()
+    batches = []
+
+    async def handle_batch(payloads: list[dict]):
+        batches.append([payload["data"]["id"] for payload in payloads])
+
+    await consumer.create_consuming_loop(
+        ["user.deleted"],
+        noop,
+        batch_routing_keys={"user.deleted"},
+        batch_handler=handle_batch,
+    )
+    messages = [
+        broker.deliver("hackathonservice", "user.deleted", {"id": i})
+        for i in range(3)
+    ]
+
+    await wait_for(lambda: all(message.acked for message in messages))
+
+    assert batches == [[0, 1, 2]]
+    stats = consumer.get_batch_stats()
+    assert stats["batches"] == 1
+    assert stats["max_batch"] == 3
+    # пакет ждал окна накопления с получения первого сообщения
+    assert stats["max_lag"] >= BATCH_WINDOW
+    assert stats["avg_lag"] == stats["max_lag"]
+
+
+async def test_failing_message_does_not_sink_its_batch(broker, make_consumer):
+    consumer = await make_consumer()
+    applied = []
+
+    async def handle_batch(payloads: list[dict]):
+        if any(payload["data"]["id"] == 1 for payload in payloads):
+            raise ValueError("bad event")
+        applied.extend(payload["data"]["id"] for payload in payloads)
+
+    await consumer.create_consuming_loop(
+        ["user.deleted"],
+        noop,
+        batch_routing_keys={"user.deleted"},
+        batch_handler=handle_batch,
+    )
+    messages = [
+        broker.deliver("hackathonservice", "user.deleted", {"id": i})
+        for i in range(3)
+    ]
+
+    await wait_for(lambda: all(message.acked for message in messages))
+
+    assert applied == [0, 2]
+    assert [message.body for _, message in broker.dead_letters()] == [
+        messages[1].body
+    ]
+
+
+async def test_malformed_user_events_are_isolated(
+    broker, make_consumer, make_services, make_hackathon
+):
+    make_services()
+    hackathon = await make_hackathon("upcoming")
+    for user_id in (1, 2):
+        await HackathonJudgeModel.create(hackathon=hackathon, user_id=user_id)
+
+    consumer = await make_consumer()
+    await register_events(consumer)
+    messages = [
+        broker.deliver("hackathonservice", "user.deleted", {"id": 1}),
+        # у события блокировки нет поля is_banned
+        broker.deliver("hackathonservice", "user.banned", {"id": 2}),
+        broker.deliver("hackathonservice", "user.deleted", {}),
+    ]
+
+    await wait_for(lambda: all(message.acked for message in messages))
+
+    assert await HackathonJudgeModel.filter(hackathon=hackathon).values_list(
+        "user_id", flat=True
+    ) == [2]
+    assert sorted(
+        message.body for _, message in broker.dead_letters()
+    ) == sorted((messages[1].body, messages[2].body))
+
+
+async def test_consumer_binds_queue_and_limits_prefetch(broker, make_consumer):
+    consumer = await make_consumer(prefetch_count=7)
+
+    await consumer.create_consuming_loop(
+        ["team.hackathon_team_deleted", "user.banned"], noop
+    )
+
+    assert broker.prefetch_count == 7
+    queue = next(q for q in broker.queues if q.name == "hackathonservice")
+    assert queue.routing_keys == ["team.hackathon_team_deleted", "user.banned"]
+    dead = next(q for q in broker.queues if q.name == "hackathonservice.dead")
+    assert dead.routing_keys == [""]
+
+
+async def test_same_key_is_ordered_other_keys_run_concurrently(
+    broker, make_consumer
+):
+    consumer = await make_consumer(workers=4)
+    log = []
+    release = asyncio.Event()
+
+    async def handle(payload: dict):
+        event_id, seq = payload["data"]["id"], payload["data"]["seq"]
+        # первое сообщение ключа 1 ждет, пока не обработан ключ 2
+        if (event_id, seq) == (1, 0):
+            await release.wait()
+        log.append((event_id, seq))
+        if event_id == 2:
+            release.set()
+
+    await consumer.create_consuming_loop(
+        ["team.hackathon_team_deleted"], handle
+    )
+    messages = [
+        broker.deliver(
+            "hackathonservice",
+            "team.hackathon_team_deleted",
+            {"id": 1, "seq": 0},
+        ),
+        broker.deliver(
+            "hackathonservice",
+            "team.hackathon_team_deleted",
+            {"id": 1, "seq": 1},
+        ),
+        broker.deliver(
+            "hackathonservice",
+            "team.hackathon_team_deleted",
+            {"id": 2, "seq": 0},
+        ),
+    ]
+
+    await wait_for(lambda: all(message.acked for message in messages))
+
+    assert log == [(2, 0), (1, 0), (1, 1)]
+
+
+async def test_failed_and_undecodable_messages_are_dead_lettered(
+    broker, make_consumer
+):
+    consumer = await make_consumer()
+
+    async def handle(payload: dict):
+        if payload["data"]["id"] == 1:
+            raise ValueError("bad event")
+
+    await consumer.create_consuming_loop(
+        ["team.hackathon_team_deleted"], handle
+    )
+    failed = broker.deliver(
+        "hackathonservice", "team.hackathon_team_deleted", {"id": 1}
+    )
+    garbage = broker.deliver_raw(
+        "hackathonservice", "team.hackathon_team_deleted", b"{"
+    )
+    ok = broker.deliver(
+        "hackathonservice", "team.hackathon_team_deleted", {"id": 2}
+    )
+
+    await wait_for(lambda: failed.acked and garbage.acked and ok.acked)
+
+    dead = {message.body: message for _, message in broker.dead_letters()}
+    assert dead.keys() == {failed.body, garbage.body}
+    headers = dead[failed.body].headers
+    assert headers["x-original-routing-key"] == "team.hackathon_team_deleted"
+    assert "bad event" in headers["x-error"]
+
+
+async def test_message_is_requeued_when_dead_lettering_fails(
+    broker, make_consumer
+):
+    consumer = await make_consumer()
+
+    async def handle(payload: dict):
+        raise ValueError("bad event")
+
+    await consumer.create_consuming_loop(
+        ["team.hackathon_team_deleted"], handle
+    )
+    broker.exchanges["events.dead"].fail = True
+    message = broker.deliver(
+        "hackathonservice", "team.hackathon_team_deleted", {"id": 1}
+    )
+
+    await wait_for(lambda: message.requeued)
+
+    assert not message.acked
+
+
+async def test_broadcast_loop_survives_handler_errors(broker, make_consumer):
+    consumer = await make_consumer()
+    handled = []
+
+    async def handle(payload: dict):
+        if payload["data"]["id"] == 1:
+            raise ValueError("bad event")
+        handled.append(payload["data"]["id"])
+
+    await consumer.create_broadcast_loop(["hackathon.updated"], handle)
+    broker.deliver("", "hackathon.updated", {"id": 1})
+    broker.deliver("", "hackathon.updated", {"id": 2})
+
+    await wait_for(lambda: handled == [2])
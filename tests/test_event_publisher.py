@@ -0,0 +1,159 @@
+from app.adapters.event_publisher.aiopika import AioPikaEventPublisherAdapter
+from app.ports.event_publisher.exceptions import (
+    EventPublisherBufferFullException,
+)
+from app.ports.event_publisher.dto import EventPayload
+from pydantic import BaseModel
+from uuid import uuid4
+import aio_pika
+import asyncio
+import pytest
+import time
+
+# задержка подтверждения одного сообщения брокером
+CONFIRM_LATENCY = 0.002
+EVENTS = 1000
+
+
+class EventDto(BaseModel):
+    id: int
+
+
+class FakeExchange:
+    def __init__(self, broker: "FakeBroker"):
+        self.broker = broker
+
+    async def publish(self, message: aio_pika.Message, routing_key: str):
+        await asyncio.sleep(CONFIRM_LATENCY)
+        if self.broker.failures > 0:
+            self.broker.failures -= 1
+            raise ConnectionError("nack")
+
+        self.broker.messages.append((routing_key, message))
+
+
+class FakeChannel:
+    def __init__(self, broker: "FakeBroker"):
+        self.exchange = FakeExchange(broker)
+        self.is_closed = False
+
+    async def declare_exchange(self, name, type):
+        return self.exchange
+
+    async def get_exchange(self, name, ensure=True):
+        return self.exchange
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FakeBroker:
+    def __init__(self):
+        self.messages: list[tuple[str, aio_pika.Message]] = []
+        self.channels: list[FakeChannel] = []
+        self.failures = 0
+
+    async def channel(self, publisher_confirms=True):
+        channel = FakeChannel(self)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def broker(monkeypatch) -> FakeBroker:
+    broker = FakeBroker()
+
+    async def connect_robust(url):
+        return broker
+
+    monkeypatch.setattr(aio_pika, "connect_robust", connect_robust)
+    return broker
+
+
+def make_publisher(**kwargs) -> AioPikaEventPublisherAdapter:
+    kwargs.setdefault("channel_pool_size", 4)
+    kwargs.setdefault("batch_size", 100)
+    kwargs.setdefault("buffer_size", EVENTS)
+    kwargs.setdefault("retry_interval", 0.01)
+    return AioPikaEventPublisherAdapter("amqp://test", **kwargs)
+
+
+async def test_publish_throughput(broker):
+    publisher = make_publisher()
+    await publisher.connect()
+
+    started = time.perf_counter()
+    for i in range(EVENTS):
+        await publisher.publish("hackathon.updated", EventDto(id=i))
+    await publisher.close()
+    elapsed = time.perf_counter() - started
+
+    payloads = [
+        (routing_key, message, EventPayload.model_validate_json(message.body))
+        for routing_key, message in broker.messages
+    ]
+    assert all(
+        routing_key == payload.event_name
+        and message.message_id == str(payload.event_id)
+        for routing_key, message, payload in payloads
+    )
+    ids = sorted(payload.data["id"] for _, _, payload in payloads)
+    assert ids == list(range(EVENTS))
+    # публикация по одному сообщению с ожиданием подтверждения заняла бы
+    # EVENTS * CONFIRM_LATENCY
+    assert elapsed < EVENTS * CONFIRM_LATENCY / 5
+
+
+async def test_publish_batch_throughput(broker):
+    publisher = make_publisher()
+    await publisher.connect()
+    payloads = [
+        EventPayload(
+            event_id=uuid4(), event_name="hackathon.updated", data={"id": i}
+        )
+        for i in range(EVENTS)
+    ]
+
+    started = time.perf_counter()
+    await publisher.publish_batch(payloads)
+    elapsed = time.perf_counter() - started
+    await publisher.close()
+
+    assert len(broker.messages) == EVENTS
+    assert {message.message_id for _, message in broker.messages} == {
+        str(payload.event_id) for payload in payloads
+    }
+    assert elapsed < EVENTS * CONFIRM_LATENCY / 5
+
+
+async def test_only_rejected_messages_are_retried(broker):
+    broker.failures = 3
+    publisher = make_publisher()
+    await publisher.connect()
+
+    for i in range(10):
+        await publisher.publish("hackathon.updated", EventDto(id=i))
+    await publisher.close()
+
+    ids = [
+        EventPayload.model_validate_json(message.body).data["id"]
+        for _, message in broker.messages
+    ]
+    assert sorted(ids) == list(range(10))
+
+
+async def test_publish_is_time_bound_when_buffer_is_full():
+    publisher = make_publisher(buffer_size=1, publish_timeout=0.05)
+    # буфер никто не разбирает
+    publisher._flush_task = asyncio.create_task(asyncio.sleep(10))
+    await publisher.publish("hackathon.updated", EventDto(id=1))
+
+    started = time.perf_counter()
+    with pytest.raises(EventPublisherBufferFullException):
+        await publisher.publish("hackathon.updated", EventDto(id=2))
+
+    assert time.perf_counter() - started < 0.5
+    publisher._flush_task.cancel()
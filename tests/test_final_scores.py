@@ -0,0 +1,270 @@
+from datetime import datetime, timedelta, timezone
+from app.events.emitter import BatchEmitter, Events
+from collections import defaultdict
+import asyncio
+import random
+import pytest
+
+from app.models.hackathon import (
+    HackathonTeamFinalScore,
+    HackathonTeamScore,
+    HackathonCriterionModel,
+    HackathonJudgeModel,
+    HackathonModel,
+)
+
+from app.services.hackathon_teams.exceptions import (
+    HackathonTeamAlreadyScoredException,
+    HackathonTeamNoScoresException,
+)
+
+
+async def stored_scores(hackathon_id: int) -> dict[int, tuple]:
+    finals = await HackathonTeamFinalScore.filter(hackathon_id=hackathon_id)
+    return {
+        final.team_id: (final.judge_count, final.weighted_sum, final.score)
+        for final in finals
+    }
+
+
+async def assert_matches_aggregate(services, hackathon_id: int) -> None:
+    """
+    Итоговые оценки, поддерживаемые инкрементально, совпадают с полным
+    пересчетом по всем оценкам хакатона.
+    """
+    rows = await services.hackathons._aggregate_team_scores(hackathon_id)
+    expected = {
+        row["team_id"]: (
+            row["judge_count"],
+            pytest.approx(row["weighted_sum"]),
+            pytest.approx(row["score"]),
+        )
+        for row in rows
+    }
+
+    assert await stored_scores(hackathon_id) == expected
+
+
+@pytest.fixture
+async def scoring(make_services, make_hackathon):
+    services = make_services()
+    hackathon = await make_hackathon("judging")
+    criteria = [
+        await HackathonCriterionModel.create(
+            hackathon=hackathon, name=name, weight=0.5
+        )
+        for name in ("first", "second")
+    ]
+    judges = [
+        await HackathonJudgeModel.create(hackathon=hackathon, user_id=user_id)
+        for user_id in (1, 2)
+    ]
+    return services, hackathon, criteria, judges
+
+
+async def test_empty_bulk_is_rejected(scoring):
+    services, hackathon, criteria, judges = scoring
+
+    with pytest.raises(HackathonTeamNoScoresException):
+        await services.teams.set_scores_bulk(
+            hackathon.id, 10, judges[0].id, 1, []
+        )
+
+    assert await stored_scores(hackathon.id) == {}
+
+
+async def test_mixed_writes_match_aggregate(scoring):
+    services, hackathon, criteria, judges = scoring
+    first, second = criteria
+
+    await services.teams.set_scores_bulk(
+        hackathon.id, 10, judges[0].id, 1, [(first.id, 80), (second.id, 60)]
+    )
+    await assert_matches_aggregate(services, hackathon.id)
+    assert (await stored_scores(hackathon.id))[10][2] == pytest.approx(70)
+
+    # второй судья ставит оценки по одной, затем пакетом другой команде
+    await services.teams.set_score(
+        hackathon.id, 10, judges[1].id, 2, first.id, 20
+    )
+    await assert_matches_aggregate(services, hackathon.id)
+    await services.teams.set_score(
+        hackathon.id, 10, judges[1].id, 2, second.id, 40
+    )
+    await services.teams.set_scores_bulk(
+        hackathon.id, 11, judges[1].id, 2, [(second.id, 100)]
+    )
+    await services.teams.set_score(
+        hackathon.id, 11, judges[0].id, 1, first.id, 10
+    )
+    await services.teams.set_scores_bulk(
+        hackathon.id, 11, judges[0].id, 1, [(second.id, 30)]
+    )
+
+    await assert_matches_aggregate(services, hackathon.id)
+    assert await stored_scores(hackathon.id) == {
+        10: (2, pytest.approx(100), pytest.approx(50)),
+        11: (2, pytest.approx(70), pytest.approx(35)),
+    }
+
+
+async def test_repeated_score_leaves_final_score_intact(scoring):
+    services, hackathon, criteria, judges = scoring
+    first, second = criteria
+    await services.teams.set_score(
+        hackathon.id, 10, judges[0].id, 1, first.id, 80
+    )
+    before = await stored_scores(hackathon.id)
+
+    with pytest.raises(HackathonTeamAlreadyScoredException):
+        await services.teams.set_scores_bulk(
+            hackathon.id, 10, judges[0].id, 1, [(second.id, 50), (first.id, 10)]
+        )
+    with pytest.raises(HackathonTeamAlreadyScoredException):
+        await services.teams.set_score(
+            hackathon.id, 10, judges[0].id, 1, first.id, 10
+        )
+
+    assert await stored_scores(hackathon.id) == before
+    await assert_matches_aggregate(services, hackathon.id)
+
+
+async def reopen(make_services, hackathon: HackathonModel):
+    """
+    Переносит хакатон обратно в этап до начала, когда можно менять жюри и
+    критерии, и возвращает сервисы с пустыми кешами сроков.
+    """
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    await HackathonModel.filter(id=hackathon.id).update(
+        start_date=start,
+        score_start_date=start + timedelta(days=1),
+        end_date=start + timedelta(days=2),
+    )
+    return make_services()
+
+
+async def score_all(services, hackathon, criteria, judges) -> None:
+    for team_id, offset in ((10, 0), (11, 30)):
+        for user_id, judge in enumerate(judges, start=1):
+            await services.teams.set_scores_bulk(
+                hackathon.id,
+                team_id,
+                judge.id,
+                user_id,
+                [
+                    (criterion.id, offset + 10 * user_id + i)
+                    for i, criterion in enumerate(criteria)
+                ],
+            )
+
+
+async def test_concurrent_first_scores_are_all_counted(scoring):
+    services, hackathon, criteria, judges = scoring
+
+    await asyncio.gather(
+        *(
+            services.teams.set_score(
+                hackathon.id, 10, judge.id, user_id, criterion.id, 50
+            )
+            for user_id, judge in enumerate(judges, start=1)
+            for criterion in criteria
+        )
+    )
+
+    await assert_matches_aggregate(services, hackathon.id)
+    assert await HackathonTeamFinalScore.filter(team_id=10).count() == 1
+    assert (await stored_scores(hackathon.id))[10][0] == 2
+
+
+async def test_judge_removal_recalculates(make_services, scoring):
+    services, hackathon, criteria, judges = scoring
+    await score_all(services, hackathon, criteria, judges)
+    services = await reopen(make_services, hackathon)
+
+    await services.judges.delete_judge(hackathon.id, 1)
+
+    await assert_matches_aggregate(services, hackathon.id)
+    assert {
+        count for count, _, _ in (await stored_scores(hackathon.id)).values()
+    } == {1}
+
+
+async def test_deleted_user_judges_are_recalculated(make_services, scoring):
+    services, hackathon, criteria, judges = scoring
+    await score_all(services, hackathon, criteria, judges)
+
+    on_users_deleted = BatchEmitter.listeners(Events.UserDeleted)[0]
+    await on_users_deleted([{"data": {"id": 1}}, {"data": {"id": 2}}])
+
+    # без оценок команды пропадают из таблицы лидеров
+    assert await stored_scores(hackathon.id) == {}
+    await assert_matches_aggregate(services, hackathon.id)
+
+
+async def test_criterion_changes_recalculate(make_services, scoring):
+    services, hackathon, criteria, judges = scoring
+    await score_all(services, hackathon, criteria, judges)
+    services = await reopen(make_services, hackathon)
+    first, second = criteria
+
+    await services.hackathons.update_criterion(
+        hackathon.id, first.id, first.name, 0.25
+    )
+    await assert_matches_aggregate(services, hackathon.id)
+
+    await services.hackathons.delete_criterion(hackathon.id, second.id)
+    await assert_matches_aggregate(services, hackathon.id)
+    assert (await stored_scores(hackathon.id))[10][2] == pytest.approx(
+        (10 + 20) * 0.25 / 2
+    )
+
+
+async def test_aggregate_matches_reference(make_services, make_hackathon):
+    services = make_services()
+    rng = random.Random(7)
+    hackathons = [await make_hackathon("judging") for _ in range(2)]
+    for hackathon in hackathons:
+        criteria = [
+            await HackathonCriterionModel.create(
+                hackathon=hackathon, name=f"c{i}", weight=rng.random()
+            )
+            for i in range(3)
+        ]
+        judges = [
+            await HackathonJudgeModel.create(
+                hackathon=hackathon, user_id=user_id
+            )
+            for user_id in range(1, 5)
+        ]
+        # судьи оценивают не все команды и не по всем критериям
+        for team_id in range(10, 16):
+            for judge in rng.sample(judges, rng.randint(1, len(judges))):
+                for criterion in rng.sample(criteria, rng.randint(1, 3)):
+                    await HackathonTeamScore.create(
+                        team_id=team_id,
+                        criterion=criterion,
+                        judge=judge,
+                        score=rng.randint(0, 100),
+                    )
+
+    hackathon = hackathons[0]
+    scores = await HackathonTeamScore.filter(
+        criterion__hackathon_id=hackathon.id
+    ).prefetch_related("criterion")
+    weighted: dict[int, float] = defaultdict(float)
+    judges_by_team: dict[int, set[int]] = defaultdict(set)
+    for score in scores:
+        weighted[score.team_id] += score.score * score.criterion.weight
+        judges_by_team[score.team_id].add(score.judge_id)
+
+    rows = await services.hackathons._aggregate_team_scores(hackathon.id)
+
+    assert {
+        row["team_id"]: (row["judge_count"], row["score"]) for row in rows
+    } == {
+        team_id: (
+            len(judges_by_team[team_id]),
+            pytest.approx(weighted[team_id] / len(judges_by_team[team_id])),
+        )
+        for team_id in weighted
+    }
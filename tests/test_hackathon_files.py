@@ -0,0 +1,174 @@
+from app.services.hackathon_files.exceptions import (
+    HackathonFileTooLargeException,
+)
+from app.services.hackathon_files.service import HackathonFilesService
+from app.util.body_limit import BodySizeLimitMiddleware
+from app.services.hackathon_files import utils
+from app.adapters.cache.memory import InMemoryCacheAdapter
+from app.adapters.storage import S3StorageAdapter
+from app.util.http_cache import ResponseCache
+from urllib.parse import quote, urlsplit
+from app.config import Settings
+from fastapi import FastAPI, UploadFile
+import threading
+import pytest
+import httpx
+import io
+
+BASE_URL = "http://api.test/hackathon/"
+
+
+@pytest.fixture
+def make_files_service(s3, db):
+    def make(**kwargs) -> HackathonFilesService:
+        return HackathonFilesService(
+            "hackathons",
+            S3StorageAdapter(),
+            ResponseCache(InMemoryCacheAdapter(), 10),
+            **kwargs,
+        )
+
+    return make
+
+
+async def test_presigned_link_uses_public_endpoint_and_original_name(
+    make_files_service, make_hackathon, monkeypatch
+):
+    # снаружи кластера S3 доступен по другому адресу, чем изнутри
+    public_endpoint = Settings.S3_ENDPOINT.replace("127.0.0.1", "localhost")
+    monkeypatch.setattr(Settings, "S3_PUBLIC_ENDPOINT", public_endpoint)
+    files = make_files_service(presigned_links=True)
+    hackathon = await make_hackathon("upcoming")
+    await files.upload_allowed_file(
+        hackathon.id, io.BytesIO(b"rules"), "Регламент.txt"
+    )
+
+    [document] = await files.get_files(hackathon.id, BASE_URL)
+
+    assert urlsplit(document.link).netloc == urlsplit(public_endpoint).netloc
+    async with httpx.AsyncClient() as http:
+        response = await http.get(document.link)
+    assert response.status_code == 200
+    assert response.content == b"rules"
+    disposition = response.headers["content-disposition"]
+    assert disposition.startswith("attachment;")
+    assert f"filename*=UTF-8''{quote('Регламент.txt')}" in disposition
+
+
+async def test_presigned_link_is_cached_until_file_is_deleted(
+    make_files_service, make_hackathon
+):
+    files = make_files_service(presigned_links=True)
+    hackathon = await make_hackathon("upcoming")
+    document = await files.upload_allowed_file(
+        hackathon.id, io.BytesIO(b"rules"), "rules.txt"
+    )
+
+    first = await files.get_files(hackathon.id, BASE_URL)
+    second = await files.get_files(hackathon.id, BASE_URL)
+    assert first[0].link == second[0].link
+
+    await files.delete_file(document.id)
+
+    assert await files.get_files(hackathon.id, BASE_URL) == []
+    async with httpx.AsyncClient() as http:
+        # без права ListBucket S3 отвечает 403 вместо 404
+        assert (await http.get(first[0].link)).status_code in (403, 404)
+
+
+async def test_redirect_link_by_default(make_files_service, make_hackathon):
+    files = make_files_service()
+    hackathon = await make_hackathon("upcoming")
+    document = await files.upload_allowed_file(
+        hackathon.id, io.BytesIO(b"rules"), "rules v2.txt"
+    )
+
+    [listed] = await files.get_files(hackathon.id, BASE_URL)
+
+    assert listed.link == (
+        f"{BASE_URL}download/hack/{document.id}/rules%20v2.txt"
+    )
+
+
+async def test_file_checks_run_outside_event_loop(
+    make_files_service, make_hackathon, monkeypatch
+):
+    files = make_files_service(max_file_size=4)
+    hackathon = await make_hackathon("upcoming")
+    threads = []
+
+    def get_file_size(file):
+        threads.append(threading.current_thread())
+        return 5
+
+    monkeypatch.setattr(utils, "get_file_size", get_file_size)
+
+    with pytest.raises(HackathonFileTooLargeException):
+        await files.upload_allowed_file(
+            hackathon.id, io.BytesIO(b"rules"), "rules.txt"
+        )
+
+    assert threads and threads[0] is not threading.main_thread()
+
+
+@pytest.fixture
+def upload_client():
+    received = []
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=1024)
+
+    @app.put("/files")
+    async def upload(file: UploadFile):
+        received.append(await file.read())
+
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://test")
+    client.received = received
+    return client
+
+
+async def test_declared_oversized_upload_is_rejected_before_reading(
+    upload_client,
+):
+    response = await upload_client.put(
+        "/files", files={"file": ("big.txt", b"x" * 2048)}
+    )
+
+    assert response.status_code == 413
+    assert upload_client.received == []
+
+
+async def test_streamed_upload_is_cut_off_at_limit(upload_client):
+    read = 0
+
+    async def body():
+        nonlocal read
+        yield (
+            b"--b\r\n"
+            b'Content-Disposition: form-data; name="file"; '
+            b'filename="big.txt"\r\n\r\n'
+        )
+        for _ in range(64):
+            read += 256
+            yield b"x" * 256
+        yield b"\r\n--b--\r\n"
+
+    response = await upload_client.put(
+        "/files",
+        content=body(),
+        headers={"content-type": "multipart/form-data; boundary=b"},
+    )
+
+    assert response.status_code == 413
+    assert upload_client.received == []
+    # чтение остановлено вскоре после превышения лимита
+    assert read <= 1024 + 256
+
+
+async def test_upload_within_limit_passes(upload_client):
+    response = await upload_client.put(
+        "/files", files={"file": ("small.txt", b"rules")}
+    )
+
+    assert response.status_code == 200
+    assert upload_client.received == [b"rules"]
@@ -0,0 +1,91 @@
+from app.services.hackathon.dto import HackathonDto, HackathonSummaryDto
+from app.services.hackathon.dto import HackathonPhase
+from datetime import datetime, timedelta, timezone
+from app.models.hackathon import HackathonModel
+import app.services.hackathon.service as service
+import app.services.hackathon.dto as dto
+import pytest
+
+NOW = datetime(2030, 1, 10, tzinfo=timezone.utc)
+DAY = timedelta(days=1)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW.astimezone(tz)
+
+
+@pytest.fixture
+def frozen_now(monkeypatch):
+    monkeypatch.setattr(service, "datetime", FrozenDatetime)
+    monkeypatch.setattr(dto, "datetime", FrozenDatetime)
+    return NOW
+
+
+async def create(name: str, start: datetime) -> HackathonModel:
+    return await HackathonModel.create(
+        name=name,
+        description="x" * 2000,
+        max_participant_count=10,
+        max_team_mates_count=3,
+        start_date=start,
+        score_start_date=start + DAY,
+        end_date=start + 2 * DAY,
+    )
+
+
+async def test_summary_view_omits_description(make_services):
+    services = make_services()
+    for i in range(3):
+        await create(f"hackathon-{i}", NOW + i * DAY)
+
+    full = await services.hackathons.get_all()
+    summary = await services.hackathons.get_all(summary=True)
+
+    assert all(type(item) is HackathonDto for item in full.items)
+    assert all(type(item) is HackathonSummaryDto for item in summary.items)
+    assert [item.id for item in summary.items] == [
+        item.id for item in full.items
+    ]
+    assert "description" not in summary.items[0].model_dump()
+
+
+async def test_summary_view_pages_with_cursor(make_services):
+    services = make_services()
+    for i in range(5):
+        await create(f"hackathon-{i}", NOW + i * DAY)
+
+    first = await services.hackathons.get_all(2, summary=True)
+    second = await services.hackathons.get_all(
+        2, first.next_cursor, summary=True
+    )
+
+    names = [item.name for item in first.items + second.items]
+    assert names == [f"hackathon-{i}" for i in range(4)]
+
+
+# хакатон, у которого в текущий момент начинается этап оценивания
+@pytest.mark.parametrize("offset", [-2 * DAY, -DAY, -DAY / 2, 0 * DAY, DAY])
+async def test_phase_filter_matches_can_checks(
+    make_services, frozen_now, offset
+):
+    services = make_services()
+    hackathon = await create("hackathon", NOW + offset)
+    hackathons = services.hackathons
+
+    expected = {
+        HackathonPhase.Upcoming: (
+            await hackathons.can_edit_team_registry(hackathon.id)
+        ).can_edit,
+        HackathonPhase.Active: (
+            await hackathons.can_upload_submissions(hackathon.id)
+        ).can_upload,
+        HackathonPhase.Judging: (
+            await hackathons.can_make_scores(hackathon.id)
+        ).can_make,
+    }
+
+    for phase, allowed in expected.items():
+        page = await hackathons.get_all(phase=phase)
+        assert bool(page.items) == allowed, phase
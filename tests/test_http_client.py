@@ -0,0 +1,131 @@
+from app.adapters.userservice import UserServiceAdapter
+from app.adapters.teamservice import TeamServiceAdapter
+from app.events.emitter import BroadcastEmitter
+from app.config import Settings
+from app import dependencies
+import asyncio
+import pytest
+import json
+
+
+class Upstream:
+    """
+    HTTP/1.1-сервер с keep-alive, который считает входящие соединения.
+    На /users/<id> и /teams/<id> отвечает пользователем или командой.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self.server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def _body(self, path: str) -> bytes:
+        kind, item_id = path.strip("/").split("/")
+        if kind == "users":
+            data = {
+                "id": int(item_id),
+                "is_banned": False,
+                "formatted_name": f"user-{item_id}",
+                "role": "judge",
+            }
+        else:
+            data = {"id": int(item_id), "hackathon_id": 1, "name": "team"}
+        return json.dumps(data).encode()
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        try:
+            while request_line := await reader.readline():
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                self.requests += 1
+                body = self._body(request_line.split()[1].decode())
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def __aenter__(self) -> "Upstream":
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *args):
+        self.server.close()
+
+
+@pytest.fixture
+async def upstream(monkeypatch):
+    async with Upstream() as upstream:
+        monkeypatch.setattr(
+            Settings, "USER_SERVICE_URL", f"{upstream.url}/users/"
+        )
+        monkeypatch.setattr(
+            Settings, "TEAM_SERVICE_URL", f"{upstream.url}/teams/"
+        )
+        yield upstream
+
+
+@pytest.fixture
+async def fresh_dependencies():
+    factories = (
+        dependencies.get_http_client,
+        dependencies.get_user_service,
+        dependencies.get_team_service,
+        dependencies.get_cache,
+    )
+    for factory in factories:
+        factory.cache_clear()
+
+    yield
+
+    await dependencies.get_http_client().aclose()
+    for factory in factories:
+        factory.cache_clear()
+    BroadcastEmitter.remove_all_listeners()
+
+
+async def test_upstream_adapters_share_one_client(fresh_dependencies):
+    client = dependencies.get_http_client()
+
+    users = dependencies.get_user_service().upstream
+    teams = dependencies.get_team_service().upstream
+
+    assert users.client.client is client
+    assert teams.client.client is client
+
+
+async def test_requests_reuse_pooled_connections(upstream, fresh_dependencies):
+    client = dependencies.get_http_client()
+    users = UserServiceAdapter(client)
+    teams = TeamServiceAdapter(client)
+
+    for i in range(1, 11):
+        assert (await users.get_user_info(i)).formatted_name == f"user-{i}"
+        assert (await teams.get_team_info(i)).id == i
+
+    # оба адаптера работают через один пул соединений с keep-alive
+    assert upstream.requests == 20
+    assert upstream.connections == 1
+
+
+async def test_concurrent_requests_are_bounded_by_pool(
+    upstream, fresh_dependencies, monkeypatch
+):
+    monkeypatch.setattr(Settings, "HTTP_MAX_CONNECTIONS", 3)
+    client = dependencies.get_http_client()
+    users = UserServiceAdapter(client)
+
+    await asyncio.gather(*(users.get_user_info(i) for i in range(1, 31)))
+
+    assert upstream.requests == 30
+    assert upstream.connections <= 3
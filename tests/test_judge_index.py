@@ -0,0 +1,141 @@
+from app.services.judge.exceptions import HackathonJudgeDoesNotExistsException
+from app.services.auth.exceptions import NotHackathonJudgeException
+from app.events.emitter import BatchEmitter, Events
+from app.services.auth.dto import AccessJWTPayloadDto
+from app.services.auth import HackathonJudgeAction
+from app.acl.permissions import Permissions
+from app.acl.roles import UserRoles
+import pytest
+import time
+
+from app.models.hackathon import (
+    HackathonCriterionModel,
+    HackathonJudgeModel,
+)
+
+
+def principal(user_id: int) -> AccessJWTPayloadDto:
+    return AccessJWTPayloadDto(
+        user_id=user_id, role=UserRoles.Judge, exp=time.time() + 60
+    )
+
+
+@pytest.fixture
+def count_index_loads(monkeypatch):
+    loads = []
+    filter = HackathonJudgeModel.filter
+
+    def counting_filter(*args, **kwargs):
+        loads.append(kwargs)
+        return filter(*args, **kwargs)
+
+    monkeypatch.setattr(HackathonJudgeModel, "filter", counting_filter)
+    return loads
+
+
+async def test_judge_action_uses_index(
+    make_services, make_hackathon, count_index_loads
+):
+    services = make_services()
+    hackathon = await make_hackathon("upcoming")
+    judge = await HackathonJudgeModel.create(hackathon=hackathon, user_id=1)
+    action = HackathonJudgeAction(Permissions.CreateTeamScore)
+
+    payload = await action(hackathon.id, principal(1), services.judges)
+    assert payload.judge_id == judge.id
+    assert payload.user_id == 1
+
+    for user_id in range(2, 50):
+        with pytest.raises(NotHackathonJudgeException):
+            await action(hackathon.id, principal(user_id), services.judges)
+
+    # индекс загружен один раз, посторонние судьи отклонены без запросов
+    assert len(count_index_loads) == 1
+
+
+async def test_judge_changes_reach_other_workers(
+    make_services, make_hackathon, relay_outbox
+):
+    first, second = make_services(), make_services()
+    hackathon = await make_hackathon("upcoming")
+
+    assert await second.judges.get_judge_id(hackathon.id, 1) is None
+
+    judge = await first.judges.add_judge(hackathon.id, 1)
+    assert await first.judges.get_judge_id(hackathon.id, 1) == judge.id
+    # до доставки события второй воркер видит старый индекс
+    assert await second.judges.get_judge_id(hackathon.id, 1) is None
+
+    assert await relay_outbox() == [Events.HackathonJudgesChanged]
+    assert await second.judges.get_judge_id(hackathon.id, 1) == judge.id
+
+    await first.judges.delete_judge(hackathon.id, 1)
+    await relay_outbox()
+    assert await second.judges.get_judge_id(hackathon.id, 1) is None
+
+
+async def test_deleted_users_leave_index_in_every_worker(
+    make_services, make_hackathon, relay_outbox
+):
+    first, second = make_services(), make_services()
+    hackathons = [await make_hackathon("upcoming") for _ in range(2)]
+    for hackathon in hackathons:
+        await HackathonJudgeModel.create(hackathon=hackathon, user_id=1)
+        assert await second.judges.get_judge_id(hackathon.id, 1) is not None
+
+    # пакет событий удаления получает только один воркер
+    on_users_deleted = BatchEmitter.listeners(Events.UserDeleted)[0]
+    await on_users_deleted([{"data": {"id": 1}}])
+
+    assert await relay_outbox() == [Events.HackathonJudgesChanged] * 2
+    for hackathon in hackathons:
+        assert await second.judges.get_judge_id(hackathon.id, 1) is None
+
+
+async def test_scoring_uses_judge_id_from_index(
+    make_services, make_hackathon, monkeypatch
+):
+    services = make_services()
+    hackathon = await make_hackathon("judging")
+    criterion = await HackathonCriterionModel.create(
+        hackathon=hackathon, name="criterion", weight=1
+    )
+    await HackathonJudgeModel.create(hackathon=hackathon, user_id=1)
+
+    async def get_judge(*args):
+        raise AssertionError("judge row must not be loaded")
+
+    monkeypatch.setattr(services.judges, "get_judge", get_judge)
+    payload = await HackathonJudgeAction(Permissions.CreateTeamScore)(
+        hackathon.id, principal(1), services.judges
+    )
+
+    scores = await services.teams.set_scores_bulk(
+        hackathon.id,
+        10,
+        payload.judge_id,
+        payload.user_id,
+        [(criterion.id, 50)],
+    )
+
+    assert [(s.judge_user_id, s.score) for s in scores] == [(1, 50)]
+    assert scores[0].judge_user_name == "user-1"
+
+
+async def test_stale_judge_id_is_reported_as_missing_judge(
+    make_services, make_hackathon
+):
+    services = make_services()
+    hackathon = await make_hackathon("judging")
+    criterion = await HackathonCriterionModel.create(
+        hackathon=hackathon, name="criterion", weight=1
+    )
+    judge = await HackathonJudgeModel.create(hackathon=hackathon, user_id=1)
+    judge_id = await services.judges.get_judge_id(hackathon.id, 1)
+    # судью удалили в другом воркере, индекс еще не сброшен
+    await judge.delete()
+
+    with pytest.raises(HackathonJudgeDoesNotExistsException):
+        await services.teams.set_scores_bulk(
+            hackathon.id, 10, judge_id, 1, [(criterion.id, 50)]
+        )
@@ -0,0 +1,93 @@
+from app.events.emitter import Emitter, Events
+from app.util.http_cache import hackathon_tag
+import pytest
+
+from app.models.hackathon import (
+    HackathonTeamFinalScore,
+    HackathonCriterionModel,
+    HackathonJudgeModel,
+    HackathonTeamScore,
+)
+
+
+@pytest.fixture
+async def leaderboard(make_services, make_hackathon):
+    """
+    Хакатон с тремя оцененными командами: у команды 10 + i оценка 10 * i.
+    """
+    services = make_services()
+    hackathon = await make_hackathon("judging")
+    criterion = await HackathonCriterionModel.create(
+        hackathon=hackathon, name="criterion", weight=1
+    )
+    judge = await HackathonJudgeModel.create(hackathon=hackathon, user_id=1)
+    for i in range(1, 4):
+        await services.teams.set_scores_bulk(
+            hackathon.id, 10 + i, judge.id, 1, [(criterion.id, 10 * i)]
+        )
+    return services, hackathon
+
+
+def ranking(results) -> list[tuple]:
+    return [(r.team_id, r.team_name, r.score) for r in results]
+
+
+async def delete_team(team_id: int):
+    [on_team_deleted] = Emitter.listeners(Events.TeamHackathonTeamDeleted)
+    await on_team_deleted({"data": {"id": team_id}})
+
+
+async def test_results_are_ranked_and_paged(leaderboard):
+    services, hackathon = leaderboard
+
+    results = await services.teams.get_result_scores(hackathon.id)
+    assert ranking(results) == [
+        (13, "team-13", 30),
+        (12, "team-12", 20),
+        (11, "team-11", 10),
+    ]
+
+    page = await services.teams.get_result_scores(
+        hackathon.id, limit=1, offset=1
+    )
+    assert ranking(page) == [(12, "team-12", 20)]
+
+
+async def test_deleted_team_leaves_leaderboard(leaderboard, monkeypatch):
+    services, hackathon = leaderboard
+    invalidated = []
+    invalidate = services.hackathons.response_cache.invalidate
+
+    async def recording_invalidate(*tags):
+        invalidated.extend(tags)
+        return await invalidate(*tags)
+
+    monkeypatch.setattr(
+        services.hackathons.response_cache, "invalidate", recording_invalidate
+    )
+
+    await delete_team(13)
+
+    results = await services.teams.get_result_scores(hackathon.id)
+    assert [r.team_id for r in results] == [12, 11]
+    assert await HackathonTeamScore.filter(team_id=13).count() == 0
+    assert invalidated == [hackathon_tag(hackathon.id)]
+
+    # полный пересчет не возвращает удаленную команду
+    await services.hackathons.recalculate_final_scores(hackathon.id)
+    results = await services.teams.get_result_scores(hackathon.id)
+    assert [r.team_id for r in results] == [12, 11]
+
+
+async def test_unknown_or_malformed_team_deletion_is_ignored(leaderboard):
+    services, hackathon = leaderboard
+
+    await delete_team(99)
+    [on_team_deleted] = Emitter.listeners(Events.TeamHackathonTeamDeleted)
+    await on_team_deleted({"data": {}})
+    await on_team_deleted({})
+
+    assert (
+        await HackathonTeamFinalScore.filter(hackathon_id=hackathon.id).count()
+        == 3
+    )
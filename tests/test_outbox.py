@@ -0,0 +1,118 @@
+from app.events.outbox import OutboxRelay, add_outbox_event
+from tortoise.transactions import in_transaction
+from app.models.outbox import OutboxEventModel
+from pydantic import BaseModel
+import asyncio
+import pytest
+
+
+class Payload(BaseModel):
+    id: int
+
+
+class ScriptedPublisher:
+    """
+    Публикует пакеты, пока не включен отказ или задержка.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.delay = 0.0
+
+    async def publish_batch(self, payloads):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("broker is down")
+        self.batches.append([(p.event_name, p.data) for p in payloads])
+
+    def published(self) -> list:
+        return [p for batch in self.batches for p in batch]
+
+
+async def add_events(*ids: int):
+    async with in_transaction():
+        for id in ids:
+            await add_outbox_event("event", Payload(id=id))
+
+
+async def test_relay_publishes_in_order_and_clears_outbox(db):
+    publisher = ScriptedPublisher()
+    relay = OutboxRelay(publisher, batch_size=2, lease=5)
+    await add_events(1, 2, 3)
+
+    assert await relay.relay_batch() == 2
+    assert await relay.relay_batch() == 1
+    assert await relay.relay_batch() == 0
+
+    assert publisher.batches == [
+        [("event", {"id": 1}), ("event", {"id": 2})],
+        [("event", {"id": 3})],
+    ]
+    assert await OutboxEventModel.all().count() == 0
+
+
+async def test_event_is_dropped_with_rolled_back_transaction(db):
+    with pytest.raises(RuntimeError):
+        async with in_transaction():
+            await add_outbox_event("event", Payload(id=1))
+            raise RuntimeError("state change failed")
+
+    assert await OutboxEventModel.all().count() == 0
+
+
+async def test_failed_publish_keeps_events_leased(db):
+    publisher = ScriptedPublisher()
+    relay = OutboxRelay(publisher, batch_size=10, lease=0.2)
+    await add_events(1, 2)
+    [first, second] = await OutboxEventModel.all().order_by("id")
+
+    publisher.fail = True
+    with pytest.raises(ConnectionError):
+        await relay.relay_batch()
+
+    # аренда еще действует: другой экземпляр эти события не заберет
+    publisher.fail = False
+    assert await relay.relay_batch() == 0
+    assert await OutboxEventModel.all().count() == 2
+
+    await asyncio.sleep(0.25)
+    assert await relay.relay_batch() == 2
+    assert publisher.published() == [("event", {"id": 1}), ("event", {"id": 2})]
+    assert await OutboxEventModel.all().count() == 0
+
+
+async def test_publish_is_bounded_by_lease(db):
+    publisher = ScriptedPublisher()
+    publisher.delay = 0.5
+    relay = OutboxRelay(publisher, batch_size=10, lease=0.1)
+    await add_events(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await relay.relay_batch()
+
+    # события не удалены: после аренды их опубликует следующий проход
+    assert await OutboxEventModel.all().count() == 1
+    assert publisher.batches == []
+
+
+async def test_run_keeps_relaying_after_errors(db):
+    publisher = ScriptedPublisher()
+    publisher.fail = True
+    relay = OutboxRelay(
+        publisher, batch_size=10, poll_interval=0.01, lease=0.05
+    )
+    await add_events(1)
+    task = relay.start()
+    try:
+        await asyncio.sleep(0.05)
+        publisher.fail = False
+        for _ in range(100):
+            if not await OutboxEventModel.all().count():
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+
+    assert publisher.batches == [[("event", {"id": 1})]]
+    assert await OutboxEventModel.all().count() == 0
@@ -0,0 +1,243 @@
+from app.util.fanout import optional_branch
+import asyncio
+import pytest
+import httpx
+
+from app.adapters.resilience import (
+    ResilientHttpClient,
+    CircuitBreaker,
+    RetryBudget,
+)
+
+TIMEOUT = 0.05
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class StubUpstream:
+    """
+    Заглушка внешнего сервиса: отвечает по очереди ответами из `script`
+    (код ответа или исключение) после задержки `latency`. В `latencies`
+    можно задать задержку для каждого запроса по очереди.
+    """
+
+    def __init__(
+        self,
+        *script: int | Exception,
+        latency: float = 0,
+        latencies: tuple[float, ...] = (),
+    ):
+        self.script = list(script)
+        self.latency = latency
+        self.latencies = list(latencies)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        outcome = self.script.pop(0) if self.script else 200
+        latency = self.latencies.pop(0) if self.latencies else self.latency
+        try:
+            await asyncio.sleep(latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={"call": self.calls})
+
+
+def make_client(
+    upstream: StubUpstream,
+    retries: int = 2,
+    failure_threshold: int = 100,
+    reset_timeout: float = 30,
+    budget: RetryBudget | None = None,
+    hedge_delay: float = 0,
+) -> ResilientHttpClient:
+    return ResilientHttpClient(
+        httpx.AsyncClient(
+            transport=httpx.MockTransport(upstream), base_url="http://test"
+        ),
+        {},
+        error_factory=UpstreamError,
+        breaker=CircuitBreaker(failure_threshold, reset_timeout),
+        budget=budget or RetryBudget(0.2, 10),
+        retries=retries,
+        backoff_base=0.01,
+        backoff_cap=0.02,
+        hedge_delay=hedge_delay,
+    )
+
+
+async def test_branch_deadline_covers_all_retries():
+    # каждая попытка укладывается в таймаут, но все вместе - нет
+    upstream = StubUpstream(503, 503, 200, latency=TIMEOUT * 0.8)
+    client = make_client(upstream)
+
+    # одного таймаута запроса мало: ветка отменила бы повторы
+    cut_short = await optional_branch(
+        client.get("/", httpx.Timeout(TIMEOUT)), None, TIMEOUT
+    )
+    assert not cut_short.available
+
+    upstream = StubUpstream(503, 503, 200, latency=TIMEOUT * 0.8)
+    client = make_client(upstream)
+    branch = await optional_branch(
+        client.get("/", httpx.Timeout(TIMEOUT)),
+        None,
+        client.max_duration(TIMEOUT),
+    )
+
+    assert branch.available
+    assert branch.value.json() == {"call": 3}
+
+
+async def test_idempotent_requests_are_retried_on_server_errors():
+    upstream = StubUpstream(500, httpx.ConnectError("refused"), 200)
+    client = make_client(upstream)
+
+    response = await client.get("/", httpx.Timeout(TIMEOUT))
+
+    assert response.status_code == 200
+    assert upstream.calls == 3
+
+
+async def test_post_is_retried_only_when_idempotent():
+    upstream = StubUpstream(503, 200)
+    client = make_client(upstream)
+
+    with pytest.raises(UpstreamError):
+        await client.post("/", [1], httpx.Timeout(TIMEOUT))
+    assert upstream.calls == 1
+
+    upstream = StubUpstream(503, 200)
+    client = make_client(upstream)
+    response = await client.post(
+        "/", [1], httpx.Timeout(TIMEOUT), idempotent=True
+    )
+    assert response.status_code == 200
+    assert upstream.calls == 2
+
+
+async def test_client_errors_are_not_retried():
+    upstream = StubUpstream(404)
+    client = make_client(upstream)
+
+    response = await client.get("/", httpx.Timeout(TIMEOUT))
+
+    assert response.status_code == 404
+    assert upstream.calls == 1
+
+
+async def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, min_tokens=1)
+    upstream = StubUpstream(*[500] * 100)
+    client = make_client(upstream, retries=5, budget=budget)
+
+    for _ in range(4):
+        with pytest.raises(UpstreamError):
+            await client.get("/", httpx.Timeout(TIMEOUT))
+
+    # вызов добавляет половину токена, а повтор тратит целый: из пяти
+    # разрешенных повторов на вызов выполняется один на каждые два вызова
+    assert upstream.calls == 4 + 2
+    assert budget.tokens < 1
+
+
+async def test_breaker_opens_and_lets_a_single_probe_through():
+    upstream = StubUpstream(500, 500, latency=0)
+    client = make_client(
+        upstream, retries=0, failure_threshold=2, reset_timeout=0.05
+    )
+
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            await client.get("/", httpx.Timeout(TIMEOUT))
+    assert client.breaker.is_open
+
+    # пока автомат разомкнут, запросы не доходят до сервиса
+    with pytest.raises(UpstreamError):
+        await client.get("/", httpx.Timeout(TIMEOUT))
+    assert upstream.calls == 2
+
+    await asyncio.sleep(0.06)
+    upstream.latency = 0.05
+    results = await asyncio.gather(
+        *(client.get("/", httpx.Timeout(TIMEOUT)) for _ in range(5)),
+        return_exceptions=True,
+    )
+
+    # прошел только пробный запрос, остальные отклонены сразу
+    assert upstream.calls == 3
+    assert sum(isinstance(r, httpx.Response) for r in results) == 1
+    assert not client.breaker.is_open
+
+
+async def test_failed_probe_reopens_breaker():
+    upstream = StubUpstream(500, 500)
+    client = make_client(
+        upstream, retries=0, failure_threshold=1, reset_timeout=0.05
+    )
+
+    with pytest.raises(UpstreamError):
+        await client.get("/", httpx.Timeout(TIMEOUT))
+    await asyncio.sleep(0.06)
+    with pytest.raises(UpstreamError):
+        await client.get("/", httpx.Timeout(TIMEOUT))
+
+    assert upstream.calls == 2
+    with pytest.raises(UpstreamError):
+        await client.get("/", httpx.Timeout(TIMEOUT))
+    assert upstream.calls == 2
+
+
+async def test_cancelled_probe_is_released():
+    upstream = StubUpstream(500)
+    client = make_client(
+        upstream, retries=0, failure_threshold=1, reset_timeout=0.05
+    )
+    with pytest.raises(UpstreamError):
+        await client.get("/", httpx.Timeout(TIMEOUT))
+    await asyncio.sleep(0.06)
+
+    upstream.latency = 1
+    probe = asyncio.create_task(client.get("/", httpx.Timeout(1)))
+    await asyncio.sleep(0.01)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert upstream.cancelled == 1
+
+    # отмененный пробный запрос не держит автомат разомкнутым
+    upstream.latency = 0
+    response = await client.get("/", httpx.Timeout(TIMEOUT))
+    assert response.status_code == 200
+    assert not client.breaker.is_open
+
+
+async def test_hedged_request_wins_and_loser_is_cancelled():
+    # исходный запрос завис, дублирующий отвечает сразу
+    upstream = StubUpstream(latencies=(0.2, 0))
+    client = make_client(upstream, hedge_delay=0.02)
+
+    started = asyncio.get_running_loop().time()
+    response = await client.get("/", httpx.Timeout(1))
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert response.json() == {"call": 2}
+    assert elapsed < 0.2
+    await asyncio.sleep(0)
+    assert upstream.cancelled == 1
+
+
+async def test_hedge_is_not_sent_for_fast_responses():
+    upstream = StubUpstream()
+    client = make_client(upstream, hedge_delay=0.05)
+
+    await client.get("/", httpx.Timeout(TIMEOUT))
+
+    assert upstream.calls == 1
@@ -0,0 +1,164 @@
+from app.dependencies import get_hackathon_files_service, get_storage
+from app.routers.proxy import router as proxy_router
+from app.adapters.storage import S3StorageAdapter
+from app.config import Settings
+from fastapi import FastAPI
+import asyncio
+import pytest
+import httpx
+import time
+import io
+
+# бакет создается фикстурой s3, его же использует прокси скачивания
+S3_BUCKET = "hackathons"
+# задержка, добавляемая к каждому GetObject; вызовы boto3 блокирующие
+S3_LATENCY = 0.2
+REQUESTS = 8
+# минимальный размер части multipart-загрузки в S3
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+@pytest.fixture
+def slow_get_object(s3):
+    def sleep(**kwargs):
+        time.sleep(S3_LATENCY)
+
+    s3.events.register("before-send.s3.GetObject", sleep)
+
+
+def s3_client(s3):
+    return s3.client("s3", endpoint_url=Settings.S3_ENDPOINT)
+
+
+class FakeFilesService:
+    async def get_doc_s3_key(self, document_id: int) -> str:
+        return f"doc-{document_id}"
+
+
+async def read_object(storage: S3StorageAdapter, key: str) -> bytes:
+    s3_obj = await storage.get_object(S3_BUCKET, key)
+    return b"".join(
+        [chunk async for chunk in storage.iter_object_body(s3_obj["Body"])]
+    )
+
+
+async def test_large_upload_is_multipart(s3, monkeypatch):
+    monkeypatch.setattr(Settings, "S3_MULTIPART_CHUNK_SIZE", MIN_PART_SIZE)
+    storage = S3StorageAdapter()
+    data = bytes(range(256)) * (MIN_PART_SIZE * 2 // 256 + 1)
+
+    await storage.upload_file(
+        io.BytesIO(data), S3_BUCKET, "big.pdf", "application/pdf"
+    )
+
+    head = s3_client(s3).head_object(Bucket=S3_BUCKET, Key="big.pdf")
+    # ETag multipart-объекта оканчивается числом частей
+    assert head["ETag"].strip('"').endswith("-3")
+    assert head["ContentType"] == "application/pdf"
+    assert await read_object(storage, "big.pdf") == data
+
+
+async def test_small_upload_is_single_part(s3):
+    storage = S3StorageAdapter()
+
+    await storage.upload_file(
+        io.BytesIO(b"small"), S3_BUCKET, "small.txt", "text/plain"
+    )
+
+    head = s3_client(s3).head_object(Bucket=S3_BUCKET, Key="small.txt")
+    assert "-" not in head["ETag"]
+    assert await read_object(storage, "small.txt") == b"small"
+
+
+async def test_delete_object(s3):
+    storage = S3StorageAdapter()
+    await storage.upload_file(io.BytesIO(b"x"), S3_BUCKET, "a", "text/plain")
+
+    await storage.delete_object(S3_BUCKET, "a")
+
+    listing = s3_client(s3).list_objects_v2(Bucket=S3_BUCKET)
+    assert listing.get("KeyCount", 0) == 0
+
+
+async def test_presigned_url_downloads_object(s3):
+    storage = S3StorageAdapter()
+    await storage.upload_file(
+        io.BytesIO(b"document"), S3_BUCKET, "doc.pdf", "application/pdf"
+    )
+
+    url = storage.generate_presigned_url(S3_BUCKET, "doc.pdf", 60)
+
+    async with httpx.AsyncClient() as http:
+        response = await http.get(url)
+    assert response.status_code == 200
+    assert response.content == b"document"
+
+
+async def test_iter_object_body_streams_in_chunks(s3):
+    storage = S3StorageAdapter()
+    await storage.upload_file(
+        io.BytesIO(b"x" * 10), S3_BUCKET, "a", "text/plain"
+    )
+    s3_obj = await storage.get_object(S3_BUCKET, "a")
+
+    chunks = [
+        chunk async for chunk in storage.iter_object_body(s3_obj["Body"], 4)
+    ]
+
+    assert chunks == [b"xxxx", b"xxxx", b"xx"]
+
+
+async def test_s3_calls_do_not_block_event_loop(s3, slow_get_object):
+    storage = S3StorageAdapter()
+    await storage.upload_file(io.BytesIO(b"x"), S3_BUCKET, "a", "text/plain")
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    await storage.get_object(S3_BUCKET, "a")
+    beat.cancel()
+
+    # за время блокирующего вызова event loop продолжал работать
+    assert ticks >= S3_LATENCY / 0.01 / 2
+
+
+async def test_concurrent_downloads_do_not_serialize(s3, slow_get_object):
+    storage = S3StorageAdapter(max_workers=REQUESTS)
+    for document_id in range(REQUESTS):
+        await storage.upload_file(
+            io.BytesIO(f"document-{document_id}".encode() * 1000),
+            S3_BUCKET,
+            f"doc-{document_id}",
+            "application/pdf",
+        )
+
+    app = FastAPI()
+    app.include_router(proxy_router)
+    app.dependency_overrides[get_storage] = lambda: storage
+    app.dependency_overrides[get_hackathon_files_service] = FakeFilesService
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as http:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                http.get(f"/download/hack/{document_id}/doc.pdf")
+                for document_id in range(REQUESTS)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    for document_id, response in enumerate(responses):
+        assert response.status_code == 200
+        assert response.content == f"document-{document_id}".encode() * 1000
+        assert response.headers["content-type"] == "application/pdf"
+
+    # последовательная обработка заняла бы REQUESTS * S3_LATENCY
+    assert elapsed < REQUESTS * S3_LATENCY / 2
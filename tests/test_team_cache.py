@@ -0,0 +1,143 @@
+from app.adapters.teamservice.cached import CachedTeamServiceAdapter
+from app.adapters.cache.memory import InMemoryCacheAdapter
+from app.events.emitter import BroadcastEmitter, Events
+from collections import Counter
+import asyncio
+import pytest
+
+from app.ports.teamservice.dto import (
+    HackathonTeamWithMatesDto,
+    HackathonTeamDto,
+)
+
+
+class Upstream:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter[tuple] = Counter()
+
+    async def _call(self, *key):
+        self.calls[key] += 1
+        await asyncio.sleep(self.latency)
+
+    async def get_team_info(self, team_id):
+        await self._call("team", team_id)
+        return HackathonTeamDto(id=team_id, hackathon_id=1, name="team")
+
+    async def get_hackathon_teams(self, hackathon_id):
+        await self._call("hackathon_teams", hackathon_id)
+        return [
+            HackathonTeamDto(id=team_id, hackathon_id=hackathon_id, name="t")
+            for team_id in (10 * hackathon_id, 10 * hackathon_id + 1)
+        ]
+
+    async def get_hackathon_team(self, hackathon_id, team_id):
+        await self._call("hackathon_team", hackathon_id, team_id)
+        return HackathonTeamWithMatesDto(
+            id=team_id, hackathon_id=hackathon_id, name="team", mates=[]
+        )
+
+
+@pytest.fixture
+def make_adapter():
+    def make(upstream: Upstream, **kwargs) -> CachedTeamServiceAdapter:
+        return CachedTeamServiceAdapter(
+            upstream, InMemoryCacheAdapter(), **kwargs
+        )
+
+    yield make
+
+    BroadcastEmitter.remove_all_listeners()
+
+
+async def broadcast(event: Events, data: dict):
+    for listener in BroadcastEmitter.listeners(event):
+        await listener({"event_name": event, "data": data})
+
+
+async def warm_up(teams: CachedTeamServiceAdapter):
+    for hackathon_id in (1, 2):
+        await teams.get_hackathon_teams(hackathon_id)
+        await teams.get_hackathon_team(hackathon_id, 10 * hackathon_id)
+
+
+async def test_concurrent_lookups_are_coalesced(make_adapter):
+    upstream = Upstream(latency=0.05)
+    teams = make_adapter(upstream)
+
+    await asyncio.gather(
+        *(teams.get_hackathon_team(1, 10) for _ in range(10)),
+        *(teams.get_hackathon_teams(1) for _ in range(10)),
+    )
+    # состав хакатона заполняет кеш отдельных команд
+    await teams.get_team_info(11)
+
+    assert upstream.calls == {
+        ("hackathon_team", 1, 10): 1,
+        ("hackathon_teams", 1): 1,
+    }
+    assert teams.get_cache_stats()["coalesced"] == 18
+
+
+async def test_entries_expire_after_ttl(make_adapter):
+    upstream = Upstream()
+    teams = make_adapter(upstream, ttl=0.05)
+
+    await teams.get_team_info(1)
+    await teams.get_team_info(1)
+    await asyncio.sleep(0.1)
+    await teams.get_team_info(1)
+
+    assert upstream.calls == {("team", 1): 2}
+
+
+async def test_team_deletion_drops_only_its_entries(make_adapter):
+    upstream = Upstream()
+    teams = make_adapter(upstream)
+    await warm_up(teams)
+
+    await broadcast(
+        Events.TeamHackathonTeamDeleted, {"id": 10, "hackathon_id": 1}
+    )
+    await warm_up(teams)
+
+    assert upstream.calls == {
+        ("hackathon_teams", 1): 2,
+        ("hackathon_team", 1, 10): 2,
+        ("hackathon_teams", 2): 1,
+        ("hackathon_team", 2, 20): 1,
+    }
+
+
+async def test_team_deletion_without_hackathon_drops_all_rosters(
+    make_adapter,
+):
+    upstream = Upstream()
+    teams = make_adapter(upstream)
+    await warm_up(teams)
+
+    await broadcast(Events.TeamHackathonTeamDeleted, {"id": 10})
+    await warm_up(teams)
+
+    assert upstream.calls == {
+        ("hackathon_teams", 1): 2,
+        ("hackathon_team", 1, 10): 2,
+        ("hackathon_teams", 2): 2,
+        ("hackathon_team", 2, 20): 1,
+    }
+
+
+async def test_hackathon_deletion_drops_its_teams(make_adapter):
+    upstream = Upstream()
+    teams = make_adapter(upstream)
+    await warm_up(teams)
+
+    await broadcast(Events.HackathonDeleted, {"id": 2})
+    await warm_up(teams)
+
+    assert upstream.calls == {
+        ("hackathon_teams", 1): 1,
+        ("hackathon_team", 1, 10): 1,
+        ("hackathon_teams", 2): 2,
+        ("hackathon_team", 2, 20): 2,
+    }
@@ -0,0 +1,83 @@
+from app.services.hackathon.exceptions import NoSuchHackathonException
+from app.services.hackathon.dto import OptionalHackathonDto
+from datetime import datetime, timedelta, timezone
+from app.models.hackathon import HackathonModel
+import pytest
+
+
+@pytest.fixture
+def count_hackathon_loads(monkeypatch):
+    loads = []
+    get_or_none = HackathonModel.get_or_none
+
+    def counting_get_or_none(*args, **kwargs):
+        loads.append(kwargs)
+        return get_or_none(*args, **kwargs)
+
+    monkeypatch.setattr(HackathonModel, "get_or_none", counting_get_or_none)
+    return loads
+
+
+async def test_checks_share_one_timeline_load(
+    make_services, make_hackathon, count_hackathon_loads
+):
+    services = make_services()
+    hackathon = await make_hackathon("judging")
+
+    for _ in range(10):
+        assert (
+            await services.hackathons.can_make_scores(hackathon.id)
+        ).can_make
+        assert not (
+            await services.hackathons.can_edit_team_registry(hackathon.id)
+        ).can_edit
+        assert not (
+            await services.hackathons.can_upload_submissions(hackathon.id)
+        ).can_upload
+
+    assert len(count_hackathon_loads) == 1
+
+
+async def test_date_changes_reach_every_worker(
+    make_services, make_hackathon, relay_outbox
+):
+    first, second = make_services(), make_services()
+    hackathon = await make_hackathon("judging")
+    assert (await second.hackathons.can_make_scores(hackathon.id)).can_make
+
+    # хакатон переносится на завтра
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    await first.hackathons.update(
+        hackathon.id,
+        OptionalHackathonDto(
+            start_date=start,
+            score_start_date=start + timedelta(days=1),
+            end_date=start + timedelta(days=2),
+        ),
+    )
+    # до доставки события второй воркер видит старые даты
+    assert (await second.hackathons.can_make_scores(hackathon.id)).can_make
+
+    await relay_outbox()
+
+    for services in (first, second):
+        assert not (
+            await services.hackathons.can_make_scores(hackathon.id)
+        ).can_make
+        assert (
+            await services.hackathons.can_edit_team_registry(hackathon.id)
+        ).can_edit
+
+
+async def test_deleted_hackathon_is_forgotten_by_every_worker(
+    make_services, make_hackathon, relay_outbox
+):
+    first, second = make_services(), make_services()
+    hackathon = await make_hackathon("judging")
+    await second.hackathons.can_make_scores(hackathon.id)
+
+    await first.hackathons.delete(hackathon.id)
+    await relay_outbox()
+
+    with pytest.raises(NoSuchHackathonException):
+        await second.hackathons.can_make_scores(hackathon.id)
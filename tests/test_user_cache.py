@@ -0,0 +1,110 @@
+from app.ports.userservice.exceptions import UserDoesNotExistException
+from app.adapters.userservice.cached import CachedUserServiceAdapter
+from app.adapters.cache.memory import InMemoryCacheAdapter
+from app.events.emitter import BroadcastEmitter, Events
+from app.ports.userservice.dto import ExternalUserDto
+from app.acl.roles import UserRoles
+import asyncio
+import pytest
+
+UNKNOWN_USER = 404
+
+
+class Upstream:
+    base_url = ""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests: list[frozenset[int]] = []
+
+    async def get_user_info_many(self, user_ids):
+        self.requests.append(frozenset(user_ids))
+        await asyncio.sleep(self.latency)
+        return [
+            ExternalUserDto(
+                id=user_id,
+                is_banned=False,
+                formatted_name=f"user-{user_id}",
+                role=UserRoles.Judge,
+            )
+            for user_id in user_ids
+            if user_id != UNKNOWN_USER
+        ]
+
+
+@pytest.fixture
+def make_adapter():
+    def make(upstream: Upstream, **kwargs) -> CachedUserServiceAdapter:
+        kwargs.setdefault("batch_window", 0.01)
+        return CachedUserServiceAdapter(
+            upstream, InMemoryCacheAdapter(), **kwargs
+        )
+
+    yield make
+
+    BroadcastEmitter.remove_all_listeners()
+
+
+async def test_concurrent_misses_are_coalesced(make_adapter):
+    upstream = Upstream(latency=0.05)
+    users = make_adapter(upstream)
+
+    results = await asyncio.gather(*(users.get_user_info(1) for _ in range(20)))
+
+    assert {user.id for user in results} == {1}
+    assert upstream.requests == [frozenset((1,))]
+    assert users.get_cache_stats()["coalesced"] == 19
+
+    await users.get_user_info(1)
+    assert len(upstream.requests) == 1
+
+
+async def test_entries_expire_after_ttl(make_adapter):
+    upstream = Upstream()
+    users = make_adapter(upstream, ttl=0.05)
+
+    await users.get_user_info(1)
+    await users.get_user_info(1)
+    assert len(upstream.requests) == 1
+
+    await asyncio.sleep(0.1)
+    await users.get_user_info(1)
+    assert len(upstream.requests) == 2
+
+
+@pytest.mark.parametrize("event", [Events.UserBanned, Events.UserDeleted])
+async def test_user_events_invalidate_every_worker(make_adapter, event):
+    upstream = Upstream()
+    workers = [make_adapter(upstream), make_adapter(upstream)]
+    for users in workers:
+        await users.get_user_info(1)
+    assert len(upstream.requests) == 2
+
+    for listener in BroadcastEmitter.listeners(event):
+        await listener({"event_name": event, "data": {"id": 1}})
+
+    for users in workers:
+        await users.get_user_info(1)
+    assert len(upstream.requests) == 4
+
+
+async def test_unknown_user_is_not_cached(make_adapter):
+    upstream = Upstream()
+    users = make_adapter(upstream)
+
+    for _ in range(2):
+        with pytest.raises(UserDoesNotExistException):
+            await users.get_user_info(UNKNOWN_USER)
+
+    assert len(upstream.requests) == 2
+
+
+async def test_many_lookup_fetches_only_missing_users(make_adapter):
+    upstream = Upstream()
+    users = make_adapter(upstream)
+    await users.get_user_info(1)
+
+    result = await users.get_user_info_many(frozenset((1, 2, 3)))
+
+    assert sorted(user.id for user in result) == [1, 2, 3]
+    assert upstream.requests == [frozenset((1,)), frozenset((2, 3))]